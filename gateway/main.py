@@ -2,19 +2,24 @@
 
 import asyncio
 import copy
+import hashlib
 import json
+import math
 import os
+import random
 import re
+import shutil
 import subprocess
+import time
 import uuid
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import httpx
-from fastapi import BackgroundTasks, FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
@@ -30,6 +35,9 @@ from gateway.schemas.task import (
     TASK_TYPE_SHOT,
     TASK_TYPE_AUDIO,
     TASK_TYPE_VIDEO,
+    TASK_PRIORITY_INTERACTIVE,
+    TASK_PRIORITY_NORMAL,
+    TASK_PRIORITY_BATCH,
     TaskState,
     TaskSchema as TaskSchemaNew,
     TaskParameters as TaskParametersNew,
@@ -53,7 +61,7 @@ from gateway.schemas.generate import (
     GeneratePayload,
 )
 
-from gateway.schemas.project import ShotSchema
+from gateway.schemas.project import ShotRegenerateRequest, ShotSchema
 
 # Import from services (incremental migration)
 from gateway.services.orchestrator import (
@@ -64,14 +72,92 @@ from gateway.services.orchestrator import (
     normalize_result as _normalize_result,
 )
 
+from gateway.services.admission import AdmissionController
+from gateway.services.dedup import StageDedup, fingerprint
+from gateway.services.journal import TaskJournal
+from gateway.services.manifest import STAGES as MANIFEST_STAGES, TaskManifest
+from gateway.services.eta import EtaEstimator
+from gateway.services.endpoints import Endpoint, EndpointPool, health_url, parse_endpoints
+from gateway.services.http_pool import ServiceClients
+from gateway.services.scheduler import ServiceLimiter, normalize_priority, parse_weights
+from gateway.services.singleflight import SingleFlight
+from gateway.services.workers import WorkerChannel, WorkerPool
+
 # Import shared state from store module
-from gateway.store.memory import tasks, projects, project_shots, progress_subs
+from gateway.store.memory import tasks, projects, project_shots, progress_subs, task_contexts, running_jobs, background_jobs, idempotency_keys, shot_edits, project_renders
 
-# Downstream service endpoints (can be overridden via env)
+# Downstream service endpoints (can be overridden via env); unix:<socket>:<path> reaches a colocated model node over a Unix socket.
+# Each may list several model nodes as url[;weight=N],url,... (calls go to the least loaded healthy node)
 LLM_URL = os.getenv("LLM_URL", "http://127.0.0.1:8001/storyboard")
 TXT2IMG_URL = os.getenv("TXT2IMG_URL", "http://127.0.0.1:8002/generate")
 IMG2VID_URL = os.getenv("IMG2VID_URL", "http://127.0.0.1:8003/img2vid")
 TTS_URL = os.getenv("TTS_URL", "http://127.0.0.1:8004/narration")
+SERVICE_ENDPOINT_SPECS = {"llm": LLM_URL, "txt2img": TXT2IMG_URL, "img2vid": IMG2VID_URL, "tts": TTS_URL}
+# Header carrying the absolute (unix epoch) deadline of each downstream request
+DEADLINE_HEADER = "X-Request-Deadline"
+# Gateway-wide slots per downstream service (LLM_SLOTS ...), shared fairly between tenants beyond that;
+# unset, they default to the per-node value below times the number of nodes of the service
+SERVICE_SLOTS = {
+    name: max(int(os.getenv(f"{name.upper()}_SLOTS", str(per_node * len(parse_endpoints(SERVICE_ENDPOINT_SPECS[name]))))), 1)
+    for name, per_node in {"llm": 2, "txt2img": 4, "img2vid": 1, "tts": 2}.items()
+}
+# Default request timeout (seconds) per downstream service; individual calls may override it
+SERVICE_TIMEOUTS = {
+    "llm": float(os.getenv("LLM_TIMEOUT", "600")),
+    "txt2img": float(os.getenv("TXT2IMG_TIMEOUT", "600")),
+    "img2vid": float(os.getenv("IMG2VID_TIMEOUT", "240")),
+    "tts": float(os.getenv("TTS_TIMEOUT", "600")),
+}
+# Pooled gateway -> model node connections, per downstream service
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+# HTTP/2 to the model nodes (needs the h2 package; falls back to HTTP/1.1 without it)
+HTTP2_ENABLED = os.getenv("HTTP2", "0") == "1"
+# Multi-node pools: /health probe interval and timeout (seconds), consecutive failures before a node is ejected
+NODE_HEALTH_INTERVAL = float(os.getenv("NODE_HEALTH_INTERVAL", "10"))
+NODE_HEALTH_TIMEOUT = float(os.getenv("NODE_HEALTH_TIMEOUT", "2"))
+NODE_MAX_FAILS = max(int(os.getenv("NODE_MAX_FAILS", "3")), 1)
+# Model nodes keep their outputs on node-local disks: img2vid of a frame then runs on the node that rendered it
+MODEL_PATHS_NODE_LOCAL = os.getenv("MODEL_PATHS_NODE_LOCAL", "0") == "1"
+# Relative share of downstream slots per tenant, e.g. "studio=3,free=0.5" (unlisted tenants weigh 1)
+TENANT_WEIGHTS = parse_weights(os.getenv("TENANT_WEIGHTS", ""))
+# Admission caps on pending + processing tasks per type (0 = unlimited); beyond that requests get 429
+ADMISSION_LIMITS = {
+    TASK_TYPE_VIDEO: max(int(os.getenv("MAX_ACTIVE_VIDEO_TASKS", "4")), 0),
+    TASK_TYPE_SHOT: max(int(os.getenv("MAX_ACTIVE_SHOT_TASKS", "32")), 0),
+    TASK_TYPE_STORYBOARD: max(int(os.getenv("MAX_ACTIVE_STORYBOARD_TASKS", "16")), 0),
+    TASK_TYPE_AUDIO: max(int(os.getenv("MAX_ACTIVE_AUDIO_TASKS", "16")), 0),
+}
+# Retry-After used before any task of the type has finished (no duration history yet)
+ADMISSION_RETRY_AFTER = max(int(os.getenv("ADMISSION_RETRY_AFTER", "30")), 1)
+# How long an Idempotency-Key (or payload id) keeps mapping retries to the task it created
+IDEMPOTENCY_TTL = max(float(os.getenv("IDEMPOTENCY_TTL", "86400")), 0.0)
+# Coalesce identical concurrent downstream calls (same service + payload) across tasks into one request
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT", "1") != "0"
+# Smoothing factor of the online stage-duration estimator behind estimatedDuration
+ETA_ALPHA = float(os.getenv("ETA_ALPHA", "0.3"))
+# Quiet period before a shot edit is dispatched; a newer edit of the same shot within it replaces the old one
+SHOT_DEBOUNCE_SECONDS = max(float(os.getenv("SHOT_DEBOUNCE_SECONDS", "0.5")), 0.0)
+# Shots of one batch regeneration rendering at once
+SHOT_REGENERATE_CONCURRENCY = max(int(os.getenv("SHOT_REGENERATE_CONCURRENCY", os.getenv("TXT2IMG_CONCURRENCY", "4"))), 1)
+# Max concurrent txt2img calls per video task (scenes fan out up to this limit)
+TXT2IMG_CONCURRENCY = max(int(os.getenv("TXT2IMG_CONCURRENCY", "4")), 1)
+# img2vid is GPU-heavy: one clip at a time per task unless the model node can take more
+IMG2VID_CONCURRENCY = max(int(os.getenv("IMG2VID_CONCURRENCY", "1")), 1)
+# Local ffmpeg mux jobs running at once per task
+FFMPEG_CONCURRENCY = max(int(os.getenv("FFMPEG_CONCURRENCY", "2")), 1)
+# images_per_scene alternates: "background" fills them in after the video is done, "lazy" only on request
+ALTERNATES_MODE = os.getenv("ALTERNATES_MODE", "background").lower()
+# Breathing room kept after the narration when sizing clips from audio length
+NARRATION_TAIL_SECONDS = max(float(os.getenv("NARRATION_TAIL_SECONDS", "0.3")), 0.0)
+# Progressive renders: the draft pass uses fewer diffusion steps and a downscaled frame (never below 256px)
+DRAFT_IMG_STEPS = max(int(os.getenv("DRAFT_IMG_STEPS", "1")), 1)
+DRAFT_SCALE = min(max(float(os.getenv("DRAFT_SCALE", "0.5")), 0.1), 1.0)
+# Cheap x264 settings and audio bitrate for the draft encode
+DRAFT_ENCODE_ARGS = ["-preset", "ultrafast", "-crf", os.getenv("DRAFT_CRF", "35")]
+DRAFT_AUDIO_BITRATE = os.getenv("DRAFT_AUDIO_BITRATE", "64k")
 DEFAULT_IMG_STEPS = int(os.getenv("SD_IMG_STEPS", "4"))
 DEFAULT_CFG_SCALE = float(os.getenv("SD_CFG_SCALE", "1.5"))
 DEFAULT_IMG_WIDTH = int(os.getenv("SD_IMG_WIDTH", "384"))
@@ -82,9 +168,23 @@ DEFAULT_NEGATIVE_PROMPT = os.getenv(
 )
 # Final outputs
 FINAL_DIR = Path(os.getenv("FINAL_DIR", "data/final"))
+# Per-task workspaces (TMP_DIR/<task_id>) hold mux clips, fallback clips and concat lists
 TMP_DIR = FINAL_DIR / "tmp"
+# Workspaces of failed / cancelled tasks are kept for resume, then swept on startup after this many seconds
+WORKSPACE_RETENTION = max(float(os.getenv("WORKSPACE_RETENTION", "86400")), 0.0)
 CLIPS_DIR = Path(os.getenv("CLIPS_DIR", "data/clips"))
 STORYBOARD_DIR = Path(os.getenv("STORYBOARD_DIR", "data/storyboard"))
+# Per-task stage checkpoints used by POST /v1/jobs/{id}/resume
+MANIFEST_DIR = Path(os.getenv("MANIFEST_DIR", "data/manifests"))
+# Append-only task journal replayed on startup ("" disables it)
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "data/journal/tasks.jsonl")
+# Finished tasks older than this (seconds) are dropped when the journal is compacted on startup
+JOURNAL_RETENTION = max(float(os.getenv("JOURNAL_RETENTION", "604800")), 0.0)
+# Re-enter interrupted video tasks into the pipeline on startup instead of marking them failed
+RECOVER_INTERRUPTED = os.getenv("RECOVER_INTERRUPTED", "1") != "0"
+# "inline" runs pipelines on the API event loop; "process" runs them in PIPELINE_WORKERS worker processes
+PIPELINE_EXECUTOR = os.getenv("PIPELINE_EXECUTOR", "inline").lower()
+PIPELINE_WORKERS = max(int(os.getenv("PIPELINE_WORKERS", str(min(os.cpu_count() or 1, 4)))), 1)
 
 # Backward compatibility aliases (these are defined in new modules now)
 # Remove these aliases once migration is complete and all code uses new imports
@@ -134,12 +234,14 @@ class RenderRequest(BaseModel):
     height: int = Field(DEFAULT_IMG_HEIGHT, ge=256, le=2048)
     img_steps: int = Field(DEFAULT_IMG_STEPS, ge=1, le=50)
     cfg_scale: float = Field(DEFAULT_CFG_SCALE, ge=0.0, le=20.0)
-    images_per_scene: int = Field(1, ge=1, le=3, description="每个分镜生成的图片数量，取首张做视频，其余留作补充")
+    images_per_scene: int = Field(1, ge=1, le=3, description="每个分镜生成的图片数量，取首张做视频，其余作为备选图延后生成")
     fps: int = Field(12, ge=4, le=30)
     clip_seconds: float = Field(5.0, ge=1.0, le=30.0, description="单个分镜时长（秒）")
     video_frames: int = Field(60, ge=8, le=480, description="单个分镜帧数（优先于 clip_seconds）")
     speaker: Optional[str] = Field(None, description="TTS 说话人")
     speed: float = Field(1.0, ge=0.5, le=2.0, description="TTS 语速")
+    priority: Optional[str] = Field(None, description="调度优先级：interactive / normal / batch")
+    progressive: bool = Field(False, description="先快速出低质量草稿视频，再后台渲染最终版本")
 
 
 class RenderResponse(BaseModel):
@@ -468,6 +570,8 @@ class GeneratePayload(BaseModel):
     finishedAt: Optional[str] = None
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
+    priority: Optional[str] = None
+    progressive: Optional[bool] = None
 
 
 class TaskResponse(BaseModel):
@@ -500,20 +604,398 @@ async def health() -> Dict[str, str]:
     }
 
 
-async def _call_json_api(client: httpx.AsyncClient, url: str, payload: Dict, timeout: float = 600.0) -> Dict:
-    resp = await client.post(url, json=payload, timeout=timeout)
+async def _call_json_api(service: str, payload: Dict, timeout: Optional[float] = None, node: Optional[str] = None) -> Tuple[Dict, Endpoint]:
+    """POST to the least loaded healthy node of ``service`` (or the pinned ``node``); returns the JSON and the node used."""
+    timeout = HTTP_POOL.timeout(service) if timeout is None else timeout
+    pool = NODES[service]
+    tried: List[Endpoint] = []
+    while True:
+        endpoint = pool.pick(node=node, exclude=tried)
+        tried.append(endpoint)
+        # Absolute deadline so the model node can drop the request if it only gets to it after we gave up
+        headers = {DEADLINE_HEADER: f"{time.time() + timeout:.3f}"}
+        try:
+            with pool.use(endpoint):
+                resp = await HTTP_POOL.post(service, endpoint.url, socket_path=endpoint.socket, json=payload, timeout=timeout, headers=headers)
+                # A 5xx means the node itself is broken, so it counts towards ejection like a transport failure
+                if resp.status_code >= 500:
+                    resp.raise_for_status()
+            break
+        except httpx.HTTPStatusError:
+            # The request reached the node, so it is not retried elsewhere; reported below
+            break
+        except Exception as exc:
+            # Nothing reached the node, so the call can safely go to another one
+            if node or not pool.retryable(exc, tried):
+                raise
+            print(f"[gateway] {service} node {endpoint.raw} unreachable ({type(exc).__name__}), trying another node")
     if resp.status_code >= 400:
-        raise HTTPException(status_code=500, detail=f"API {url} failed: {resp.status_code} {resp.text}")
+        raise HTTPException(status_code=500, detail=f"API {endpoint.raw} failed: {resp.status_code} {resp.text}")
     try:
-        return resp.json()
+        return resp.json(), endpoint
     except json.JSONDecodeError as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=f"API {url} returned non-JSON: {resp.text}") from exc
+        raise HTTPException(status_code=500, detail=f"API {endpoint.raw} returned non-JSON: {resp.text}") from exc
+
+
+async def _gather_or_cancel(*aws):
+    """Like asyncio.gather, but cancels the remaining awaitables as soon as one fails."""
+    futs = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*futs)
+    except BaseException:
+        for fut in futs:
+            fut.cancel()
+        await asyncio.gather(*futs, return_exceptions=True)
+        raise
+
+
+NODES: Dict[str, EndpointPool] = {
+    name: EndpointPool(name, spec, max_fails=NODE_MAX_FAILS) for name, spec in SERVICE_ENDPOINT_SPECS.items()
+}
+HTTP_POOL = ServiceClients(
+    SERVICE_TIMEOUTS,
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_keepalive=HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    http2=HTTP2_ENABLED,
+)
+LIMITERS: Dict[str, ServiceLimiter] = {
+    name: ServiceLimiter(name, slots, TENANT_WEIGHTS) for name, slots in SERVICE_SLOTS.items()
+}
+
+
+ADMISSION = AdmissionController(ADMISSION_LIMITS, default_retry_after=ADMISSION_RETRY_AFTER)
+ETA = EtaEstimator(alpha=ETA_ALPHA)
+
+
+def _image_eta(width: int, height: int, steps: int) -> Tuple[str, float, Dict]:
+    return "image", 1, {"resolution": f"{width}x{height}", "steps": steps}
+
+
+def _eta_seconds(eta: Tuple[str, float, Dict]) -> float:
+    stage, units, params = eta
+    return ETA.seconds(stage, units, **params)
+
+
+def _draft_seconds(req: RenderRequest) -> float:
+    """Expected wall time of the progressive draft pass (cheap images, static clips, no TTS)."""
+    draft = _draft_request(req)
+    frames = _compute_clip_frames(draft)
+    resolution = f"{draft.width}x{draft.height}"
+    images = math.ceil(draft.scenes / max(min(TXT2IMG_CONCURRENCY, SERVICE_SLOTS["txt2img"]), 1)) * _eta_seconds(_image_eta(draft.width, draft.height, draft.img_steps))
+    clips = draft.scenes * ETA.seconds("clip", frames, resolution=resolution, fps=draft.fps, provider="fallback")
+    return images + clips + ETA.seconds("mux", 1) + ETA.seconds("concat", draft.scenes)
+
+
+def _estimate_video(req: RenderRequest, tts_chars: Optional[int] = None, done: Optional[Dict[str, int]] = None) -> Tuple[float, Dict[str, float]]:
+    """Remaining seconds of a video render; before the storyboard exists narration length is guessed from the story."""
+    frames = min(_compute_clip_frames(req), max(int(os.getenv("IMG2VID_MAX_FRAMES", "48")), 8))
+    if req.progressive and not (done or {}).get("draft"):
+        total, breakdown = _estimate_video(req.copy(update={"progressive": False}), tts_chars, done)
+        draft = _draft_seconds(req)
+        return total + draft, {**breakdown, "draft": round(draft, 1)}
+    return ETA.estimate_video(
+        scenes=req.scenes,
+        width=req.width,
+        height=req.height,
+        steps=req.img_steps,
+        fps=req.fps,
+        frames=frames,
+        tts_chars=tts_chars if tts_chars is not None else max(len(req.story or ""), 20 * req.scenes),
+        speaker=req.speaker,
+        img_parallel=min(TXT2IMG_CONCURRENCY, SERVICE_SLOTS["txt2img"]),
+        vid_parallel=min(IMG2VID_CONCURRENCY, SERVICE_SLOTS["img2vid"]),
+        done=done,
+    )
+
+
+def _refined_estimate(req: RenderRequest, started: float, tts_chars: int, done: Dict[str, int]) -> int:
+    """Elapsed time plus what the remaining stages of a running render should take."""
+    remaining, _ = _estimate_video(req, tts_chars=tts_chars, done=done)
+    return int(math.ceil(time.monotonic() - started + remaining))
+
+
+def _estimate_task(task_type: str, req: RenderRequest, text: str = "") -> Tuple[int, Dict[str, float]]:
+    """Expected wall time (seconds) of a new task from the stage rates observed so far."""
+    if task_type == TASK_TYPE_STORYBOARD:
+        breakdown = {"storyboard": ETA.seconds("storyboard", 1, scenes=req.scenes)}
+    elif task_type == TASK_TYPE_SHOT:
+        breakdown = {"images": _eta_seconds(_image_eta(req.width, req.height, req.img_steps))}
+    elif task_type == TASK_TYPE_AUDIO:
+        breakdown = {"tts": ETA.seconds("tts", len(text or req.story or ""), speaker=req.speaker or "default")}
+    else:
+        seconds, breakdown = _estimate_video(req)
+        return int(math.ceil(seconds)), breakdown
+    return int(math.ceil(sum(breakdown.values()))), {k: round(v, 1) for k, v in breakdown.items()}
+
+
+def _admit(task_type: str) -> None:
+    """Reject a new task with 429 + Retry-After when its type is at the admission cap."""
+    wait = ADMISSION.check(tasks.values(), task_type)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail=f"gateway busy: too many active {task_type} tasks, retry in {wait}s",
+            headers={"Retry-After": str(wait)},
+        )
+
+
+def _idempotent_task(key: Optional[str]) -> Optional[str]:
+    """Task already accepted under this key, unless it expired or ended in failure/cancellation."""
+    if not key:
+        return None
+    entry = idempotency_keys.get(key)
+    if not entry:
+        return None
+    task_id, accepted_at = entry
+    state = tasks.get(task_id)
+    if not state or time.time() - accepted_at > IDEMPOTENCY_TTL or state.status in (TASK_STATUS_FAILED, TASK_STATUS_CANCELLED):
+        idempotency_keys.pop(key, None)
+        return None
+    return task_id
+
+
+def _remember_idempotency(key: Optional[str], task_id: str) -> None:
+    if not key:
+        return
+    now = time.time()
+    for stale in [k for k, (_, accepted_at) in idempotency_keys.items() if now - accepted_at > IDEMPOTENCY_TTL]:
+        idempotency_keys.pop(stale, None)
+    idempotency_keys[key] = (task_id, now)
+    if JOURNAL is not None:
+        JOURNAL.idempotency(key, task_id, now)
+
+
+def _resolve_tenant(tenant_header: Optional[str], api_key: Optional[str], project_id: Optional[str], task_id: str) -> str:
+    """Scheduling identity of a request: explicit tenant header, API key, project, then the task itself."""
+    if tenant_header and tenant_header.strip():
+        return tenant_header.strip()
+    if api_key and api_key.strip():
+        return "key:" + hashlib.sha256(api_key.strip().encode("utf-8")).hexdigest()[:12]
+    return project_id or task_id
+
+
+def _task_tenant(task_id: Optional[str]) -> str:
+    state = tasks.get(task_id) if task_id else None
+    if not state:
+        return task_id or "default"
+    return state.tenant or state.project_id or state.id
+
+
+def _resolve_priority(explicit: Optional[str], task_type: Optional[str]) -> str:
+    """Explicit priority wins; otherwise shot edits are interactive and everything else normal."""
+    if explicit:
+        return normalize_priority(explicit)
+    return TASK_PRIORITY_INTERACTIVE if task_type == TASK_TYPE_SHOT else TASK_PRIORITY_NORMAL
 
 
-def _run_ffmpeg(cmd: List[str], desc: str) -> None:
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def _task_priority(task_id: Optional[str]) -> str:
+    state = tasks.get(task_id) if task_id else None
+    if not state:
+        return TASK_PRIORITY_NORMAL
+    return state.priority or _resolve_priority(None, state.type)
+
+
+JOURNAL: Optional[TaskJournal] = TaskJournal(Path(JOURNAL_PATH)) if JOURNAL_PATH else None
+SINGLEFLIGHT = SingleFlight()
+# Set inside pipeline worker processes only: task updates, slots and ETA samples go through it to the API process
+PIPELINE_CHANNEL: Optional[WorkerChannel] = None
+# Frame path -> model node that rendered it, for MODEL_PATHS_NODE_LOCAL (oldest entries dropped first)
+FRAME_NODES: Dict[str, str] = {}
+FRAME_NODES_MAX = 10000
+
+
+def _remember_frame_nodes(data: Dict, node: str) -> None:
+    """Record which node holds each image of a txt2img response, so img2vid of that frame is pinned to it."""
+    for image in data.get("images") or []:
+        for key in ("path", "url", "image"):
+            if isinstance(image, dict) and image.get(key):
+                FRAME_NODES[str(image[key])] = node
+    while len(FRAME_NODES) > FRAME_NODES_MAX:
+        FRAME_NODES.pop(next(iter(FRAME_NODES)))
+
+
+async def _call_service(
+    service: str,
+    payload: Dict,
+    task_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    priority: Optional[str] = None,
+    eta: Optional[Tuple[str, float, Dict]] = None,
+) -> Dict:
+    """Call a downstream service, sharing the upstream request with identical calls already in flight.
+
+    Calls are shared across tenants; the shared call queues and is charged as the first caller's.
+    Only calls in the same priority lane and with the same timeout are shared, so a caller never
+    waits in a lower lane or on a shorter deadline than its own.
+    """
+    priority = normalize_priority(priority or _task_priority(task_id))
+    if not SINGLEFLIGHT_ENABLED:
+        return await _call_service_slot(service, payload, task_id, timeout, priority, eta)
+    key = SINGLEFLIGHT.key(f"{service}|{priority}|{timeout}", payload)
+    return await SINGLEFLIGHT.do(
+        key,
+        lambda: _call_service_slot(service, payload, task_id, timeout, priority, eta, waiting=lambda: SINGLEFLIGHT.members(key)),
+        label=service,
+        member=task_id,
+    )
+
+
+async def _call_service_slot(
+    service: str,
+    payload: Dict,
+    task_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    priority: Optional[str] = None,
+    eta: Optional[Tuple[str, float, Dict]] = None,
+    waiting: Optional[Callable[[], List[str]]] = None,
+) -> Dict:
+    """Call a downstream service once a gateway-wide slot is free, reporting queue position on the task.
+
+    ``waiting`` lists every task sharing the call (singleflight); they all get the position updates.
+    """
+    waiting_prefix = f"waiting for {service}"
+    previous: Dict[str, str] = {}
+
+    def _waiting_tasks() -> List[str]:
+        return (waiting() if waiting else []) or ([task_id] if task_id else [])
+
+    def _on_position(position: int) -> None:
+        for waiting_id in _waiting_tasks():
+            state = tasks.get(waiting_id)
+            if not state:
+                continue
+            if not state.message.startswith("waiting for "):
+                previous[waiting_id] = state.message
+            _update_task(waiting_id, message=f"{waiting_prefix} (queue position {position})")
+
+    limiter = LIMITERS[service]
+    async with limiter.slot(tenant=_task_tenant(task_id), on_position=_on_position, priority=priority or _task_priority(task_id)):
+        for waiting_id, message in previous.items():
+            state = tasks.get(waiting_id)
+            if state and state.message.startswith(waiting_prefix):
+                _update_task(waiting_id, message=message)
+        started = time.monotonic()
+        node = FRAME_NODES.get(str(payload.get("frame"))) if service == "img2vid" else None
+        data, endpoint = await _call_json_api(service, payload, timeout=timeout, node=node)
+        if service == "txt2img" and MODEL_PATHS_NODE_LOCAL:
+            _remember_frame_nodes(data, endpoint.node)
+        if eta:
+            # Service time only: queueing for the slot is not part of the stage's cost
+            stage, units, params = eta
+            ETA.record(stage, time.monotonic() - started, units, **params)
+        return data
+
+
+def _partial_path(path: Path) -> Path:
+    """Hidden sibling to write into before renaming over ``path`` (same directory, so the rename is atomic)."""
+    return path.with_name(f".{path.stem}.{uuid.uuid4().hex[:8]}.part{path.suffix}")
+
+
+async def _run_ffmpeg(cmd: List[str], desc: str) -> None:
+    """Run ffmpeg as a child process; it is killed (and its partial output removed) if the task is cancelled.
+
+    The output (last argument) is written to a temporary sibling and renamed into place on
+    success, so readers and manifest checks never see a half-written file.
+    """
+    out = Path(cmd[-1])
+    out.parent.mkdir(parents=True, exist_ok=True)
+    partial = _partial_path(out)
+    proc = None
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd[:-1], str(partial), stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        _, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        # Unlink before waiting: a second cancellation (e.g. from _gather_or_cancel) may interrupt the wait.
+        # A cancellation during spawn kills the child too, but may leave what it already wrote.
+        if proc is not None and proc.returncode is None:
+            proc.kill()
+        partial.unlink(missing_ok=True)
+        if proc is not None:
+            await proc.wait()
+        raise
     if proc.returncode != 0:
-        raise RuntimeError(f"{desc} failed: {proc.stderr.strip()}")
+        partial.unlink(missing_ok=True)
+        raise RuntimeError(f"{desc} failed: {stderr.decode(errors='replace').strip()}")
+    os.replace(partial, out)
+
+
+def _task_workspace(task_id: str) -> Path:
+    """Private directory for a task's intermediates, so concurrent tasks never share a file name."""
+    path = TMP_DIR / task_id
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _remove_workspace(task_id: str) -> None:
+    shutil.rmtree(TMP_DIR / task_id, ignore_errors=True)
+
+
+def _launch_job(task_id: str, coro) -> asyncio.Task:
+    """Run a pipeline coroutine as a tracked asyncio task so DELETE /v1/jobs/{id} can cancel it."""
+    job = asyncio.ensure_future(coro)
+    running_jobs[task_id] = job
+
+    def _forget(done: asyncio.Task) -> None:
+        if running_jobs.get(task_id) is done:
+            running_jobs.pop(task_id, None)
+
+    job.add_done_callback(_forget)
+    return job
+
+
+def _supersede_task(previous: Optional[str], task_id: str) -> Optional[str]:
+    """Cancel the previous task in favour of task_id if it has not finished yet; returns it when cancelled."""
+    state = tasks.get(previous) if previous else None
+    if not state or state.status not in (TASK_STATUS_PENDING, TASK_STATUS_PROCESSING):
+        return None
+    _update_task(previous, status=TASK_STATUS_CANCELLED, message=f"superseded by {task_id}", finishedAt=_now_iso())
+    job = running_jobs.get(previous)
+    if job and not job.done():
+        job.cancel()
+    return previous
+
+
+def _supersede_shot_edit(project_id: str, shot_id: str, task_id: str) -> Optional[str]:
+    """Make task_id the latest edit of a shot and cancel the previous edit if it has not finished yet."""
+    previous = shot_edits.get((project_id, shot_id))
+    shot_edits[(project_id, shot_id)] = task_id
+    return _supersede_task(previous, task_id)
+
+
+def _shot_render_cache(project_id: str, shot_id: str) -> Dict:
+    """Fingerprints and output paths of a shot's last rendered image, narration and clip."""
+    return project_renders.setdefault(project_id, {"shots": {}, "final": None})["shots"].setdefault(shot_id, {})
+
+
+def _shot_image_payload(shot: Dict, shot_id: str) -> Dict:
+    # 构建 prompt：使用 shot 的 prompt 或 title
+    image_prompt = shot.get("prompt") or shot.get("title") or f"Shot {shot.get('order', 1)}"
+    style = shot.get("transition") or ""  # transition 可作为风格提示
+    if style and not _has_cjk(style):
+        image_prompt = f"{style}, {image_prompt}"
+    return {
+        "prompt": image_prompt,
+        "negative_prompt": DEFAULT_NEGATIVE_PROMPT,
+        "scene_id": shot_id,
+        "style": {
+            "width": DEFAULT_IMG_WIDTH,
+            "height": DEFAULT_IMG_HEIGHT,
+            "num_inference_steps": DEFAULT_IMG_STEPS,
+            "guidance_scale": DEFAULT_CFG_SCALE,
+        },
+    }
+
+
+def _image_fingerprint(payload_img: Dict) -> str:
+    return fingerprint("image", {k: v for k, v in payload_img.items() if k != "scene_id"})
+
+
+def _asset_exists(path: Optional[str]) -> bool:
+    if not path:
+        return False
+    return str(path).startswith(("http://", "https://")) or Path(str(path)).exists()
 
 
 def _to_file_url(path: str) -> str:
@@ -540,29 +1022,71 @@ def _update_task(task_id: str, **kwargs) -> None:
     state = tasks.get(task_id)
     if not state:
         return
+    previous_status = state.status
+    if state.status == TASK_STATUS_CANCELLED:
+        # A cancelled task stays cancelled: late pipeline updates may only add partial results
+        for key in ("status", "progress", "message", "error", "finishedAt"):
+            kwargs.pop(key, None)
     if "parameters" in kwargs:
         raw_params = kwargs.pop("parameters")
         state.parameters = _normalize_parameters(_deep_merge_dict(state.parameters or _default_parameters(), raw_params or {}))
+    result_changed = False
     if "result" in kwargs:
         raw_result = kwargs.pop("result")
+        previous_result = state.result
         state.result = _normalize_result(_deep_merge_dict(state.result or _default_result(), raw_result or {}))
+        result_changed = state.result != previous_result
     for k, v in kwargs.items():
         setattr(state, k, v)
     state.updatedAt = datetime.utcnow().isoformat()
     tasks[task_id] = state
-    if progress_subs.get(task_id):
+    _publish_task(state, state.status != previous_status or "status" in kwargs or _settled_result_change(state, result_changed))
+
+
+def _settled_result_change(state: TaskState, result_changed: bool) -> bool:
+    """Result changes worth journaling: only those made after the task ended (e.g. background alternates).
+
+    Results of a running task are checkpointed per stage in its manifest and land in the journal
+    with the final status, so journaling every stage would rewrite the growing state each time.
+    """
+    return result_changed and state.status in (TASK_STATUS_FINISHED, TASK_STATUS_FAILED, TASK_STATUS_CANCELLED)
+
+
+def _publish_task(state: TaskState, journal: bool) -> None:
+    """Journal a task state (status changes, results added after it ended) and push it to SSE subscribers.
+
+    Pipeline workers hand the state to the API process instead; progress-only updates are not journaled.
+    """
+    if PIPELINE_CHANNEL is not None:
+        PIPELINE_CHANNEL.publish(state.dict())
+        return
+    if JOURNAL is not None and (journal or state.id not in JOURNAL.seen):
+        JOURNAL.task(state.dict())
+    if progress_subs.get(state.id):
         payload = _as_task_schema(state).dict(exclude_none=True)
-        for q in list(progress_subs[task_id]):
+        for q in list(progress_subs[state.id]):
             try:
                 q.put_nowait(payload)
             except Exception:
                 pass
 
 
-def _frame_to_video_fallback(frame_path: str, scene_id: str, fps: int, num_frames: int) -> Path:
+def _apply_worker_state(data: Dict) -> None:
+    """Adopt a task state computed in a pipeline worker; the API process only stores, journals and streams it."""
+    current = tasks.get(data.get("id"))
+    if current is None:
+        return
+    state = TaskState(**data)
+    if current.status == TASK_STATUS_CANCELLED:
+        # As in _update_task: a cancellation made on the API side wins over late worker updates
+        for key in ("status", "progress", "message", "error", "finishedAt"):
+            setattr(state, key, getattr(current, key))
+    tasks[state.id] = state
+    _publish_task(state, state.status != current.status or _settled_result_change(state, state.result != current.result))
+
+
+async def _frame_to_video_fallback(frame_path: str, out: Path, fps: int, num_frames: int) -> Path:
     """If img2vid service is slow/unavailable, fallback to a static video via ffmpeg."""
-    CLIPS_DIR.mkdir(parents=True, exist_ok=True)
-    out = CLIPS_DIR / f"{scene_id}_fallback.mp4"
     duration = max(num_frames / max(fps, 1), 0.5)
     cmd = [
         "ffmpeg",
@@ -583,13 +1107,120 @@ def _frame_to_video_fallback(frame_path: str, scene_id: str, fps: int, num_frame
         "+faststart",
         str(out),
     ]
-    _run_ffmpeg(cmd, f"fallback video for {scene_id}")
+    await _run_ffmpeg(cmd, f"fallback video {out.stem}")
     return out
 
 
-def _compute_clip_frames(req: RenderRequest) -> int:
-    """Determine how many frames to request per clip, favoring duration when provided."""
+async def _mux_scene(
+    video: str,
+    audio_path: str,
+    out_clip: Path,
+    clip_duration: float,
+    video_seconds: float,
+    desc: str,
+    encode_args: Sequence[str] = (),
+) -> Path:
+    """Mux one scene clip with its narration, with short fades at both ends.
+
+    The scene lasts clip_duration; a shorter video is held on its last frame and the
+    narration is padded, so nothing gets cut.
+    """
+    hold = max(clip_duration - video_seconds, 0.0)
+    fade_out_start = max(clip_duration - 0.35, 0.0)
+    vf_filter = "format=yuv420p"
+    if hold > 0.01:
+        vf_filter += f",tpad=stop_mode=clone:stop_duration={hold:.2f}"
+    vf_filter += f",fade=t=in:st=0:d=0.35,fade=t=out:st={fade_out_start:.2f}:d=0.35"
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        video,
+        "-i",
+        audio_path,
+        "-vf",
+        vf_filter,
+        "-c:v",
+        "libx264",
+        *encode_args,
+        "-c:a",
+        "aac",
+        "-af",
+        "apad",
+        "-t",
+        f"{clip_duration:.2f}",
+        str(out_clip),
+    ]
+    await _run_ffmpeg(cmd, desc)
+    return out_clip
+
+
+async def _concat_videos(
+    paths: Sequence[Path],
+    out_path: Path,
+    list_file: Path,
+    desc: str,
+    encode_args: Sequence[str] = (),
+    audio_bitrate: str = "128k",
+) -> Path:
+    """Concatenate muxed scene clips into one streamable MP4."""
+    list_file.parent.mkdir(parents=True, exist_ok=True)
+    with list_file.open("w", encoding="utf-8") as f:
+        for path in paths:
+            f.write(f"file '{Path(path).resolve().as_posix()}'\n")
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_file),
+        "-c:v",
+        "libx264",
+        *encode_args,
+        "-pix_fmt",
+        "yuv420p",
+        "-profile:v",
+        "main",
+        "-c:a",
+        "aac",
+        "-b:a",
+        audio_bitrate,
+        "-movflags",
+        "+faststart",
+        str(out_path),
+    ]
+    await _run_ffmpeg(cmd, desc)
+    return out_path
+
+
+def _draft_request(req: RenderRequest) -> RenderRequest:
+    """Settings for the progressive draft pass: fewer steps, downscaled frame, one image per scene."""
+
+    def _scale(side: int) -> int:
+        return max(int(side * DRAFT_SCALE) // 64 * 64, 256)
+
+    return req.copy(
+        update={
+            "width": min(_scale(req.width), req.width),
+            "height": min(_scale(req.height), req.height),
+            "img_steps": min(req.img_steps, DRAFT_IMG_STEPS),
+            "images_per_scene": 1,
+        }
+    )
+
+
+def _compute_clip_frames(req: RenderRequest, narration_seconds: Optional[float] = None) -> int:
+    """Determine how many frames to request per clip.
+
+    When the scene's narration length is known the clip is sized to cover exactly that
+    (plus NARRATION_TAIL_SECONDS); otherwise fall back to video_frames / clip_seconds.
+    """
     fps = max(req.fps, 1)
+    if narration_seconds:
+        return max(math.ceil((narration_seconds + NARRATION_TAIL_SECONDS) * fps), 8)
     frames_from_duration = int(fps * (getattr(req, "clip_seconds", 0) or 0))
     num_frames = req.video_frames or 0
     if frames_from_duration > 0:
@@ -599,14 +1230,408 @@ def _compute_clip_frames(req: RenderRequest) -> int:
     return max(num_frames, 8)
 
 
+def _probe_duration(path: str) -> Optional[float]:
+    """Return media duration in seconds via ffprobe, or None when it cannot be determined."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", path]
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30)
+        return float(proc.stdout.strip()) if proc.returncode == 0 else None
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+async def _audio_duration(audio: Dict) -> Optional[float]:
+    """Narration length reported by the TTS service, probing the file when it is missing."""
+    try:
+        if audio.get("duration"):
+            return float(audio["duration"])
+    except (TypeError, ValueError):
+        pass
+    path = audio.get("audio") or audio.get("path")
+    if not path or str(path).startswith(("http://", "https://")):
+        return None
+    return await asyncio.to_thread(_probe_duration, str(path))
+
+
 def _save_storyboard(task_id: str, storyboard: List[Dict]) -> str:
     STORYBOARD_DIR.mkdir(parents=True, exist_ok=True)
     path = STORYBOARD_DIR / f"storyboard_{task_id}.json"
-    with path.open("w", encoding="utf-8") as f:
+    partial = _partial_path(path)
+    with partial.open("w", encoding="utf-8") as f:
         json.dump(storyboard, f, ensure_ascii=False, indent=2)
+    os.replace(partial, path)
     return str(path)
 
 
+def _find_scene(state: TaskState, scene_id: str) -> Optional[Dict]:
+    legacy = (state.result or {}).get("legacy") or {}
+    for scene in (legacy.get("task_shots") or {}).get("generated_shots") or []:
+        if scene.get("scene_id") == scene_id:
+            return scene
+    return None
+
+
+async def _generate_alternates(
+    task_id: str,
+    scene: Dict,
+    count: int,
+    alt_task_id: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> List[Dict]:
+    """Render extra images for one scene of a video task and record them under result.alternates."""
+    ctx = task_contexts.get(task_id) or {}
+    req: Optional[RenderRequest] = ctx.get("render_req")
+    negative_prompt = (ctx.get("negative_prompt") or DEFAULT_NEGATIVE_PROMPT).strip()
+    scene_id = scene["scene_id"]
+    images: List[Dict] = []
+    for _ in range(max(count, 1)):
+        payload_img = {
+            "prompt": scene.get("prompt") or scene.get("raw_prompt") or "",
+            "negative_prompt": negative_prompt,
+            "scene_id": scene_id,
+            # Explicit seeds keep alternates distinct from the primary and from each other
+            "seed": random.randint(0, 2**31 - 1),
+            "style": {
+                "width": req.width if req else DEFAULT_IMG_WIDTH,
+                "height": req.height if req else DEFAULT_IMG_HEIGHT,
+                "num_inference_steps": req.img_steps if req else DEFAULT_IMG_STEPS,
+                "guidance_scale": req.cfg_scale if req else DEFAULT_CFG_SCALE,
+            },
+        }
+        img_eta = _image_eta(payload_img["style"]["width"], payload_img["style"]["height"], payload_img["style"]["num_inference_steps"])
+        img_data = await _call_service("txt2img", payload_img, task_id=alt_task_id or task_id, priority=priority, eta=img_eta)
+        for img in (img_data.get("images") or [])[:1]:
+            images.append({"path": img.get("path") or img.get("url") or img.get("image"), **img})
+        if alt_task_id:
+            _update_task(alt_task_id, progress=int(100 * len(images) / max(count, 1)), message=f"alternates {len(images)}/{count}")
+    state = tasks.get(task_id)
+    if state and images:
+        alternates = copy.deepcopy((state.result or {}).get("alternates") or {})
+        alternates[scene_id] = (alternates.get(scene_id) or []) + images
+        _update_task(task_id, result={"alternates": alternates})
+    return images
+
+
+async def _generate_shot_image(project_id: str, shot_id: str, task_id: str, debounce: float = 0.0) -> Optional[str]:
+    """Render the image of one project shot for an edit or batch regeneration task.
+
+    Failures are recorded on the task. Returns the image URL, or None when the task
+    failed or a newer edit of the shot superseded it.
+    """
+    try:
+        if debounce:
+            # Wait for the user to stop typing; a newer edit cancels this task while it sleeps
+            await asyncio.sleep(debounce)
+        shot = project_shots.get(project_id, {}).get(shot_id)
+        if shot is None:
+            raise RuntimeError("shot not found")
+        _update_task(task_id, status=TASK_STATUS_PROCESSING, progress=20, message="generating image...", startedAt=_now_iso())
+
+        # 调用 txt2img 服务
+        payload_img = _shot_image_payload(shot, shot_id)
+        img_eta = _image_eta(DEFAULT_IMG_WIDTH, DEFAULT_IMG_HEIGHT, DEFAULT_IMG_STEPS)
+        img_data = await _call_service("txt2img", payload_img, task_id=task_id, timeout=60.0, eta=img_eta)
+
+        images = img_data.get("images") or []
+        if not images:
+            raise RuntimeError("No images generated")
+
+        image_path = images[0].get("path") or images[0].get("url") or ""
+        image_url = _to_file_url(image_path)
+        if shot_edits.get((project_id, shot_id)) != task_id:
+            return None
+
+        # 更新 shot 数据
+        shot["imagePath"] = image_url
+        shot["status"] = "completed"
+        shot["updatedAt"] = _now_iso()
+        # The next project render reuses this image as long as the shot's prompt stays the same
+        _shot_render_cache(project_id, shot_id).update(image=_image_fingerprint(payload_img), image_path=image_path)
+        _update_task(
+            task_id,
+            status=TASK_STATUS_FINISHED,
+            progress=100,
+            message="shot ready",
+            result={
+                "resource_type": "image",
+                "resource_id": shot_id,
+                "resource_url": image_url,
+            },
+            finishedAt=_now_iso(),
+        )
+        return image_url
+    except Exception as exc:  # noqa: BLE001
+        _update_task(task_id, status=TASK_STATUS_FAILED, message=f"failed: {exc}", error=str(exc), finishedAt=_now_iso())
+        return None
+    finally:
+        if shot_edits.get((project_id, shot_id)) == task_id:
+            shot_edits.pop((project_id, shot_id), None)
+
+
+async def _regenerate_shots(parent_id: str, project_id: str, children: Dict[str, str]) -> None:
+    """Run the per-shot child tasks of a batch regeneration under a shared concurrency limit."""
+    sem = asyncio.Semaphore(SHOT_REGENERATE_CONCURRENCY)
+    total = len(children)
+
+    def _children() -> List[Dict]:
+        items = []
+        for shot_id, child_id in children.items():
+            state = tasks.get(child_id)
+            items.append(
+                {
+                    "shot_id": shot_id,
+                    "task_id": child_id,
+                    "status": state.status if state else TASK_STATUS_CANCELLED,
+                    "progress": state.progress if state else 0,
+                    "resource_url": ((state.result or {}).get("resource_url") or "") if state else "",
+                    "error": (state.error or "") if state else "",
+                }
+            )
+        return items
+
+    def _summary(items: List[Dict]) -> Tuple[Dict[str, int], Dict]:
+        counts = {status: sum(1 for item in items if item["status"] == status) for status in (TASK_STATUS_FINISHED, TASK_STATUS_FAILED, TASK_STATUS_CANCELLED)}
+        resources = [_resource(item["resource_url"], "image", item["shot_id"]) for item in items if item["status"] == TASK_STATUS_FINISHED]
+        return counts, {"children": items, "resources": resources}
+
+    def _refresh() -> None:
+        items = _children()
+        counts, result = _summary(items)
+        _update_task(
+            parent_id,
+            # Child progress includes the running ones; 100 is reserved for the final update
+            progress=min(int(sum(item["progress"] for item in items) / total), 99),
+            message=f"shots {counts[TASK_STATUS_FINISHED]}/{total} done" + (f", {counts[TASK_STATUS_FAILED]} failed" if counts[TASK_STATUS_FAILED] else ""),
+            result=result,
+        )
+
+    async def _child(shot_id: str, child_id: str) -> None:
+        async with sem:
+            state = tasks.get(child_id)
+            if not state or state.status == TASK_STATUS_CANCELLED:
+                return  # superseded by an edit or cancelled while queued
+            try:
+                await _launch_job(child_id, _generate_shot_image(project_id, shot_id, child_id))
+            finally:
+                _refresh()
+
+    _update_task(parent_id, status=TASK_STATUS_PROCESSING, startedAt=_now_iso(), message=f"regenerating {total} shots")
+    try:
+        # return_exceptions: a child cancelled on its own (superseded, DELETE) must not stop its siblings
+        await asyncio.gather(*(_child(shot_id, child_id) for shot_id, child_id in children.items()), return_exceptions=True)
+    except asyncio.CancelledError:
+        for item in _children():
+            if item["status"] in (TASK_STATUS_PENDING, TASK_STATUS_PROCESSING):
+                _update_task(item["task_id"], status=TASK_STATUS_CANCELLED, message=f"batch {parent_id} cancelled", finishedAt=_now_iso())
+        _update_task(parent_id, result={"children": _children()})
+        raise
+    items = _children()
+    counts, result = _summary(items)
+    failed = [item for item in items if item["status"] == TASK_STATUS_FAILED]
+    _update_task(
+        parent_id,
+        status=TASK_STATUS_FAILED if failed and not counts[TASK_STATUS_FINISHED] else TASK_STATUS_FINISHED,
+        progress=100,
+        message=f"shots {counts[TASK_STATUS_FINISHED]}/{total} done"
+        + (f", {len(failed)} failed" if failed else "")
+        + (f", {counts[TASK_STATUS_CANCELLED]} superseded" if counts[TASK_STATUS_CANCELLED] else ""),
+        error="; ".join(f"{item['shot_id']}: {item['error']}" for item in failed),
+        result=result,
+        finishedAt=_now_iso(),
+    )
+
+
+async def _render_project_video(task_id: str, project_id: str) -> None:
+    """Render a project's video from its shots, redoing only the stages whose inputs changed.
+
+    Each shot keeps fingerprints of the inputs behind its image, narration and muxed clip
+    (see _shot_render_cache); a stage is reused while its fingerprint matches and its file
+    still exists, so editing one shot costs one image, one clip and the final concat.
+    """
+    project = projects.get(project_id) or {}
+    shots = sorted(project_shots.get(project_id, {}).values(), key=lambda shot: shot.get("order") or 0)
+    total = max(len(shots), 1)
+    req = RenderRequest(
+        story=project.get("storyText") or project.get("title") or project_id,
+        style=project.get("style") or "",
+        scenes=min(total, 20),
+    )
+    img2vid_max_frames = max(int(os.getenv("IMG2VID_MAX_FRAMES", "48")), 8)
+    img2vid_state: Dict = {"disabled_reason": None}
+    img_sem = asyncio.Semaphore(TXT2IMG_CONCURRENCY)
+    vid_sem = asyncio.Semaphore(IMG2VID_CONCURRENCY)
+    mux_sem = asyncio.Semaphore(FFMPEG_CONCURRENCY)
+    clip_dir = CLIPS_DIR / "projects" / project_id
+    rendered = {"images": 0, "audio": 0, "clips": 0}
+    reused = {"images": 0, "audio": 0, "clips": 0}
+
+    def _advance(stage: str, was_reused: bool) -> None:
+        (reused if was_reused else rendered)[stage] += 1
+        units = sum(rendered.values()) + sum(reused.values())
+        _update_task(
+            task_id,
+            progress=5 + int(85 * units / (3 * total)),
+            message=(
+                f"Images {rendered['images'] + reused['images']}/{total}, Narration {rendered['audio'] + reused['audio']}/{total}, "
+                f"Clips {rendered['clips'] + reused['clips']}/{total} ({sum(reused.values())} reused)"
+            ),
+        )
+
+    async def _shot_image(shot: Dict) -> Tuple[str, str]:
+        shot_id = shot["id"]
+        # An edit of this shot may still be rendering: its image is the one the user asked for
+        edit_job = running_jobs.get(shot_edits.get((project_id, shot_id)) or "")
+        if edit_job and not edit_job.done():
+            await asyncio.wait([edit_job])
+        payload_img = _shot_image_payload(shot, shot_id)
+        key = _image_fingerprint(payload_img)
+        cache = _shot_render_cache(project_id, shot_id)
+        if cache.get("image") == key and _asset_exists(cache.get("image_path")):
+            _advance("images", True)
+            return cache["image_path"], key
+        async with img_sem:
+            img_data = await _call_service("txt2img", payload_img, task_id=task_id, eta=_image_eta(DEFAULT_IMG_WIDTH, DEFAULT_IMG_HEIGHT, DEFAULT_IMG_STEPS))
+        images = img_data.get("images") or []
+        image_path = (images[0].get("path") or images[0].get("url") or images[0].get("image")) if images else None
+        if not image_path:
+            raise RuntimeError(f"No image for shot {shot_id}")
+        shot["imagePath"] = _to_file_url(image_path)
+        shot["status"] = "completed"
+        shot["updatedAt"] = _now_iso()
+        cache.update(image=key, image_path=image_path)
+        _advance("images", False)
+        return image_path, key
+
+    async def _narrate() -> Dict[str, Dict]:
+        # Only shots whose narration text changed go to TTS, all in one call
+        narration: Dict[str, Dict] = {}
+        lines: List[Dict] = []
+        keys: Dict[str, str] = {}
+        for shot in shots:
+            text = shot.get("narration") or shot.get("prompt") or shot.get("title") or ""
+            key = fingerprint("tts", [text, req.speaker or None, req.speed])
+            cache = _shot_render_cache(project_id, shot["id"])
+            if cache.get("audio") == key and _asset_exists(cache.get("audio_path")):
+                narration[shot["id"]] = {"path": cache["audio_path"], "duration": cache.get("audio_duration"), "key": key}
+                _advance("audio", True)
+            else:
+                lines.append({"scene_id": shot["id"], "text": text})
+                keys[shot["id"]] = key
+        if not lines:
+            return narration
+        payload_tts = {"lines": lines, "speaker": req.speaker or None, "speed": req.speed}
+        tts_eta = ("tts", max(sum(len(line["text"]) for line in lines), 1), {"speaker": req.speaker or "default"})
+        tts_data = await _call_service("tts", payload_tts, task_id=task_id, eta=tts_eta)
+        audios = tts_data.get("audios") or []
+        if len(audios) != len(lines):
+            raise RuntimeError("TTS count mismatch")
+        durations = await asyncio.gather(*(_audio_duration(a) for a in audios))
+        for audio, seconds in zip(audios, durations):
+            shot_id = audio.get("scene_id")
+            audio_path = audio.get("audio") or audio.get("path") or audio.get("url")
+            if shot_id not in keys or not audio_path:
+                raise RuntimeError(f"Missing audio for shot {shot_id}")
+            duration = round(seconds, 3) if seconds else None
+            _shot_render_cache(project_id, shot_id).update(audio=keys[shot_id], audio_path=audio_path, audio_duration=duration)
+            shot = project_shots.get(project_id, {}).get(shot_id)
+            if shot is not None:
+                shot["audioPath"] = _to_file_url(audio_path)
+            narration[shot_id] = {"path": audio_path, "duration": duration, "key": keys[shot_id]}
+            _advance("audio", False)
+        return narration
+
+    async def _shot_clip(shot: Dict, image_path: str, image_key: str, audio: Dict) -> Tuple[str, str, float]:
+        shot_id = shot["id"]
+        frames = _compute_clip_frames(req, audio.get("duration"))
+        duration = round(frames / max(req.fps, 1), 2)
+        key = fingerprint("clip", [image_key, audio["key"], req.fps, frames])
+        cache = _shot_render_cache(project_id, shot_id)
+        if cache.get("clip") == key and _asset_exists(cache.get("mux_path")):
+            _advance("clips", True)
+            return cache["mux_path"], key, cache.get("duration") or duration
+        frames_for_service = min(frames, img2vid_max_frames)
+        video = None
+        async with vid_sem:
+            if not img2vid_state["disabled_reason"]:
+                payload_vid = {"frame": image_path, "scene_id": shot_id, "fps": req.fps, "num_frames": frames_for_service}
+                clip_eta = ("clip", frames_for_service, {"resolution": f"{req.width}x{req.height}", "fps": req.fps, "provider": "img2vid"})
+                try:
+                    vid_data = await _call_service("img2vid", payload_vid, task_id=task_id, eta=clip_eta)
+                    video = vid_data.get("video")
+                    if not _asset_exists(video):
+                        raise RuntimeError(f"img2vid returned no usable video for shot {shot_id}: {video}")
+                except Exception as exc:  # noqa: BLE001
+                    video = None
+                    img2vid_state["disabled_reason"] = f"{type(exc).__name__}: {exc}"
+                    print(f"[gateway] img2vid disabled for project render {task_id}: {img2vid_state['disabled_reason']}")
+        if not video:
+            frames_for_service = frames
+            video = str(await _frame_to_video_fallback(image_path, clip_dir / f"{shot_id}_fallback.mp4", req.fps, frames))
+        out_clip = clip_dir / f"{shot_id}.mp4"
+        async with mux_sem:
+            await _mux_scene(video, audio["path"], out_clip, max(duration, 0.01), frames_for_service / max(req.fps, 1), f"mux shot {shot_id}")
+        cache.update(clip=key, mux_path=str(out_clip), duration=duration)
+        shot["videoPath"] = _to_file_url(str(out_clip))
+        shot["duration"] = duration
+        _advance("clips", False)
+        return str(out_clip), key, duration
+
+    _update_task(task_id, status=TASK_STATUS_PROCESSING, progress=5, message=f"rendering {len(shots)} shots", startedAt=_now_iso())
+    try:
+        if not shots:
+            raise RuntimeError("project has no shots")
+        narration_job = asyncio.ensure_future(_narrate())
+
+        async def _shot_pipeline(shot: Dict) -> Tuple[str, str, float]:
+            image_path, image_key = await _shot_image(shot)
+            audio = (await narration_job).get(shot["id"])
+            if not audio:
+                raise RuntimeError(f"Missing audio for shot {shot['id']}")
+            return await _shot_clip(shot, image_path, image_key, audio)
+
+        _, *clips = await _gather_or_cancel(narration_job, *(_shot_pipeline(shot) for shot in shots))
+
+        # Concat only when the clip sequence changed (an edit, a reorder, an added or removed shot)
+        renders = project_renders.setdefault(project_id, {"shots": {}, "final": None})
+        final_key = fingerprint("concat", [key for _, key, _ in clips])
+        final_path = FINAL_DIR / f"{project_id}.mp4"
+        concatenated = renders.get("final") != final_key or not final_path.exists()
+        if concatenated:
+            _update_task(task_id, progress=90, message=f"Concat {len(clips)} clips")
+            started = time.monotonic()
+            await _concat_videos([Path(path) for path, _, _ in clips], final_path, _task_workspace(task_id) / "concat.txt", f"concat project {project_id}")
+            ETA.record("concat", time.monotonic() - started, len(clips))
+            renders["final"] = final_key
+        duration = round(sum(seconds for _, _, seconds in clips), 2)
+        final_url = _to_file_url(str(final_path))
+        project["videoUrl"] = final_url
+        project["duration"] = duration
+        project["updatedAt"] = _now_iso()
+        _update_task(
+            task_id,
+            status=TASK_STATUS_FINISHED,
+            progress=100,
+            message="video ready",
+            result={
+                "resource_type": "video",
+                "resource_id": project_id,
+                "resource_url": final_url,
+                "resources": [_resource(final_url, "video", project_id, meta={"duration": duration})],
+                "rendered": {**rendered, "concat": int(concatenated)},
+                "reused": reused,
+            },
+            finishedAt=_now_iso(),
+        )
+    except asyncio.CancelledError:
+        print(f"[gateway] project render {task_id} cancelled")
+        raise
+    except Exception as exc:  # noqa: BLE001
+        _update_task(task_id, status=TASK_STATUS_FAILED, message=f"failed: {exc}", error=str(exc), finishedAt=_now_iso())
+    finally:
+        # Shot clips live in the project's clip cache; only the concat list was task-private
+        _remove_workspace(task_id)
+
+
 async def _task_event_stream(task_id: str):
     queue: asyncio.Queue = asyncio.Queue()
     progress_subs[task_id].append(queue)
@@ -627,7 +1652,7 @@ async def _task_event_stream(task_id: str):
             progress_subs[task_id].remove(queue)
 
 
-async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
+async def _orchestrate(task_id: str, task_type: str, ctx: Dict, resume: bool = False) -> None:
     _update_task(
         task_id,
         status=TASK_STATUS_PROCESSING,
@@ -636,8 +1661,8 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
         startedAt=datetime.utcnow().isoformat(),
     )
     FINAL_DIR.mkdir(parents=True, exist_ok=True)
-    TMP_DIR.mkdir(parents=True, exist_ok=True)
     STORYBOARD_DIR.mkdir(parents=True, exist_ok=True)
+    task_contexts[task_id] = ctx
 
     # Helper to keep code compact
     render_req: RenderRequest = ctx.get("render_req")  # may be None for non-video tasks
@@ -652,9 +1677,8 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
     try:
         # --- Storyboard only ---
         if task_type == TASK_TYPE_STORYBOARD:
-            async with httpx.AsyncClient() as client:
-                payload_sb = {"story": story, "style": style, "scenes": scenes}
-                sb_data = await _call_json_api(client, LLM_URL, payload_sb)
+            payload_sb = {"story": story, "style": style, "scenes": scenes}
+            sb_data = await _call_service("llm", payload_sb, task_id=task_id, eta=("storyboard", 1, {"scenes": scenes}))
             storyboard = sb_data.get("storyboard") or sb_data.get("shots") or []
             if not storyboard:
                 raise RuntimeError("Storyboard empty")
@@ -693,19 +1717,19 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
             style_hint = (style or "").strip()
             if style_hint and style_hint not in image_prompt:
                 image_prompt = f"{style_hint}, {image_prompt}"
-            async with httpx.AsyncClient() as client:
-                payload_img = {
-                    "prompt": image_prompt,
-                    "negative_prompt": negative_prompt,
-                    "scene_id": "s1",
-                    "style": {
-                        "width": render_req.width if render_req else DEFAULT_IMG_WIDTH,
-                        "height": render_req.height if render_req else DEFAULT_IMG_HEIGHT,
-                        "num_inference_steps": render_req.img_steps if render_req else DEFAULT_IMG_STEPS,
-                        "guidance_scale": render_req.cfg_scale if render_req else DEFAULT_CFG_SCALE,
-                    },
-                }
-                img_data = await _call_json_api(client, TXT2IMG_URL, payload_img)
+            payload_img = {
+                "prompt": image_prompt,
+                "negative_prompt": negative_prompt,
+                "scene_id": "s1",
+                "style": {
+                    "width": render_req.width if render_req else DEFAULT_IMG_WIDTH,
+                    "height": render_req.height if render_req else DEFAULT_IMG_HEIGHT,
+                    "num_inference_steps": render_req.img_steps if render_req else DEFAULT_IMG_STEPS,
+                    "guidance_scale": render_req.cfg_scale if render_req else DEFAULT_CFG_SCALE,
+                },
+            }
+            img_eta = _image_eta(payload_img["style"]["width"], payload_img["style"]["height"], payload_img["style"]["num_inference_steps"])
+            img_data = await _call_service("txt2img", payload_img, task_id=task_id, eta=img_eta)
             images = img_data.get("images") or []
             img_resources = []
             for img in images:
@@ -731,13 +1755,13 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
         # --- Audio (tts) only ---
         if task_type == TASK_TYPE_AUDIO:
             text = prompt_text or story
-            async with httpx.AsyncClient() as client:
-                payload_tts = {
-                    "lines": [{"scene_id": "s1", "text": text}],
-                    "speaker": ctx.get("speaker"),
-                    "speed": ctx.get("speed") or 1.0,
-                }
-                tts_data = await _call_json_api(client, TTS_URL, payload_tts)
+            payload_tts = {
+                "lines": [{"scene_id": "s1", "text": text}],
+                "speaker": ctx.get("speaker"),
+                "speed": ctx.get("speed") or 1.0,
+            }
+            tts_eta = ("tts", max(len(text), 1), {"speaker": ctx.get("speaker") or "default"})
+            tts_data = await _call_service("tts", payload_tts, task_id=task_id, eta=tts_eta)
             audios = tts_data.get("audios") or []
             audio_resources = []
             for a in audios:
@@ -763,10 +1787,20 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
         # --- Full video pipeline (default) ---
         req = render_req
         clip_frames = _compute_clip_frames(req)
-        async with httpx.AsyncClient() as client:
-            # 1) Storyboard
+        pipeline_started = time.monotonic()
+        # Stage checkpoints: a resumed task skips every stage whose artifact is still valid
+        if resume:
+            manifest = TaskManifest.load(task_id, MANIFEST_DIR)
+        else:
+            manifest = TaskManifest(task_id, MANIFEST_DIR)
+            manifest.set_request({**{k: v for k, v in ctx.items() if k != "render_req"}, "render_req": req.dict(), "task_type": task_type})
+        # Intermediates stay private to this task; kept after a failure so a resume can reuse them
+        workspace = _task_workspace(task_id)
+        # 1) Storyboard
+        storyboard = copy.deepcopy(manifest.storyboard)
+        if not storyboard:
             payload_sb = {"story": req.story, "style": req.style, "scenes": req.scenes}
-            sb_data = await _call_json_api(client, LLM_URL, payload_sb)
+            sb_data = await _call_service("llm", payload_sb, task_id=task_id, eta=("storyboard", 1, {"scenes": req.scenes}))
             storyboard = sb_data.get("storyboard") or sb_data.get("shots")
             if not storyboard:
                 raise RuntimeError("Storyboard empty")
@@ -784,252 +1818,355 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
                             "title": last_item.get("title") or f"Shot {extra_idx+1}",
                         }
                     )
-            scene_assets: List[Dict] = []
-            sb_path = _save_storyboard(task_id, storyboard)
-            sb_res = _resource(_to_file_url(sb_path), "storyboard", f"sb_{task_id}")
-            resources.append(sb_res)
-            legacy["storyboard"] = storyboard
-            for idx, item in enumerate(storyboard):
-                scene_id = item.get("scene_id") or item.get("id") or f"s{idx+1}"
-                base_prompt = item.get("prompt") or item.get("description") or ""
-                style_hint = (req.style or "").strip()
-                if style_hint and not _has_cjk(style_hint):
-                    styled_prompt = f"{style_hint}, {base_prompt}"
-                else:
-                    styled_prompt = base_prompt
-                narration_text = item.get("narration") or item.get("text") or base_prompt
-                if scene_assets:
-                    prev_raw = scene_assets[-1].get("raw_prompt") or scene_assets[-1].get("prompt") or ""
-                    continuity = f" consistent with previous shot mood: {prev_raw}" if prev_raw else ""
+            manifest.set_storyboard(storyboard)
+        scene_assets: List[Dict] = []
+        sb_path = _save_storyboard(task_id, storyboard)
+        sb_res = _resource(_to_file_url(sb_path), "storyboard", f"sb_{task_id}")
+        resources.append(sb_res)
+        legacy["storyboard"] = storyboard
+        for idx, item in enumerate(storyboard):
+            scene_id = item.get("scene_id") or item.get("id") or f"s{idx+1}"
+            base_prompt = item.get("prompt") or item.get("description") or ""
+            style_hint = (req.style or "").strip()
+            if style_hint and not _has_cjk(style_hint):
+                styled_prompt = f"{style_hint}, {base_prompt}"
+            else:
+                styled_prompt = base_prompt
+            narration_text = item.get("narration") or item.get("text") or base_prompt
+            if scene_assets and scene_assets[-1].get("raw_prompt") == base_prompt:
+                # Repeated (padded) scene: reuse the previous prompt so the dedup layer can share its assets
+                scene_prompt = scene_assets[-1]["prompt"]
+            elif scene_assets:
+                prev_raw = scene_assets[-1].get("raw_prompt") or scene_assets[-1].get("prompt") or ""
+                continuity = f" consistent with previous shot mood: {prev_raw}" if prev_raw else ""
+                scene_prompt = f"{styled_prompt}{continuity}"
+            else:
+                scene_prompt = styled_prompt
+            scene_assets.append(
+                {
+                    "scene_id": scene_id,
+                    "order": idx + 1,
+                    "title": item.get("title") or f"Shot {idx+1}",
+                    "prompt": scene_prompt,
+                    "raw_prompt": base_prompt,
+                    "description": item.get("description") or "",
+                    "narration": narration_text,
+                    "style": req.style,
+                }
+            )
+        legacy["task_shots"]["generated_shots"] = scene_assets
+        legacy["task_shots"]["total_shots"] = len(scene_assets)
+        tts_chars = sum(len(scene.get("narration") or "") for scene in scene_assets)
+        _update_task(
+            task_id,
+            progress=10,
+            message=f"Storyboard ready ({len(scene_assets)} shots)",
+            result={"resources": resources, "legacy": legacy},
+            estimatedDuration=_refined_estimate(req, pipeline_started, tts_chars, {"storyboard": 1}),
+        )
+
+        # 2) Per-scene DAG: image -> clip -> mux runs per scene as soon as its inputs exist.
+        # TTS only needs the storyboard, so it starts right away and overlaps the GPU stages;
+        # in progressive mode the draft and the final pass share the same narration.
+        total = len(scene_assets)
+        img2vid_max_frames = max(int(os.getenv("IMG2VID_MAX_FRAMES", "48")), 8)
+        img2vid_fail_fast = os.getenv("IMG2VID_FAIL_FAST", "1") != "0"
+        img2vid_disable_after_failures = max(int(os.getenv("IMG2VID_DISABLE_AFTER_FAILURES", "1")), 1)
+        img2vid_validate_output = os.getenv("IMG2VID_VALIDATE_OUTPUT", "1") != "0"
+        img2vid_min_bytes = max(int(os.getenv("IMG2VID_MIN_BYTES", "4096")), 0)
+        # Scenes with identical stage inputs (e.g. padded copies) share one downstream call
+        dedup = StageDedup()
+        narration = {"tts": 0}
+        audios: List[Dict] = []
+        # Published intermediate outputs (the progressive draft) stay listed next to the scene assets
+        extra_resources: List[Dict] = []
+
+        def _scene_resources() -> List[Dict]:
+            """Rebuild the resource list in storyboard order from whatever has completed so far."""
+            items = [sb_res]
+            for scene in scene_assets:
+                meta = {"order": scene["order"]}
+                for img in scene.get("images") or []:
+                    items.append(_resource(_to_file_url(img.get("path") or ""), "image", scene["scene_id"], meta={**meta, "raw": img}))
+                if scene.get("video"):
+                    items.append(_resource(_to_file_url(scene["video"]), "video_clip", scene["scene_id"], meta={**meta, "frames": scene.get("frames")}))
+                if scene.get("audio"):
+                    items.append(_resource(_to_file_url(scene.get("audio_path") or ""), "audio", scene["scene_id"], meta={"raw": scene["audio"]}))
+                if scene.get("mux"):
+                    items.append(_resource(_to_file_url(scene["mux"]), "mux_video", scene["scene_id"], meta=meta))
+            return items + extra_resources
+
+        async def _narrate() -> Dict[str, Dict]:
+            # Only unique (text, speaker, speed) lines go to TTS; repeated scenes reuse the first audio
+            lines: List[Dict] = []
+            first_scene: Dict[str, str] = {}
+            alias: Dict[str, str] = {}
+            checkpoints: Dict[str, str] = {}
+            unique_audios: List[Dict] = []
+            for scene in scene_assets:
+                text = scene.get("narration") or scene.get("prompt") or ""
+                audio_key = fingerprint("tts", [text, req.speaker or None, req.speed])
+                if audio_key in first_scene:
+                    dedup.hits["tts"] += 1
                 else:
-                    continuity = ""
-                scene_assets.append(
-                    {
-                        "scene_id": scene_id,
-                        "order": idx + 1,
-                        "title": item.get("title") or f"Shot {idx+1}",
-                        "prompt": f"{styled_prompt}{continuity}",
-                        "raw_prompt": base_prompt,
-                        "description": item.get("description") or "",
-                        "narration": narration_text,
-                        "style": req.style,
-                    }
+                    first_scene[audio_key] = scene["scene_id"]
+                    cached = manifest.get(scene["scene_id"], "audio", audio_key)
+                    if cached:
+                        unique_audios.append(cached)
+                    else:
+                        checkpoints[scene["scene_id"]] = audio_key
+                        lines.append({"scene_id": scene["scene_id"], "text": text})
+                alias[scene["scene_id"]] = first_scene[audio_key]
+            if lines:
+                payload_tts = {"lines": lines, "speaker": req.speaker or None, "speed": req.speed}
+                tts_eta = ("tts", max(sum(len(line["text"]) for line in lines), 1), {"speaker": req.speaker or "default"})
+                tts_data = await _call_service("tts", payload_tts, task_id=task_id, eta=tts_eta)
+                fresh_audios = tts_data.get("audios") or []
+                if len(fresh_audios) != len(lines):
+                    raise RuntimeError("TTS count mismatch")
+                unique_audios.extend(fresh_audios)
+            unique_map = {a["scene_id"]: a for a in unique_audios}
+            for scene in scene_assets:
+                source = unique_map.get(alias[scene["scene_id"]])
+                if source:
+                    audios.append(source if source["scene_id"] == scene["scene_id"] else {**source, "scene_id": scene["scene_id"]})
+            audio_map = {a["scene_id"]: a for a in audios}
+            durations = await asyncio.gather(*(_audio_duration(a) for a in audios))
+            for audio, seconds in zip(audios, durations):
+                if seconds:
+                    audio["duration"] = round(seconds, 3)
+            for scene_id, audio_key in checkpoints.items():
+                audio = unique_map.get(scene_id)
+                if audio:
+                    manifest.record(scene_id, "audio", audio_key, audio, path=audio.get("audio") or audio.get("path"))
+            for idx, scene in enumerate(scene_assets):
+                audio = audio_map.get(scene["scene_id"])
+                if audio:
+                    scene_assets[idx]["audio"] = audio
+                    scene_assets[idx]["audio_path"] = audio.get("audio") or audio.get("path")
+            legacy["task_audio"]["generated_audios"] = audios
+            legacy["task_audio"]["total_audios"] = len(audios)
+            narration["tts"] = 1
+            _update_task(task_id, result={"resources": _scene_resources(), "legacy": legacy})
+            return audio_map
+
+        async def _render_pass(preq: RenderRequest, draft: bool, span: Tuple[int, int]) -> Tuple[Path, List[Dict]]:
+            """Run the per-scene DAG and the concat at one quality level; returns the video and its clips."""
+            img_sem = asyncio.Semaphore(TXT2IMG_CONCURRENCY)
+            vid_sem = asyncio.Semaphore(IMG2VID_CONCURRENCY)
+            mux_sem = asyncio.Semaphore(FFMPEG_CONCURRENCY)
+            # The draft never calls img2vid: static clips are orders of magnitude cheaper than SVD
+            img2vid_state: Dict = {"failures": 0, "disabled_reason": "draft pass" if draft else None}
+            clip_params = {"resolution": f"{preq.width}x{preq.height}", "fps": preq.fps}
+            encode_args = DRAFT_ENCODE_ARGS if draft else []
+            suffix = "_draft" if draft else ""
+            label = "Draft: " if draft else ""
+            done = {"images": 0, "clips": 0, "mux": 0}
+            clips: List[Optional[Dict]] = [None] * total
+
+            def _advance(stage: str) -> None:
+                done[stage] += 1
+                units = done["images"] + done["clips"] + done["mux"] + narration["tts"] * total
+                legacy["task_shots"]["generated_shots"] = scene_assets
+                legacy["task_shots"]["total_shots"] = total
+                legacy["task_video"]["clips"] = [c for c in clips if c]
+                # The draft shares nothing but TTS with the final, so only final-pass counters shrink its estimate
+                counters = {"storyboard": 1, "tts": narration["tts"], **({} if draft else {"draft": 1, **done})}
+                _update_task(
+                    task_id,
+                    estimatedDuration=_refined_estimate(req, pipeline_started, tts_chars, counters),
+                    progress=span[0] + int((span[1] - span[0]) * units / (4 * total)),
+                    message=(
+                        f"{label}Images {done['images']}/{total}, Videos {done['clips']}/{total}, "
+                        f"TTS {'ready' if narration['tts'] else 'pending'}, Mux {done['mux']}/{total}"
+                    ),
+                    result={"resources": _scene_resources(), "legacy": legacy},
                 )
-            legacy["task_shots"]["generated_shots"] = scene_assets
-            legacy["task_shots"]["total_shots"] = len(scene_assets)
-            _update_task(task_id, progress=10, message=f"Storyboard ready ({len(scene_assets)} shots)", result={"resources": resources, "legacy": legacy})
 
-            # 2) TXT2IMG
-            frames: List[Dict] = []
-            for idx, scene in enumerate(scene_assets):
-                scene_images: List[Dict] = []
+            async def _txt2img_once(payload_img: Dict) -> Optional[Dict]:
+                async with img_sem:
+                    img_data = await _call_service("txt2img", payload_img, task_id=task_id, eta=_image_eta(preq.width, preq.height, preq.img_steps))
+                images = img_data.get("images") or []
+                if not images:
+                    return None
+                image_path = images[0].get("path") or images[0].get("url") or images[0].get("image")
+                return {"path": image_path, **images[0]}
+
+            async def _scene_image(idx: int, scene: Dict) -> str:
                 payload_img = {
                     "prompt": scene["prompt"],
                     "negative_prompt": negative_prompt,
                     "scene_id": scene["scene_id"],
                     "style": {
-                        "width": req.width,
-                        "height": req.height,
-                        "num_inference_steps": req.img_steps,
-                        "guidance_scale": req.cfg_scale,
+                        "width": preq.width,
+                        "height": preq.height,
+                        "num_inference_steps": preq.img_steps,
+                        "guidance_scale": preq.cfg_scale,
                     },
                 }
-                for _ in range(max(req.images_per_scene, 1)):
-                    img_data = await _call_json_api(client, TXT2IMG_URL, payload_img)
-                    images = img_data.get("images") or []
-                    if not images:
-                        continue
-                    image_path = images[0].get("path") or images[0].get("url") or images[0].get("image")
-                    scene_images.append({"path": image_path, **images[0]})
+                # Only the primary image is on the critical path; alternates are generated lazily
+                image_key = {k: v for k, v in payload_img.items() if k != "scene_id"}
+                checkpoint = fingerprint("image", image_key)
+                primary = None if draft else manifest.get(scene["scene_id"], "image", checkpoint)
+                if not primary:
+                    primary = await dedup.run("image", checkpoint, lambda: _txt2img_once(payload_img))
+                    if primary and not draft:
+                        manifest.record(scene["scene_id"], "image", checkpoint, primary, path=primary["path"])
+                scene_images = [primary] if primary else []
                 if not scene_images:
                     raise RuntimeError(f"No image for scene {scene['scene_id']}")
                 primary = scene_images[0]
-                frames.append({"scene_id": scene["scene_id"], "path": primary["path"]})
                 scene_assets[idx]["image"] = primary
                 scene_assets[idx]["image_path"] = primary["path"]
                 scene_assets[idx]["images"] = scene_images
-                for img in scene_images:
-                    resources.append(_resource(_to_file_url(img.get("path") or ""), "image", scene["scene_id"], meta={"order": scene["order"], "raw": img}))
-                legacy["task_shots"]["generated_shots"] = scene_assets
-                legacy["task_shots"]["total_shots"] = len(scene_assets)
-                _update_task(
-                    task_id,
-                    progress=20 + int(20 * (idx + 1) / len(scene_assets)),
-                    message=f"Images {idx+1}/{len(scene_assets)}",
-                    result={"resources": resources, "legacy": legacy},
-                )
-
-            # 3) IMG2VID
-            clips: List[Dict] = []
-            img2vid_max_frames = max(int(os.getenv("IMG2VID_MAX_FRAMES", "48")), 8)
-            img2vid_fail_fast = os.getenv("IMG2VID_FAIL_FAST", "1") != "0"
-            img2vid_disable_after_failures = max(int(os.getenv("IMG2VID_DISABLE_AFTER_FAILURES", "1")), 1)
-            img2vid_validate_output = os.getenv("IMG2VID_VALIDATE_OUTPUT", "1") != "0"
-            img2vid_min_bytes = max(int(os.getenv("IMG2VID_MIN_BYTES", "4096")), 0)
-            img2vid_failures = 0
-            img2vid_disabled_reason: Optional[str] = None
-            for idx, scene in enumerate(scene_assets):
-                frame_path = scene.get("image_path") or next((f["path"] for f in frames if f["scene_id"] == scene["scene_id"]), "")
-                frames_for_service = min(clip_frames, img2vid_max_frames)
-                if img2vid_disabled_reason:
-                    video = str(_frame_to_video_fallback(frame_path, scene["scene_id"], req.fps, frames_for_service))
+                _advance("images")
+                return primary["path"]
+
+            async def _render_clip(scene_id: str, frame_path: str, needed_frames: int) -> Tuple[str, int]:
+                frames_for_service = min(needed_frames, img2vid_max_frames)
+                async with vid_sem:
+                    video = None
+                    if not img2vid_state["disabled_reason"]:
+                        payload_vid = {
+                            "frame": frame_path,
+                            "scene_id": scene_id,
+                            "fps": preq.fps,
+                            "num_frames": frames_for_service,
+                        }
+                        try:
+                            vid_data = await _call_service(
+                                "img2vid",
+                                payload_vid,
+                                task_id=task_id,
+                                eta=("clip", frames_for_service, {**clip_params, "provider": "img2vid"}),
+                            )
+                            video = vid_data.get("video")
+                            if not video:
+                                raise RuntimeError(f"No video for scene {scene_id}")
+                            if img2vid_validate_output and not str(video).startswith(("http://", "https://")):
+                                p = Path(str(video))
+                                if not p.exists():
+                                    raise RuntimeError(f"img2vid returned missing video path: {video}")
+                                if img2vid_min_bytes and p.stat().st_size < img2vid_min_bytes:
+                                    raise RuntimeError(f"img2vid returned too-small video ({p.stat().st_size} bytes): {video}")
+                        except Exception as exc:
+                            video = None
+                            img2vid_state["failures"] += 1
+                            if img2vid_fail_fast or img2vid_state["failures"] >= img2vid_disable_after_failures:
+                                img2vid_state["disabled_reason"] = f"{type(exc).__name__}: {exc}"
+                                print(f"[gateway] img2vid disabled for task {task_id}: {img2vid_state['disabled_reason']}")
+                if not video:
+                    frames_for_service = needed_frames
+                    started = time.monotonic()
+                    video = str(await _frame_to_video_fallback(frame_path, workspace / f"{scene_id}{suffix}_fallback.mp4", preq.fps, frames_for_service))
+                    ETA.record("clip", time.monotonic() - started, frames_for_service, **clip_params, provider="fallback")
+                return video, frames_for_service
+
+            async def _scene_clip(idx: int, scene: Dict, frame_path: str, narration_seconds: Optional[float]) -> Dict:
+                # Narration-first sizing: only ask img2vid for the frames the final cut will use.
+                # Clips capped by IMG2VID_MAX_FRAMES are held on their last frame during mux.
+                needed_frames = _compute_clip_frames(preq, narration_seconds)
+                checkpoint = fingerprint("clip", [frame_path, preq.fps, needed_frames])
+                cached = None if draft else manifest.get(scene["scene_id"], "clip", checkpoint)
+                if cached:
+                    video, frames_for_service = cached
                 else:
-                    payload_vid = {
-                        "frame": frame_path,
-                        "scene_id": scene["scene_id"],
-                        "fps": req.fps,
-                        "num_frames": frames_for_service,
-                    }
-                    try:
-                        vid_data = await _call_json_api(
-                            client,
-                            IMG2VID_URL,
-                            payload_vid,
-                            timeout=float(os.getenv("IMG2VID_TIMEOUT", "240")),
-                        )
-                        video = vid_data.get("video")
-                        if not video:
-                            raise RuntimeError(f"No video for scene {scene['scene_id']}")
-                        if img2vid_validate_output and not str(video).startswith(("http://", "https://")):
-                            p = Path(str(video))
-                            if not p.exists():
-                                raise RuntimeError(f"img2vid returned missing video path: {video}")
-                            if img2vid_min_bytes and p.stat().st_size < img2vid_min_bytes:
-                                raise RuntimeError(f"img2vid returned too-small video ({p.stat().st_size} bytes): {video}")
-                    except Exception as exc:
-                        img2vid_failures += 1
-                        if img2vid_fail_fast or img2vid_failures >= img2vid_disable_after_failures:
-                            img2vid_disabled_reason = f"{type(exc).__name__}: {exc}"
-                            print(f"[gateway] img2vid disabled for task {task_id}: {img2vid_disabled_reason}")
-                        video = str(_frame_to_video_fallback(frame_path, scene["scene_id"], req.fps, frames_for_service))
-                clips.append({"scene_id": scene["scene_id"], "video": video, "order": scene["order"], "frames": frames_for_service})
+                    video, frames_for_service = await dedup.run("clip", checkpoint, lambda: _render_clip(scene["scene_id"], frame_path, needed_frames))
+                    if not draft:
+                        manifest.record(scene["scene_id"], "clip", checkpoint, [video, frames_for_service], path=video)
+                duration = round(needed_frames / max(preq.fps, 1), 2)
+                clip = {"scene_id": scene["scene_id"], "video": video, "order": scene["order"], "frames": frames_for_service, "duration": duration}
+                clips[idx] = clip
                 scene_assets[idx]["video"] = video
                 scene_assets[idx]["frames"] = frames_for_service
-                resources.append(_resource(_to_file_url(video), "video_clip", scene["scene_id"], meta={"order": scene["order"], "frames": frames_for_service}))
-                legacy["task_video"]["clips"] = clips
-                legacy["task_video"]["fps"] = str(req.fps)
-                legacy["task_video"]["resolution"] = f"{req.width}x{req.height}"
-                legacy["task_video"]["format"] = "mp4"
-                legacy["task_shots"]["generated_shots"] = scene_assets
-                legacy["task_shots"]["total_shots"] = len(scene_assets)
-                _update_task(
-                    task_id,
-                    progress=40 + int(20 * (idx + 1) / len(scene_assets)),
-                    message=f"Videos {idx+1}/{len(scene_assets)}",
-                    result={"resources": resources, "legacy": legacy},
-                )
-
-            # 4) TTS
-            lines = [{"scene_id": scene["scene_id"], "text": scene.get("narration") or scene.get("prompt") or ""} for scene in scene_assets]
-            payload_tts = {"lines": lines, "speaker": req.speaker or None, "speed": req.speed}
-            tts_data = await _call_json_api(client, TTS_URL, payload_tts)
-            audios = tts_data.get("audios") or []
-            if len(audios) != len(lines):
-                raise RuntimeError("TTS count mismatch")
-            audio_map = {a["scene_id"]: a for a in audios}
-            for idx, scene in enumerate(scene_assets):
+                scene_assets[idx]["duration"] = duration
+                _advance("clips")
+                return clip
+
+            async def _scene_mux(idx: int, clip: Dict, audio_path: str) -> Path:
+                scene_id = clip["scene_id"]
+                clip["audio"] = audio_path
+                out_clip = workspace / f"{scene_id}{suffix}_mux.mp4"
+                # The scene lasts as long as its narration-sized duration; a shorter img2vid clip is
+                # held on its last frame and the narration is padded, so nothing gets cut.
+                pass_frames = _compute_clip_frames(preq)
+                clip_duration = max(float(clip.get("duration") or 0.0), (clip.get("frames") or pass_frames) / max(preq.fps, 1), 0.01)
+                video_seconds = (clip.get("frames") or pass_frames) / max(preq.fps, 1)
+                checkpoint = fingerprint("mux", [clip["video"], audio_path, round(clip_duration, 2), video_seconds, str(out_clip)])
+                if draft or not manifest.get(scene_id, "mux", checkpoint):
+                    async with mux_sem:
+                        started = time.monotonic()
+                        await _mux_scene(clip["video"], audio_path, out_clip, clip_duration, video_seconds, f"mux {scene_id}{suffix}", encode_args)
+                        if not draft:
+                            ETA.record("mux", time.monotonic() - started)
+                            manifest.record(scene_id, "mux", checkpoint, str(out_clip), path=str(out_clip))
+                clip["mux"] = str(out_clip)
+                scene_assets[idx]["mux"] = str(out_clip)
+                _advance("mux")
+                return out_clip
+
+            async def _scene_pipeline(idx: int, scene: Dict) -> Path:
+                frame_path = await _scene_image(idx, scene)
+                # Clip length depends on the narration, so the clip waits for TTS (which started first)
+                audio_map = await tts_job
                 audio = audio_map.get(scene["scene_id"])
-                if audio:
-                    scene_assets[idx]["audio"] = audio
-                    scene_assets[idx]["audio_path"] = audio.get("audio") or audio.get("path")
-            for clip in clips:
-                audio = audio_map.get(clip["scene_id"])
-                if audio:
-                    clip["audio"] = audio.get("audio") or audio.get("path")
-            for a in audios:
-                resources.append(_resource(_to_file_url(a.get("audio") or a.get("path") or ""), "audio", a.get("scene_id"), meta={"raw": a}))
-            legacy["task_audio"]["generated_audios"] = audios
-            legacy["task_audio"]["total_audios"] = len(audios)
-            legacy["task_video"]["clips"] = clips
-            legacy["task_shots"]["generated_shots"] = scene_assets
-            _update_task(
-                task_id,
-                progress=70,
-                message="TTS ready",
-                result={"resources": resources, "legacy": legacy},
-            )
-
-        # 5) Mux clips and audio
-        muxed: List[Path] = []
-        for idx, clip in enumerate(clips):
-            scene_id = clip["scene_id"]
-            audio = audio_map.get(scene_id)
-            if not audio:
-                raise RuntimeError(f"Missing audio for scene {scene_id}")
-            audio_path = clip.get("audio") or audio.get("audio") or audio.get("path") or audio.get("url")
-            if not audio_path:
-                raise RuntimeError(f"Missing audio path for scene {scene_id}")
-            out_clip = TMP_DIR / f"{scene_id}_mux.mp4"
-            # Keep per-clip duration (from frames/fps) for fades and audio padding
-            clip_duration = max((clip.get("frames", clip_frames) or clip_frames) / max(req.fps, 1), 0.01)
-            fade_out_start = max(clip_duration - 0.35, 0.0)
-            vf_filter = f"format=yuv420p,fade=t=in:st=0:d=0.35,fade=t=out:st={fade_out_start:.2f}:d=0.35"
-            cmd = [
-                "ffmpeg",
-                "-y",
-                "-i",
-                clip["video"],
-                "-i",
-                audio_path,
-                "-vf",
-                vf_filter,
-                "-c:v",
-                "libx264",
-                "-c:a",
-                "aac",
-                "-af",
-                "apad",
-                "-shortest",
-                str(out_clip),
-            ]
-            await asyncio.to_thread(_run_ffmpeg, cmd, f"mux {scene_id}")
-            muxed.append(out_clip)
-            clip["mux"] = str(out_clip)
-            for scene in scene_assets:
-                if scene["scene_id"] == scene_id:
-                    scene["mux"] = str(out_clip)
-                    break
-            resources.append(_resource(_to_file_url(str(out_clip)), "mux_video", scene_id, meta={"order": clip.get("order")}))
-            legacy["task_video"]["clips"] = clips
-            _update_task(
-                task_id,
-                progress=75 + int(15 * (idx + 1) / len(clips)),
-                message=f"Mux {idx+1}/{len(clips)}",
-                result={"resources": resources, "legacy": legacy},
+                if not audio:
+                    raise RuntimeError(f"Missing audio for scene {scene['scene_id']}")
+                audio_path = audio.get("audio") or audio.get("path") or audio.get("url")
+                if not audio_path:
+                    raise RuntimeError(f"Missing audio path for scene {scene['scene_id']}")
+                clip = await _scene_clip(idx, scene, frame_path, audio.get("duration"))
+                return await _scene_mux(idx, clip, audio_path)
+
+            _, *muxed = await _gather_or_cancel(tts_job, *(_scene_pipeline(idx, scene) for idx, scene in enumerate(scene_assets)))
+            pass_clips = [c for c in clips if c]
+            legacy["task_video"]["clips"] = pass_clips
+
+            # 3) Concat (the only barrier across scenes)
+            _update_task(task_id, progress=span[1], message=f"{label}Concat {len(muxed)} clips")
+            out_path = FINAL_DIR / (f"draft_{task_id}.mp4" if draft else f"final_{task_id}.mp4")
+            started = time.monotonic()
+            await _concat_videos(
+                muxed,
+                out_path,
+                workspace / f"concat{suffix}.txt",
+                f"concat videos{suffix}",
+                encode_args,
+                DRAFT_AUDIO_BITRATE if draft else "128k",
             )
+            if not draft:
+                ETA.record("concat", time.monotonic() - started, max(len(muxed), 1))
+            return out_path, pass_clips
 
-        # 6) Concat
-        list_file = TMP_DIR / f"concat_{task_id}.txt"
-        with list_file.open("w", encoding="utf-8") as f:
-            for path in muxed:
-                f.write(f"file '{path.resolve().as_posix()}'\n")
-        final_path = FINAL_DIR / f"final_{task_id}.mp4"
-        cmd_concat = [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(list_file),
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
-            "-profile:v",
-            "main",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "128k",
-            "-movflags",
-            "+faststart",
-            str(final_path),
-        ]
-        await asyncio.to_thread(_run_ffmpeg, cmd_concat, "concat videos")
-
-        total_duration_sec = round(sum(c.get("frames", clip_frames) for c in clips) / max(req.fps, 1), 2)
+        tts_job = asyncio.ensure_future(_narrate())
+        try:
+            if req.progressive and not resume:
+                # Fast preview first so the user can judge the cut (or cancel) before the expensive pass
+                draft_req = _draft_request(req)
+                draft_path, draft_clips = await _render_pass(draft_req, True, (10, 40))
+                draft_duration = round(sum(c.get("duration") or 0.0 for c in draft_clips), 2)
+                draft_url = _to_file_url(draft_path)
+                extra_resources.append(_resource(draft_url, "video_draft", task_id, meta={"duration": draft_duration, "resolution": f"{draft_req.width}x{draft_req.height}"}))
+                _update_task(
+                    task_id,
+                    progress=40,
+                    message="Draft ready, rendering final",
+                    result={
+                        "draft": {"resource_url": draft_url, "duration": draft_duration, "resolution": f"{draft_req.width}x{draft_req.height}"},
+                        "resources": _scene_resources(),
+                        "legacy": legacy,
+                    },
+                )
+                final_path, clips = await _render_pass(req, False, (40, 90))
+            else:
+                final_path, clips = await _render_pass(req, False, (10, 90))
+        finally:
+            if not tts_job.done():
+                tts_job.cancel()
+        if dedup.stats():
+            print(f"[gateway] task {task_id} reused duplicate scene assets: {dedup.stats()}")
+
+        total_duration_sec = round(sum(c.get("duration") or c.get("frames", clip_frames) / max(req.fps, 1) for c in clips), 2)
         final_url = _to_file_url(final_path)
         final_res = _resource(final_url, "video", task_id, meta={"duration": total_duration_sec})
         legacy["task_video"]["path"] = str(final_path)
@@ -1056,6 +2193,13 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
             },
             finishedAt=datetime.utcnow().isoformat(),
         )
+        _remove_workspace(task_id)
+        manifest.delete()
+    except asyncio.CancelledError:
+        # Completed stages were already published by _advance; record the legacy snapshot as-is
+        _update_task(task_id, result={"legacy": legacy})
+        print(f"[gateway] task {task_id} cancelled")
+        raise
     except Exception as exc:  # noqa: BLE001
         _update_task(
             task_id,
@@ -1065,12 +2209,265 @@ async def _orchestrate(task_id: str, task_type: str, ctx: Dict) -> None:
         )
 
 
+async def _run_pipeline(task_id: str, task_type: str, ctx: Dict, resume: bool = False) -> None:
+    """Run a task's pipeline on this event loop or, with PIPELINE_EXECUTOR=process, in a worker process."""
+    if PIPELINE_POOL is None:
+        await _orchestrate(task_id, task_type, ctx, resume)
+    else:
+        # Kept on the API side for resume and on-demand alternates
+        task_contexts[task_id] = ctx
+        try:
+            await PIPELINE_POOL.run(task_id, tasks[task_id].dict(), task_type, ctx, resume, ETA.snapshot())
+        except RuntimeError as exc:
+            _update_task(task_id, status=TASK_STATUS_FAILED, message=f"failed: {exc}", error=str(exc), finishedAt=_now_iso())
+            return
+    _start_background_alternates(task_id)
+
+
+def _start_background_alternates(task_id: str) -> None:
+    """Fill in the extra images per scene of a published video as a job of its own, after the pipeline is done."""
+    state = tasks.get(task_id)
+    req: Optional[RenderRequest] = (task_contexts.get(task_id) or {}).get("render_req")
+    if ALTERNATES_MODE != "background" or not req or req.images_per_scene <= 1 or not state or state.status != TASK_STATUS_FINISHED:
+        return
+    scenes = (((state.result or {}).get("legacy") or {}).get("task_shots") or {}).get("generated_shots") or []
+
+    async def _alternates() -> None:
+        for scene in scenes:
+            try:
+                await _generate_alternates(task_id, scene, req.images_per_scene - 1, priority=TASK_PRIORITY_BATCH)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[gateway] alternates for {task_id}/{scene['scene_id']} failed: {exc}")
+
+    job = asyncio.ensure_future(_alternates())
+    background_jobs[task_id] = job
+    job.add_done_callback(lambda done: background_jobs.pop(task_id, None) if background_jobs.get(task_id) is done else None)
+
+
+def _pipeline_worker(conn) -> None:
+    """Entry point of a pipeline worker process: runs _orchestrate for tasks sent by the API process."""
+    global JOURNAL, PIPELINE_CHANNEL, PIPELINE_POOL
+    channel = WorkerChannel(conn)
+    # The API process owns the journal, the downstream slots and the learned ETA rates
+    JOURNAL = None
+    PIPELINE_POOL = None
+    PIPELINE_CHANNEL = channel
+    LIMITERS.update({name: channel.limiter(name) for name in LIMITERS})
+    ETA.on_record = channel.eta
+
+    def _run(task_id: str, state: Dict, task_type: str, ctx: Dict, resume: bool, eta: Dict) -> asyncio.Task:
+        tasks[task_id] = TaskState(**state)
+        ETA.restore(eta)
+        job = _launch_job(task_id, _orchestrate(task_id, task_type, ctx, resume))
+
+        def _forget(done: asyncio.Task) -> None:
+            if running_jobs.get(task_id) is None:
+                tasks.pop(task_id, None)
+                task_contexts.pop(task_id, None)
+
+        job.add_done_callback(_forget)
+        return job
+
+    def _cancel(task_id: str) -> None:
+        job = running_jobs.get(task_id)
+        if job and not job.done():
+            job.cancel()
+
+    async def _serve() -> None:
+        HTTP_POOL.start()
+        _start_node_probes()
+        try:
+            await channel.serve(_run, _cancel)
+        finally:
+            _stop_node_probes()
+            await HTTP_POOL.aclose()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def _limiter_slot(service: str, **kwargs):
+    return LIMITERS[service].slot(**kwargs)
+
+
+PIPELINE_POOL: Optional[WorkerPool] = (
+    WorkerPool(PIPELINE_WORKERS, _pipeline_worker, _limiter_slot, _apply_worker_state, ETA.record)
+    if PIPELINE_EXECUTOR == "process"
+    else None
+)
+
+
+@app.on_event("startup")
+async def _start_pipeline_pool() -> None:
+    if PIPELINE_POOL is not None:
+        PIPELINE_POOL.start()
+        print(f"[gateway] running pipelines in {PIPELINE_POOL.size} worker processes")
+
+
+@app.on_event("shutdown")
+async def _stop_pipeline_pool() -> None:
+    if PIPELINE_POOL is not None:
+        PIPELINE_POOL.close()
+
+
+@app.on_event("startup")
+async def _recover_tasks() -> None:
+    """Reload journaled tasks and continue the ones a restart interrupted from their last completed stage."""
+    if JOURNAL is None:
+        return
+    states, keys = JOURNAL.replay()
+    for task_id, data in states.items():
+        try:
+            tasks.setdefault(task_id, TaskState(**data))
+        except Exception as exc:  # noqa: BLE001
+            print(f"[gateway] journal: skipping unreadable task {task_id}: {exc}")
+    now = time.time()
+    idempotency_keys.update({key: entry for key, entry in keys.items() if now - entry[1] <= IDEMPOTENCY_TTL})
+    resumed = failed = 0
+    for state in list(tasks.values()):
+        if state.status not in (TASK_STATUS_PENDING, TASK_STATUS_BLOCKED, TASK_STATUS_PROCESSING):
+            continue
+        ctx = None
+        if RECOVER_INTERRUPTED and (state.type or TASK_TYPE_VIDEO) == TASK_TYPE_VIDEO:
+            ctx = _resume_context(state.id, TaskManifest.load(state.id, MANIFEST_DIR))
+        if ctx:
+            _restart_video_task(state.id, ctx, "resuming after gateway restart")
+            resumed += 1
+        else:
+            _update_task(
+                state.id,
+                status=TASK_STATUS_FAILED,
+                message="interrupted by gateway restart",
+                error="interrupted by gateway restart",
+                finishedAt=_now_iso(),
+            )
+            failed += 1
+    JOURNAL.compact([state.dict() for state in tasks.values()], idempotency_keys, JOURNAL_RETENTION, IDEMPOTENCY_TTL)
+    if states:
+        print(f"[gateway] journal replayed {len(states)} tasks: {resumed} resumed, {failed} marked failed")
+
+
+@app.on_event("shutdown")
+async def _close_journal() -> None:
+    if JOURNAL is not None:
+        await JOURNAL.aclose()
+
+
+@app.on_event("startup")
+async def _sweep_workspaces() -> None:
+    """Remove workspaces left behind by tasks that cannot be resumed anymore (crashes, expired failures)."""
+    if not TMP_DIR.is_dir():
+        return
+    cutoff = time.time() - WORKSPACE_RETENTION
+    removed = 0
+    for path in TMP_DIR.iterdir():
+        state = tasks.get(path.name)
+        if state and state.status in (TASK_STATUS_PENDING, TASK_STATUS_BLOCKED, TASK_STATUS_PROCESSING):
+            continue
+        try:
+            stale = (state is not None and state.status == TASK_STATUS_FINISHED) or path.stat().st_mtime < cutoff
+        except OSError:
+            continue
+        if stale:
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            removed += 1
+    if removed:
+        print(f"[gateway] removed {removed} stale task workspaces")
+
+
+@app.on_event("startup")
+async def _sweep_manifests() -> None:
+    """Remove checkpoints of tasks that cannot be resumed: finished, or no longer known (past JOURNAL_RETENTION)."""
+    if not MANIFEST_DIR.is_dir():
+        return
+    removed = 0
+    for path in MANIFEST_DIR.glob("*.json*"):
+        task_id = path.name.split(".", 1)[0]
+        state = tasks.get(task_id)
+        if state is None or state.status == TASK_STATUS_FINISHED:
+            path.unlink(missing_ok=True)
+            removed += 1
+    if removed:
+        print(f"[gateway] removed {removed} stale task manifests")
+
+
+async def _check_node(service: str, endpoint: Endpoint) -> bool:
+    resp = await HTTP_POOL.client(service, endpoint.socket).get(health_url(endpoint.url), timeout=NODE_HEALTH_TIMEOUT)
+    return resp.status_code < 500
+
+
+def _start_node_probes() -> None:
+    for name, pool in NODES.items():
+        pool.start_probing(lambda endpoint, name=name: _check_node(name, endpoint), NODE_HEALTH_INTERVAL)
+
+
+def _stop_node_probes() -> None:
+    for pool in NODES.values():
+        pool.stop_probing()
+
+
+@app.on_event("startup")
+async def _start_http_pool() -> None:
+    HTTP_POOL.start()
+    _start_node_probes()
+
+
+@app.on_event("shutdown")
+async def _close_http_pool() -> None:
+    _stop_node_probes()
+    await HTTP_POOL.aclose()
+
+
+@app.get("/v1/scheduler")
+async def scheduler_stats():
+    """Current slot usage, queue length, per-tenant wait stats and coalesced calls per downstream service."""
+    coalesced = SINGLEFLIGHT.stats()
+    stats = {
+        name: {**limiter.stats(), "coalesced": coalesced.get(name, 0), "http": HTTP_POOL.stats(name), "nodes": NODES[name].stats()}
+        for name, limiter in LIMITERS.items()
+    }
+    if PIPELINE_POOL is not None:
+        stats["pipeline_workers"] = PIPELINE_POOL.stats()
+    return stats
+
+
+@app.get("/v1/eta")
+async def eta_stats():
+    """Learned per-unit stage rates (seconds per image / frame / character / clip) behind estimatedDuration."""
+    return ETA.stats()
+
+
+@app.get("/v1/capacity")
+async def capacity():
+    """Admission limits, active tasks and the Retry-After a new task of each type would get."""
+    return ADMISSION.capacity(tasks.values(), ADMISSION_LIMITS.keys())
+
+
 @app.post("/render", response_model=RenderResponse)
-async def render(req: RenderRequest, background_tasks: BackgroundTasks):
+async def render(
+    req: RenderRequest,
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+):
+    # Scoped by the resolved tenant, which hashes API keys: the key is journaled and must not carry the secret
+    scoped_key = f"{_resolve_tenant(x_tenant_id, x_api_key, None, '')}:render:{idempotency_key}" if idempotency_key else None
+    existing = _idempotent_task(scoped_key)
+    if existing:
+        return RenderResponse(job_id=existing, message="duplicate of accepted task", error="")
+    _admit(TASK_TYPE_VIDEO)
     task_id = str(uuid.uuid4())
     now = datetime.utcnow().isoformat()
     tasks[task_id] = TaskState(
         id=task_id,
+        tenant=_resolve_tenant(x_tenant_id, x_api_key, None, task_id),
+        priority=_resolve_priority(req.priority, TASK_TYPE_VIDEO),
+        estimatedDuration=_estimate_task(TASK_TYPE_VIDEO, req)[0],
         status=TASK_STATUS_PENDING,
         progress=0,
         message="queued",
@@ -1081,26 +2478,35 @@ async def render(req: RenderRequest, background_tasks: BackgroundTasks):
         updatedAt=now,
         type=TASK_TYPE_VIDEO,
     )
-    background_tasks.add_task(
-        _orchestrate,
+    _launch_job(
         task_id,
-        TASK_TYPE_VIDEO,
-        {
-            "render_req": req,
-            "story": req.story,
-            "style": req.style,
-            "scenes": req.scenes,
-            "prompt_text": "",
-            "speaker": req.speaker,
-            "speed": req.speed,
-        },
+        _run_pipeline(
+            task_id,
+            TASK_TYPE_VIDEO,
+            {
+                "render_req": req,
+                "story": req.story,
+                "style": req.style,
+                "scenes": req.scenes,
+                "prompt_text": "",
+                "speaker": req.speaker,
+                "speed": req.speed,
+            },
+        ),
     )
+    _remember_idempotency(scoped_key, task_id)
     return RenderResponse(job_id=task_id, message="accepted", error="")
 
 
 @app.post("/v1/generate", response_model=RenderResponse, tags=["v1"])
 @app.post("/v1/generate", response_model=RenderResponse, include_in_schema=False) # Alias for backward compatibility
-async def generate_vi(req: GeneratePayload, background_tasks: BackgroundTasks):
+async def generate_vi(
+    req: GeneratePayload,
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None),
+    dry_run: bool = False,
+):
     params = req.parameters if req.parameters is not None else GenerateParameters()
     shot_defaults = params.shot_defaults or ShotDefaults()
     shot = params.shot or ShotParam()
@@ -1142,7 +2548,27 @@ async def generate_vi(req: GeneratePayload, background_tasks: BackgroundTasks):
         video_frames=frames,
         speaker=tts.voice,
         speed=1.0,
+        progressive=bool(req.progressive),
     )
+    task_type = req.type or TASK_TYPE_VIDEO
+    estimate, breakdown = _estimate_task(task_type, render_req, prompt_text)
+    if dry_run:
+        # Estimate only: nothing is queued and admission limits are reported, not enforced
+        return JSONResponse(
+            {
+                "type": task_type,
+                "estimatedDuration": estimate,
+                "stages": breakdown,
+                "retry_after": ADMISSION.retry_after(tasks.values(), task_type),
+            }
+        )
+    # Retries (e.g. asynq re-POSTing the same task) attach to the task the first attempt created
+    key = idempotency_key or req.id
+    scoped_key = f"{_resolve_tenant(x_tenant_id, x_api_key, req.project_id, '')}:generate:{key}" if key else None
+    existing = _idempotent_task(scoped_key)
+    if existing:
+        return RenderResponse(job_id=existing, message="duplicate of accepted task", error="")
+    _admit(task_type)
     task_id = str(uuid.uuid4())
     now = datetime.utcnow().isoformat()
     normalized_params = _parameters_from_generate(params, shot_defaults, shot, video, tts)
@@ -1155,32 +2581,37 @@ async def generate_vi(req: GeneratePayload, background_tasks: BackgroundTasks):
         id=task_id,
         project_id=req.project_id,
         shot_id=shot.shot_id,
-        type=req.type or TASK_TYPE_VIDEO,
+        tenant=_resolve_tenant(x_tenant_id, x_api_key, req.project_id, task_id),
+        priority=_resolve_priority(req.priority, task_type),
+        type=task_type,
         status=TASK_STATUS_PENDING,
         progress=0,
         message=req.message or "queued",
         parameters=normalized_params,
         result=_normalize_result(req.result),
         error=req.error or "",
-        estimatedDuration=req.estimatedDuration or 0,
+        estimatedDuration=estimate,
         createdAt=now,
         updatedAt=now,
     )
-    background_tasks.add_task(
-        _orchestrate,
+    _launch_job(
         task_id,
-        req.type or TASK_TYPE_VIDEO,
-        {
-            "render_req": render_req,
-            "story": story,
-            "style": style,
-            "scenes": scenes,
-            "prompt_text": prompt_text,
-            "negative_prompt": negative_prompt,
-            "speaker": tts.voice,
-            "speed": 1.0,
-        },
+        _run_pipeline(
+            task_id,
+            task_type,
+            {
+                "render_req": render_req,
+                "story": story,
+                "style": style,
+                "scenes": scenes,
+                "prompt_text": prompt_text,
+                "negative_prompt": negative_prompt,
+                "speaker": tts.voice,
+                "speed": 1.0,
+            },
+        ),
     )
+    _remember_idempotency(scoped_key, task_id)
     return RenderResponse(job_id=task_id, message="accepted", error="")
 
 
@@ -1222,10 +2653,124 @@ async def stop_job(job_id: str):
     if not state:
         raise HTTPException(status_code=404, detail="task not found")
     now = _now_iso()
+    if state.status == TASK_STATUS_FINISHED:
+        # A published video stays finished; stopping it only drops the alternates still being generated
+        background = background_jobs.get(job_id)
+        if background and not background.done():
+            background.cancel()
+        return {"success": True, "deleteAT": now, "error": ""}
     _update_task(job_id, status=TASK_STATUS_CANCELLED, message="stopped by user", finishedAt=now)
+    # Stop the pipeline itself: in-flight httpx calls abort, ffmpeg children are killed and
+    # queued limiter slots are released by the CancelledError unwinding through them
+    job = running_jobs.get(job_id)
+    if job and not job.done():
+        job.cancel()
     return {"success": True, "deleteAT": now, "error": ""}
 
 
+def _resume_context(job_id: str, manifest: TaskManifest) -> Optional[Dict]:
+    """Pipeline context of a video task: in memory while the process lives, else from its manifest."""
+    ctx = task_contexts.get(job_id)
+    if ctx is None and manifest.request and manifest.request.get("render_req"):
+        ctx = {**manifest.request, "render_req": RenderRequest(**manifest.request["render_req"])}
+    return ctx if ctx and ctx.get("render_req") else None
+
+
+def _restart_video_task(job_id: str, ctx: Dict, message: str) -> None:
+    """Re-enter a stopped video task into the pipeline; stages checkpointed in its manifest are skipped."""
+    state = tasks[job_id]
+    # Set directly: _update_task keeps cancelled tasks cancelled
+    state.status = TASK_STATUS_PENDING
+    state.error = ""
+    state.finishedAt = None
+    _update_task(job_id, status=TASK_STATUS_PENDING, progress=0, message=message)
+    _launch_job(job_id, _run_pipeline(job_id, TASK_TYPE_VIDEO, ctx, resume=True))
+
+
+@app.post("/v1/jobs/{job_id}/resume")
+async def resume_job(job_id: str, resume_from: Optional[str] = None):
+    """Restart a failed or cancelled video task from its first missing stage artifact."""
+    state = tasks.get(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="task not found")
+    if (state.type or TASK_TYPE_VIDEO) != TASK_TYPE_VIDEO:
+        raise HTTPException(status_code=400, detail="only video tasks can be resumed")
+    job = running_jobs.get(job_id)
+    if state.status not in (TASK_STATUS_FAILED, TASK_STATUS_CANCELLED) or (job and not job.done()):
+        raise HTTPException(status_code=409, detail=f"task is {state.status}, only failed or cancelled tasks can be resumed")
+    if resume_from and resume_from not in MANIFEST_STAGES:
+        raise HTTPException(status_code=400, detail=f"resume_from must be one of {', '.join(MANIFEST_STAGES)}")
+    manifest = TaskManifest.load(job_id, MANIFEST_DIR)
+    ctx = _resume_context(job_id, manifest)
+    if not ctx:
+        raise HTTPException(status_code=409, detail="no checkpoint for this task")
+    _admit(TASK_TYPE_VIDEO)
+    if resume_from:
+        manifest.drop_from(resume_from)
+    _restart_video_task(job_id, ctx, f"resuming from {resume_from}" if resume_from else "resuming")
+    return {"job_id": job_id, "message": "resuming", "checkpoints": manifest.completed()}
+
+
+@app.post("/v1/jobs/{job_id}/scenes/{scene_id}/alternates")
+async def scene_alternates(job_id: str, scene_id: str, count: Optional[int] = None):
+    """Generate alternate images for one scene of a video job on demand."""
+    state = tasks.get(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="task not found")
+    scene = _find_scene(state, scene_id)
+    if not scene:
+        raise HTTPException(status_code=404, detail="scene not found")
+    req: Optional[RenderRequest] = (task_contexts.get(job_id) or {}).get("render_req")
+    default_count = max((req.images_per_scene if req else 1) - 1, 1)
+    count = max(1, min(count or default_count, 3))
+    alt_task_id = str(uuid.uuid4())
+    now = _now_iso()
+    tasks[alt_task_id] = TaskState(
+        id=alt_task_id,
+        project_id=state.project_id,
+        tenant=state.tenant,
+        priority=TASK_PRIORITY_NORMAL,
+        shot_id=scene_id,
+        type=TASK_TYPE_SHOT,
+        status=TASK_STATUS_PENDING,
+        progress=0,
+        message="alternates queued",
+        parameters=copy.deepcopy(state.parameters) if state.parameters else _default_parameters(),
+        result=_default_result(),
+        error="",
+        createdAt=now,
+        updatedAt=now,
+    )
+
+    async def alternates_task():
+        _update_task(alt_task_id, status=TASK_STATUS_PROCESSING, startedAt=_now_iso(), message="generating alternates")
+        try:
+            images = await _generate_alternates(job_id, scene, count, alt_task_id=alt_task_id)
+            img_resources = [
+                _resource(_to_file_url(img.get("path") or ""), "image", scene_id, meta={"alternate": True, "raw": img}) for img in images
+            ]
+            primary_res = img_resources[0] if img_resources else _resource("", "image", scene_id)
+            _update_task(
+                alt_task_id,
+                status=TASK_STATUS_FINISHED,
+                progress=100,
+                message="alternates ready",
+                result={
+                    "resource_type": "image",
+                    "resource_id": primary_res["resource_id"],
+                    "resource_url": primary_res["resource_url"],
+                    "resources": img_resources,
+                    "legacy": {"task_shots": {"generated_shots": images, "total_shots": len(images), "total_time": 0.0}},
+                },
+                finishedAt=_now_iso(),
+            )
+        except Exception as exc:  # noqa: BLE001
+            _update_task(alt_task_id, status=TASK_STATUS_FAILED, message=f"failed: {exc}", error=str(exc))
+
+    _launch_job(alt_task_id, alternates_task())
+    return {"job_id": job_id, "scene_id": scene_id, "task_id": alt_task_id, "count": count, "message": "accepted"}
+
+
 # ---- Project & shot endpoints (spec stubs) ----
 def _get_or_404_project(project_id: str) -> Dict:
     project = projects.get(project_id)
@@ -1390,8 +2935,84 @@ async def list_shots(project_id: str):
     return {"project_id": project_id, "total_shots": len(shots), "shots": shots}
 
 
+@app.post("/v1/projects/{project_id}/shots:regenerate")
+async def regenerate_shots(
+    project_id: str,
+    body: Optional[ShotRegenerateRequest] = None,
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+):
+    """Regenerate the images of several shots (default: all) as one parent task with a child task per shot."""
+    _get_or_404_project(project_id)
+    shots = project_shots[project_id]
+    if body and body.shot_ids:
+        shot_ids = list(dict.fromkeys(body.shot_ids))
+        missing = [shot_id for shot_id in shot_ids if shot_id not in shots]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"shots not found: {', '.join(missing)}")
+    else:
+        shot_ids = sorted(shots, key=lambda shot_id: shots[shot_id].get("order") or 0)
+    if not shot_ids:
+        raise HTTPException(status_code=400, detail="project has no shots")
+
+    parent_id = str(uuid.uuid4())
+    now = _now_iso()
+    tenant = _resolve_tenant(x_tenant_id, x_api_key, project_id, parent_id)
+    image_eta = _eta_seconds(_image_eta(DEFAULT_IMG_WIDTH, DEFAULT_IMG_HEIGHT, DEFAULT_IMG_STEPS))
+    parallel = min(SHOT_REGENERATE_CONCURRENCY, SERVICE_SLOTS["txt2img"])
+    tasks[parent_id] = TaskState(
+        id=parent_id,
+        project_id=project_id,
+        tenant=tenant,
+        priority=TASK_PRIORITY_NORMAL,
+        estimatedDuration=int(math.ceil(math.ceil(len(shot_ids) / parallel) * image_eta)),
+        type=TASK_TYPE_SHOT,
+        status=TASK_STATUS_PENDING,
+        progress=0,
+        message=f"regenerating {len(shot_ids)} shots",
+        createdAt=now,
+        updatedAt=now,
+    )
+    children: Dict[str, str] = {}
+    for shot_id in shot_ids:
+        child_id = str(uuid.uuid4())
+        tasks[child_id] = TaskState(
+            id=child_id,
+            project_id=project_id,
+            shot_id=shot_id,
+            parent_id=parent_id,
+            tenant=tenant,
+            # A whole-project refresh must not starve interactive single-shot edits
+            priority=TASK_PRIORITY_NORMAL,
+            estimatedDuration=int(math.ceil(image_eta)),
+            type=TASK_TYPE_SHOT,
+            status=TASK_STATUS_PENDING,
+            progress=0,
+            message="queued in batch regeneration",
+            createdAt=now,
+            updatedAt=now,
+        )
+        _supersede_shot_edit(project_id, shot_id, child_id)
+        children[shot_id] = child_id
+    _launch_job(parent_id, _regenerate_shots(parent_id, project_id, children))
+    return {
+        "task_id": parent_id,
+        "project_id": project_id,
+        "children": [{"shot_id": shot_id, "task_id": child_id} for shot_id, child_id in children.items()],
+        "message": "regenerating",
+    }
+
+
 @app.post("/v1/projects/{project_id}/shots/{shot_id}")
-async def update_shot(project_id: str, shot_id: str, background_tasks: BackgroundTasks, title: Optional[str] = None, prompt: Optional[str] = None, transition: Optional[str] = None):
+async def update_shot(
+    project_id: str,
+    shot_id: str,
+    title: Optional[str] = None,
+    prompt: Optional[str] = None,
+    transition: Optional[str] = None,
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+):
     _get_or_404_project(project_id)
     shots = project_shots[project_id]
     if shot_id not in shots:
@@ -1413,6 +3034,9 @@ async def update_shot(project_id: str, shot_id: str, background_tasks: Backgroun
         id=task_id,
         project_id=project_id,
         shot_id=shot_id,
+        tenant=_resolve_tenant(x_tenant_id, x_api_key, project_id, task_id),
+        priority=TASK_PRIORITY_INTERACTIVE,
+        estimatedDuration=int(math.ceil(_eta_seconds(_image_eta(DEFAULT_IMG_WIDTH, DEFAULT_IMG_HEIGHT, DEFAULT_IMG_STEPS)))),
         type=TASK_TYPE_SHOT,
         status=TASK_STATUS_PENDING,
         progress=0,
@@ -1421,73 +3045,14 @@ async def update_shot(project_id: str, shot_id: str, background_tasks: Backgroun
         updatedAt=now,
     )
     
+    superseded = _supersede_shot_edit(project_id, shot_id, task_id)
+
     # [修正] 真正调用 txt2img 服务生成图片
     async def real_shot_task():
-        try:
-            if task_id in tasks:
-                tasks[task_id].status = TASK_STATUS_PROCESSING
-                tasks[task_id].progress = 20
-                tasks[task_id].message = "generating image..."
-                tasks[task_id].updatedAt = _now_iso()
-            
-            # 构建 prompt：使用 shot 的 prompt 或 title
-            image_prompt = shot.get("prompt") or shot.get("title") or f"Shot {shot.get('order', 1)}"
-            style = shot.get("transition") or ""  # transition 可作为风格提示
-            if style and not _has_cjk(style):
-                image_prompt = f"{style}, {image_prompt}"
-            
-            # 调用 txt2img 服务
-            payload_img = {
-                "prompt": image_prompt,
-                "negative_prompt": DEFAULT_NEGATIVE_PROMPT,
-                "scene_id": shot_id,
-                "style": {
-                    "width": DEFAULT_IMG_WIDTH,
-                    "height": DEFAULT_IMG_HEIGHT,
-                    "num_inference_steps": DEFAULT_IMG_STEPS,
-                    "guidance_scale": DEFAULT_CFG_SCALE,
-                },
-            }
-            
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                resp = await client.post(TXT2IMG_URL, json=payload_img)
-                if resp.status_code != 200:
-                    raise RuntimeError(f"txt2img failed: {resp.status_code} - {resp.text}")
-                img_data = resp.json()
-            
-            images = img_data.get("images") or []
-            if not images:
-                raise RuntimeError("No images generated")
-            
-            image_path = images[0].get("path") or images[0].get("url") or ""
-            image_url = _to_file_url(image_path)
-            
-            # 更新 shot 数据
-            shot["imagePath"] = image_url
-            shot["status"] = "completed"
-            shot["updatedAt"] = _now_iso()
-            shots[shot_id] = shot
-            
-            if task_id in tasks:
-                tasks[task_id].status = TASK_STATUS_FINISHED
-                tasks[task_id].progress = 100
-                tasks[task_id].message = "shot ready"
-                tasks[task_id].result = {
-                    "resource_type": "image",
-                    "resource_id": shot_id,
-                    "resource_url": image_url,
-                }
-                tasks[task_id].updatedAt = _now_iso()
-                tasks[task_id].finishedAt = _now_iso()
-        except Exception as exc:
-            if task_id in tasks:
-                tasks[task_id].status = TASK_STATUS_FAILED
-                tasks[task_id].message = f"failed: {exc}"
-                tasks[task_id].error = str(exc)
-                tasks[task_id].updatedAt = _now_iso()
-    
-    background_tasks.add_task(real_shot_task)
-    return {"shot_id": shot_id, "task_id": task_id, "message": "updated"}
+        await _generate_shot_image(project_id, shot_id, task_id, debounce=SHOT_DEBOUNCE_SECONDS)
+
+    _launch_job(task_id, real_shot_task())
+    return {"shot_id": shot_id, "task_id": task_id, "message": "updated", "superseded": superseded}
 
 
 @app.get("/v1/projects/{project_id}/shots/{shot_id}")
@@ -1524,8 +3089,13 @@ async def project_tts(project_id: str):
 
 
 @app.post("/v1/projects/{project_id}/video")
-async def project_video(project_id: str, background_tasks: BackgroundTasks):
+async def project_video(
+    project_id: str,
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None),
+):
     _get_or_404_project(project_id)
+    _admit(TASK_TYPE_VIDEO)
     task_id = str(uuid.uuid4())
     now = _now_iso()
     
@@ -1533,6 +3103,8 @@ async def project_video(project_id: str, background_tasks: BackgroundTasks):
     tasks[task_id] = TaskState(
         id=task_id,
         project_id=project_id,
+        tenant=_resolve_tenant(x_tenant_id, x_api_key, project_id, task_id),
+        priority=TASK_PRIORITY_NORMAL,
         type=TASK_TYPE_VIDEO,
         status=TASK_STATUS_PENDING,
         progress=0,
@@ -1540,31 +3112,12 @@ async def project_video(project_id: str, background_tasks: BackgroundTasks):
         createdAt=now,
         updatedAt=now,
     )
-    
-    # 模拟后台处理 - 几秒后完成
-    async def mock_video_task():
-        import asyncio
-        await asyncio.sleep(2)
-        if task_id in tasks:
-            tasks[task_id].status = TASK_STATUS_PROCESSING
-            tasks[task_id].progress = 50
-            tasks[task_id].message = "generating video..."
-            tasks[task_id].updatedAt = _now_iso()
-        await asyncio.sleep(2)
-        if task_id in tasks:
-            tasks[task_id].status = TASK_STATUS_FINISHED
-            tasks[task_id].progress = 100
-            tasks[task_id].message = "video ready"
-            tasks[task_id].result = {
-                "resource_type": "video",
-                "resource_id": project_id,
-                "resource_url": f"/files/final/{project_id}.mp4",
-            }
-            tasks[task_id].updatedAt = _now_iso()
-            tasks[task_id].finishedAt = _now_iso()
-    
-    background_tasks.add_task(mock_video_task)
-    return {"task_id": task_id, "message": "accepted", "project_id": project_id}
+    # Two renders of one project would write the same clip files: the newest one wins
+    renders = project_renders.setdefault(project_id, {"shots": {}, "final": None})
+    superseded = _supersede_task(renders.get("task_id"), task_id)
+    renders["task_id"] = task_id
+    _launch_job(task_id, _render_project_video(task_id, project_id))
+    return {"task_id": task_id, "message": "accepted", "project_id": project_id, "superseded": superseded}
 
 
 # CLI entry: uvicorn gateway.main:app --host 0.0.0.0 --port 8000
@@ -24,6 +24,9 @@ from gateway.schemas.task import (
     TASK_TYPE_SHOT,
     TASK_TYPE_AUDIO,
     TASK_TYPE_VIDEO,
+    TASK_PRIORITY_INTERACTIVE,
+    TASK_PRIORITY_NORMAL,
+    TASK_PRIORITY_BATCH,
 )
 
 from gateway.schemas.generate import (
@@ -39,6 +42,7 @@ from gateway.schemas.generate import (
 
 from gateway.schemas.project import (
     ShotSchema,
+    ShotRegenerateRequest,
 )
 
 __all__ = [
@@ -75,4 +79,5 @@ __all__ = [
     "GeneratePayload",
     # Project
     "ShotSchema",
+    "ShotRegenerateRequest",
 ]
@@ -20,12 +20,14 @@ class RenderRequest(BaseModel):
     height: int = Field(DEFAULT_IMG_HEIGHT, ge=256, le=2048)
     img_steps: int = Field(DEFAULT_IMG_STEPS, ge=1, le=50)
     cfg_scale: float = Field(DEFAULT_CFG_SCALE, ge=0.0, le=20.0)
-    images_per_scene: int = Field(1, ge=1, le=3, description="每个分镜生成的图片数量")
+    images_per_scene: int = Field(1, ge=1, le=3, description="每个分镜生成的图片数量，首张用于视频，其余延后生成")
     fps: int = Field(12, ge=4, le=30)
     clip_seconds: float = Field(5.0, ge=1.0, le=30.0, description="单个分镜时长（秒）")
     video_frames: int = Field(60, ge=8, le=480, description="单个分镜帧数")
     speaker: Optional[str] = Field(None, description="TTS 说话人")
     speed: float = Field(1.0, ge=0.5, le=2.0, description="TTS 语速")
+    priority: Optional[str] = Field(None, description="调度优先级：interactive / normal / batch")
+    progressive: bool = Field(False, description="先快速出低质量草稿视频，再后台渲染最终版本")
 
 
 class RenderResponse(BaseModel):
@@ -96,6 +98,8 @@ class GeneratePayload(BaseModel):
     finishedAt: Optional[str] = None
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
+    priority: Optional[str] = None
+    progressive: Optional[bool] = None
     
     class Config:
         # Allow both snake_case and camelCase for Worker compatibility
@@ -1,6 +1,8 @@
 """Project and Shot schemas."""
 
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
 
 
 class ShotSchema(BaseModel):
@@ -22,3 +24,11 @@ class ShotSchema(BaseModel):
     transition: str = ""
     createdAt: str
     updatedAt: str
+
+
+class ShotRegenerateRequest(BaseModel):
+    """Body of the batch shot regeneration endpoint; no shot ids means every shot of the project."""
+    shot_ids: Optional[List[str]] = Field(None, alias="shotIds")
+
+    class Config:
+        populate_by_name = True
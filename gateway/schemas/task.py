@@ -18,6 +18,11 @@ TASK_TYPE_SHOT = "generate_shot"
 TASK_TYPE_AUDIO = "generate_audio"
 TASK_TYPE_VIDEO = "generate_video"
 
+# Task priorities (downstream slots go to interactive first, batch last)
+TASK_PRIORITY_INTERACTIVE = "interactive"
+TASK_PRIORITY_NORMAL = "normal"
+TASK_PRIORITY_BATCH = "batch"
+
 
 class TaskState(BaseModel):
     """Internal task state representation."""
@@ -36,6 +41,11 @@ class TaskState(BaseModel):
     finishedAt: Optional[str] = None
     createdAt: Optional[str] = None
     updatedAt: Optional[str] = None
+    # Scheduling identity for fair sharing of downstream slots (tenant header, project or task id)
+    tenant: Optional[str] = None
+    priority: Optional[str] = None
+    # Batch task this task belongs to (per-shot children of a project-wide regeneration)
+    parent_id: Optional[str] = None
 
 
 class TaskShotParameters(BaseModel):
@@ -0,0 +1,109 @@
+"""Admission control for new gateway tasks.
+
+Every accepted render holds GPU-bound work for minutes, so the gateway caps
+how many tasks of each type may be pending or processing at once. Requests
+beyond the cap are rejected up front with a Retry-After estimate (when the
+earliest running task of that type is expected to finish) instead of piling
+up in BackgroundTasks until they time out. Each active task's
+estimatedDuration is used when present, otherwise the type's recent mean.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from gateway.schemas.task import TASK_STATUS_BLOCKED, TASK_STATUS_FINISHED, TASK_STATUS_PENDING, TASK_STATUS_PROCESSING
+
+ACTIVE_STATUSES = (TASK_STATUS_PENDING, TASK_STATUS_BLOCKED, TASK_STATUS_PROCESSING)
+DURATION_SAMPLES = 20
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class AdmissionController:
+    """Per-task-type caps on active (pending + processing) tasks.
+
+    A limit of 0 (or a type without a limit) admits everything.
+    """
+
+    def __init__(self, limits: Dict[str, int], default_retry_after: int = 30, max_retry_after: int = 600) -> None:
+        self.limits = {task_type: max(int(limit), 0) for task_type, limit in limits.items()}
+        self.default_retry_after = max(int(default_retry_after), 1)
+        self.max_retry_after = max(int(max_retry_after), self.default_retry_after)
+        self.rejected: Dict[str, int] = {}
+
+    @staticmethod
+    def _of_type(states: Iterable[Any], task_type: str) -> List[Any]:
+        return [state for state in states if (state.type or "") == task_type]
+
+    def active(self, states: Iterable[Any], task_type: str) -> List[Any]:
+        return [state for state in self._of_type(states, task_type) if state.status in ACTIVE_STATUSES]
+
+    def typical_duration(self, states: Iterable[Any], task_type: str) -> Optional[float]:
+        """Mean wall time of the most recently finished tasks of this type."""
+        samples = []
+        for state in self._of_type(states, task_type):
+            if state.status != TASK_STATUS_FINISHED:
+                continue
+            start = _parse_iso(state.startedAt or state.createdAt)
+            end = _parse_iso(state.finishedAt)
+            if start and end and end > start:
+                samples.append((end, (end - start).total_seconds()))
+        if not samples:
+            return None
+        recent = [seconds for _, seconds in sorted(samples)[-DURATION_SAMPLES:]]
+        return sum(recent) / len(recent)
+
+    def retry_after(self, states: Iterable[Any], task_type: str, typical: Optional[float] = None) -> int:
+        """Seconds until enough active tasks of this type should have finished to admit one more."""
+        states = list(states)
+        active = self.active(states, task_type)
+        limit = self.limits.get(task_type, 0)
+        if not limit or len(active) < limit:
+            return 0
+        if typical is None:
+            typical = self.typical_duration(states, task_type)
+        now = datetime.utcnow()
+        remaining = []
+        for state in active:
+            # Prefer the task's own (continuously refined) estimate over the type-wide history
+            expected = state.estimatedDuration or typical
+            if expected is None:
+                return self.default_retry_after
+            start = _parse_iso(state.startedAt or state.createdAt) or now
+            remaining.append(max(expected - (now - start).total_seconds(), 1.0))
+        remaining.sort()
+        # Over the cap by k (e.g. limit lowered at runtime): wait for k + 1 tasks to finish
+        needed = remaining[min(len(active) - limit, len(remaining) - 1)]
+        return int(min(max(needed, 1.0), self.max_retry_after) + 0.999)
+
+    def check(self, states: Iterable[Any], task_type: str) -> int:
+        """Return 0 when a new task of this type may be admitted, else the Retry-After seconds."""
+        wait = self.retry_after(states, task_type)
+        if wait:
+            self.rejected[task_type] = self.rejected.get(task_type, 0) + 1
+        return wait
+
+    def capacity(self, states: Iterable[Any], task_types: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        states = list(states)
+        report: Dict[str, Dict[str, Any]] = {}
+        for task_type in task_types:
+            active = self.active(states, task_type)
+            limit = self.limits.get(task_type, 0)
+            typical = self.typical_duration(states, task_type)
+            report[task_type] = {
+                "limit": limit,
+                "pending": sum(1 for state in active if state.status != TASK_STATUS_PROCESSING),
+                "processing": sum(1 for state in active if state.status == TASK_STATUS_PROCESSING),
+                "available": max(limit - len(active), 0) if limit else None,
+                "typical_duration": round(typical, 1) if typical is not None else None,
+                "retry_after": self.retry_after(states, task_type, typical),
+                "rejected": self.rejected.get(task_type, 0),
+            }
+        return report
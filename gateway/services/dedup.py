@@ -0,0 +1,48 @@
+"""Per-task deduplication of downstream stage calls.
+
+When the LLM returns fewer scenes than requested the storyboard is padded with
+copies of the last scene, so several scenes of one task end up with identical
+stage inputs. StageDedup lets those scenes share a single downstream call.
+``fingerprint`` gives the same identity a persistent form, so project renders
+can tell which shot assets are still valid across tasks, and it is the key
+StageDedup shares calls under.
+"""
+
+import hashlib
+import json
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict
+
+from gateway.services.singleflight import SingleFlight
+
+
+def fingerprint(stage: str, parts: Any) -> str:
+    """Stable short hash of a stage's inputs."""
+    canonical = json.dumps([stage, parts], sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class StageDedup:
+    """Share results of identical stage inputs within a single task.
+
+    The first caller for a key runs ``factory``; later callers with the same
+    key join the in-flight call through a SingleFlight (so one scene being
+    cancelled does not cancel the call for the others) or, once it has
+    succeeded, reuse its result. Keys are ``fingerprint``s of the stage inputs.
+    """
+
+    def __init__(self) -> None:
+        self._flight = SingleFlight()
+        self._results: Dict[str, Any] = {}
+        self.hits: Dict[str, int] = defaultdict(int)
+
+    async def run(self, stage: str, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if key in self._results:
+            self.hits[stage] += 1
+            return self._results[key]
+        result = await self._flight.do(key, factory, label=stage)
+        self._results[key] = result
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return dict(Counter(self.hits) + Counter(self._flight.stats()))
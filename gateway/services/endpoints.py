@@ -0,0 +1,201 @@
+"""Weighted, health-checked model node pools per downstream service.
+
+Each downstream URL setting (``TXT2IMG_URL`` ...) may list several model
+nodes, comma separated, each with an optional weight::
+
+    TXT2IMG_URL=http://gpu1:8000/txt2img/generate;weight=2,http://gpu2:8000/txt2img/generate
+
+Every call goes to the node with the fewest outstanding requests per unit of
+weight (ties go to the node that has served the fewest requests per weight,
+so an idle farm still splits traffic by weight). Nodes are ejected after
+``max_fails`` consecutive failures (transport errors or 5xx responses), whether
+seen on real calls or by the periodic ``/health`` probe, and are re-admitted by
+the first successful probe or call. If every node is ejected, calls still go out rather than fail outright.
+
+Nodes are identified by host name (or socket path for ``unix:`` endpoints),
+so calls can be pinned to the node that holds a node-local file.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from gateway.services.http_pool import UNIX_PREFIX, split_endpoint
+
+WEIGHT_MARKER = ";weight="
+
+
+def parse_endpoints(spec: str) -> List[Tuple[str, float]]:
+    """``url[;weight=N][,url...]`` -> [(url, weight)]."""
+    endpoints = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        weight = 1.0
+        if WEIGHT_MARKER in item:
+            item, raw_weight = item.rsplit(WEIGHT_MARKER, 1)
+            weight = float(raw_weight)
+            if weight <= 0:
+                raise ValueError(f"endpoint weight must be positive: {item!r}")
+        endpoints.append((item, weight))
+    if not endpoints:
+        raise ValueError(f"no endpoints in {spec!r}")
+    return endpoints
+
+
+def health_url(url: str) -> str:
+    """Health route next to a service route: ``.../txt2img/generate`` -> ``.../txt2img/health``."""
+    parts = urlsplit(url)
+    base = parts.path.rsplit("/", 1)[0]
+    return f"{parts.scheme}://{parts.netloc}{base}/health"
+
+
+def _node_down(exc: BaseException) -> bool:
+    """Failures that say the node is unreachable or broken (a slow inference timing out does not)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    if isinstance(exc, httpx.TimeoutException):
+        return isinstance(exc, (httpx.ConnectTimeout, httpx.PoolTimeout))
+    return isinstance(exc, httpx.TransportError)
+
+
+class Endpoint:
+    __slots__ = ("raw", "url", "socket", "weight", "node", "outstanding", "requests", "failures", "ejected_at", "ejections", "last_error")
+
+    def __init__(self, raw: str, weight: float) -> None:
+        self.raw = raw
+        self.url, self.socket = split_endpoint(raw)
+        self.weight = weight
+        self.node = f"{UNIX_PREFIX}{self.socket}" if self.socket else (urlsplit(self.url).hostname or self.url)
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejected_at: Optional[float] = None
+        self.ejections = 0
+        self.last_error = ""
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_at is not None
+
+
+class EndpointPool:
+    """Model nodes of one downstream service with least-outstanding-requests routing."""
+
+    def __init__(self, service: str, spec: str, max_fails: int = 3) -> None:
+        self.service = service
+        self.endpoints = [Endpoint(raw, weight) for raw, weight in parse_endpoints(spec)]
+        self.max_fails = max(int(max_fails), 1)
+        self._probe: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def pick(self, node: Optional[str] = None, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        """Least loaded admitted node; ``node`` pins the call to that node when it is in the pool."""
+        if node:
+            for endpoint in self.endpoints:
+                if endpoint.node == node:
+                    return endpoint
+        excluded = set(map(id, exclude))
+        candidates = [e for e in self.endpoints if id(e) not in excluded]
+        admitted = [e for e in candidates if not e.ejected]
+        return min(
+            admitted or candidates or self.endpoints,
+            key=lambda e: ((e.outstanding + 1) / e.weight, e.requests / e.weight),
+        )
+
+    def retryable(self, exc: BaseException, tried: Iterable[Endpoint]) -> bool:
+        """The request never reached the node and another admitted node is left to try."""
+        if not isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return False
+        excluded = set(map(id, tried))
+        return any(id(e) not in excluded and not e.ejected for e in self.endpoints)
+
+    @contextmanager
+    def use(self, endpoint: Endpoint) -> Iterator[Endpoint]:
+        """Count a call as outstanding on ``endpoint`` and feed its outcome into ejection."""
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        try:
+            yield endpoint
+        except Exception as exc:
+            if isinstance(exc, httpx.HTTPStatusError) and _node_down(exc):
+                self._failed(endpoint, f"HTTP {exc.response.status_code}")
+            elif _node_down(exc):
+                self._failed(endpoint, f"{type(exc).__name__}: {exc}")
+            raise
+        else:
+            self._admit(endpoint)
+        finally:
+            endpoint.outstanding -= 1
+
+    def _failed(self, endpoint: Endpoint, error: str) -> None:
+        endpoint.failures += 1
+        endpoint.last_error = error
+        if endpoint.failures >= self.max_fails and not endpoint.ejected:
+            endpoint.ejected_at = time.time()
+            endpoint.ejections += 1
+            print(f"[gateway] {self.service} node {endpoint.raw} ejected after {endpoint.failures} failures: {error}")
+
+    def _admit(self, endpoint: Endpoint) -> None:
+        endpoint.failures = 0
+        if endpoint.ejected:
+            endpoint.ejected_at = None
+            print(f"[gateway] {self.service} node {endpoint.raw} re-admitted")
+
+    async def probe(self, check: Callable[[Endpoint], Awaitable[bool]]) -> None:
+        """Run ``check`` against every node once; failures count towards ejection, a success re-admits."""
+
+        async def _one(endpoint: Endpoint) -> None:
+            try:
+                healthy, error = await check(endpoint), "health check failed"
+            except Exception as exc:  # noqa: BLE001
+                if not _node_down(exc):
+                    # Accepted the connection but too busy (inference blocks its loop) to answer in time
+                    return
+                healthy, error = False, f"{type(exc).__name__}: {exc}"
+            if healthy:
+                self._admit(endpoint)
+            else:
+                self._failed(endpoint, error)
+
+        await asyncio.gather(*(_one(endpoint) for endpoint in self.endpoints))
+
+    def start_probing(self, check: Callable[[Endpoint], Awaitable[bool]], interval: float) -> None:
+        """Probe in the background every ``interval`` seconds; a single-node pool has nothing to route around."""
+        if len(self.endpoints) < 2 or interval <= 0 or (self._probe and not self._probe.done()):
+            return
+
+        async def _loop() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                await self.probe(check)
+
+        self._probe = asyncio.ensure_future(_loop())
+
+    def stop_probing(self) -> None:
+        if self._probe:
+            self._probe.cancel()
+            self._probe = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "endpoint": e.raw,
+                "node": e.node,
+                "weight": e.weight,
+                "outstanding": e.outstanding,
+                "requests": e.requests,
+                "healthy": not e.ejected,
+                "failures": e.failures,
+                "ejections": e.ejections,
+                "last_error": e.last_error,
+            }
+            for e in self.endpoints
+        ]
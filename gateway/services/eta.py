@@ -0,0 +1,122 @@
+"""Online duration estimates for gateway tasks.
+
+Every stage (storyboard, image, clip, TTS, mux, concat) reports how long it
+took and how many units of work it covered (images, frames, characters,
+clips). The estimator keeps an exponentially weighted per-unit rate for each
+stage and parameter combination (resolution, steps, fps, provider, ...) and
+falls back to the stage-wide rate, then to a static default, for parameter
+sets it has not seen yet.
+
+Video estimates follow the per-scene DAG in main.py: TTS overlaps the image
+stage, clips are bounded by img2vid parallelism, and only the last mux and
+the final concat sit on the critical path.
+"""
+
+import math
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Seconds per unit before any measurement exists
+STAGE_DEFAULTS: Dict[str, float] = {
+    "storyboard": 8.0,  # per call
+    "image": 6.0,  # per image
+    "clip": 0.8,  # per frame
+    "tts": 0.08,  # per character
+    "mux": 1.5,  # per scene
+    "concat": 0.5,  # per scene
+}
+
+
+class EtaEstimator:
+    """EWMA per-unit stage rates keyed by stage parameters."""
+
+    def __init__(self, alpha: float = 0.3, defaults: Optional[Dict[str, float]] = None) -> None:
+        self.alpha = min(max(alpha, 0.01), 1.0)
+        self.defaults = dict(STAGE_DEFAULTS if defaults is None else defaults)
+        self._rates: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        # Called with every recorded sample (pipeline workers forward them to the API process)
+        self.on_record: Optional[Callable[..., None]] = None
+
+    @staticmethod
+    def key(stage: str, params: Dict[str, Any]) -> str:
+        if not params:
+            return stage
+        return stage + "|" + ",".join(f"{k}={params[k]}" for k in sorted(params))
+
+    def _update(self, key: str, rate: float) -> None:
+        previous = self._rates.get(key)
+        self._rates[key] = rate if previous is None else previous + self.alpha * (rate - previous)
+        self._samples[key] = self._samples.get(key, 0) + 1
+
+    def record(self, stage: str, seconds: float, units: float = 1.0, **params: Any) -> None:
+        if seconds < 0 or units <= 0:
+            return
+        rate = seconds / units
+        self._update(self.key(stage, params), rate)
+        if params:
+            self._update(stage, rate)
+        if self.on_record is not None:
+            self.on_record(stage, seconds, units, **params)
+
+    def rate(self, stage: str, **params: Any) -> float:
+        for key in (self.key(stage, params), stage):
+            if key in self._rates:
+                return self._rates[key]
+        return self.defaults.get(stage, 1.0)
+
+    def seconds(self, stage: str, units: float = 1.0, **params: Any) -> float:
+        return self.rate(stage, **params) * max(units, 0.0)
+
+    def estimate_video(
+        self,
+        *,
+        scenes: int,
+        width: int,
+        height: int,
+        steps: int,
+        fps: int,
+        frames: int,
+        tts_chars: int,
+        speaker: Optional[str] = None,
+        img_parallel: int = 1,
+        vid_parallel: int = 1,
+        done: Optional[Dict[str, int]] = None,
+    ) -> Tuple[float, Dict[str, float]]:
+        """Remaining seconds for a video task plus a per-stage breakdown.
+
+        ``done`` carries the counters of a running task (storyboard, images,
+        clips, mux, tts) so the estimate shrinks as stages complete.
+        """
+        done = done or {}
+        scenes = max(scenes, 1)
+        resolution = f"{width}x{height}"
+        image = self.seconds("image", 1, resolution=resolution, steps=steps)
+        clip = self.seconds("clip", frames, resolution=resolution, fps=fps, provider="img2vid")
+        mux = self.seconds("mux", 1)
+        images_left = max(scenes - done.get("images", 0), 0)
+        clips_left = max(scenes - done.get("clips", 0), 0)
+        mux_left = max(scenes - done.get("mux", 0), 0)
+        breakdown = {
+            "storyboard": 0.0 if done.get("storyboard") else self.seconds("storyboard", 1, scenes=scenes),
+            "tts": 0.0 if done.get("tts") else self.seconds("tts", tts_chars, speaker=speaker or "default"),
+            "images": math.ceil(images_left / max(img_parallel, 1)) * image,
+            "clips": math.ceil(clips_left / max(vid_parallel, 1)) * clip,
+            "mux": mux if mux_left else 0.0,
+            "concat": self.seconds("concat", scenes),
+        }
+        # The first clip needs its image and the narration; later clips are paced by img2vid or by images
+        first_clip_ready = max(image if images_left else 0.0, breakdown["tts"])
+        clip_path = max(first_clip_ready + breakdown["clips"], breakdown["images"] + (clip if clips_left else 0.0))
+        total = breakdown["storyboard"] + clip_path + breakdown["mux"] + breakdown["concat"]
+        return total, {k: round(v, 1) for k, v in breakdown.items()}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {"rates": dict(self._rates), "samples": dict(self._samples)}
+
+    def restore(self, snapshot: Dict[str, Dict]) -> None:
+        """Adopt rates learned elsewhere (a pipeline worker starts from the API process's estimates)."""
+        self._rates.update(snapshot.get("rates") or {})
+        self._samples.update(snapshot.get("samples") or {})
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {key: {"rate": round(rate, 4), "samples": self._samples.get(key, 0)} for key, rate in sorted(self._rates.items())}
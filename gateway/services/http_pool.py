@@ -0,0 +1,147 @@
+"""Application-lifetime HTTP clients for gateway -> model node traffic.
+
+One ``httpx.AsyncClient`` per downstream service, created at startup and
+closed at shutdown, so short txt2img / TTS calls from different tasks reuse
+warm keep-alive connections instead of paying a TCP (and TLS) handshake per
+task. Each service has its own connection limits and timeout profile; HTTP/2
+is used when requested and the ``h2`` package is installed.
+
+Connection reuse is observable: every request carries an httpcore trace hook
+that counts how many requests had to open a new connection.
+
+A service endpoint may also be a Unix domain socket, written
+``unix:<socket path>:<http path>`` (e.g. ``unix:/data/run/model.sock:/tts/narration``),
+for a model node on the same host: requests then skip the TCP stack entirely.
+A service's TCP nodes share one client (httpx pools per origin); each socket
+gets its own.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+UNIX_PREFIX = "unix:"
+
+
+def split_endpoint(endpoint: str) -> Tuple[str, Optional[str]]:
+    """Request URL and Unix socket path (None for TCP) of a service endpoint."""
+    if not endpoint.startswith(UNIX_PREFIX):
+        return endpoint, None
+    socket_path, _, path = endpoint[len(UNIX_PREFIX):].partition(":")
+    if not socket_path:
+        raise ValueError(f"unix endpoint without a socket path: {endpoint!r}")
+    # The host is only used for the Host header; the socket decides where the request goes
+    return "http://localhost/" + path.lstrip("/"), socket_path
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ServiceStats:
+    __slots__ = ("requests", "in_flight", "connects", "errors")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.in_flight = 0
+        self.connects = 0
+        self.errors = 0
+
+
+class ServiceClients:
+    """Pooled client per downstream service with per-service limits and timeouts.
+
+    ``timeouts`` maps a service to its default request timeout in seconds;
+    ``connect_timeout`` bounds connection setup for all of them.
+    """
+
+    def __init__(
+        self,
+        timeouts: Dict[str, float],
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = False,
+    ) -> None:
+        self.timeouts = dict(timeouts)
+        self.limits = httpx.Limits(
+            max_connections=max(int(max_connections), 1),
+            max_keepalive_connections=max(int(max_keepalive), 0),
+            keepalive_expiry=max(float(keepalive_expiry), 0.0),
+        )
+        self.connect_timeout = connect_timeout
+        self.http2 = bool(http2) and _h2_available()
+        if http2 and not self.http2:
+            print("[gateway] HTTP2=1 but the h2 package is not installed, using HTTP/1.1")
+        self._clients: Dict[Tuple[str, Optional[str]], httpx.AsyncClient] = {}
+        self._stats: Dict[str, _ServiceStats] = {name: _ServiceStats() for name in self.timeouts}
+
+    def start(self) -> None:
+        for service in self.timeouts:
+            self.client(service)
+
+    def timeout(self, service: str) -> float:
+        return self.timeouts.get(service, 600.0)
+
+    def client(self, service: str, socket_path: Optional[str] = None) -> httpx.AsyncClient:
+        client = self._clients.get((service, socket_path))
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(self.timeout(service), connect=self.connect_timeout),
+                http2=self.http2,
+                # A custom transport ignores the client's limits, so they are repeated on it
+                transport=httpx.AsyncHTTPTransport(uds=socket_path, limits=self.limits, http2=self.http2) if socket_path else None,
+            )
+            self._clients[(service, socket_path)] = client
+        return client
+
+    async def post(
+        self, service: str, url: str, socket_path: Optional[str] = None, timeout: Optional[float] = None, **kwargs: Any
+    ) -> httpx.Response:
+        """POST through the service's pool (over ``socket_path`` if given); ``timeout`` overrides the read/write part of its profile."""
+        stats = self._stats.setdefault(service, _ServiceStats())
+
+        async def _trace(event: str, info: Dict) -> None:
+            if event.startswith("connection.connect_") and event.endswith(".complete"):
+                stats.connects += 1
+
+        request_timeout = httpx.Timeout(timeout if timeout is not None else self.timeout(service), connect=self.connect_timeout)
+        stats.requests += 1
+        stats.in_flight += 1
+        try:
+            return await self.client(service, socket_path).post(url, timeout=request_timeout, extensions={"trace": _trace}, **kwargs)
+        except httpx.HTTPError:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    def stats(self, service: str) -> Dict[str, Any]:
+        stats = self._stats.get(service) or _ServiceStats()
+        result: Dict[str, Any] = {
+            "requests": stats.requests,
+            "in_flight": stats.in_flight,
+            "connects": stats.connects,
+            "errors": stats.errors,
+            "reuse_ratio": round(1 - stats.connects / stats.requests, 3) if stats.requests else None,
+            "timeout": self.timeout(service),
+            "http2": self.http2,
+        }
+        # httpcore keeps the live connections on the transport's pool; not part of httpx's public API
+        pools = [getattr(getattr(client, "_transport", None), "_pool", None) for (name, _), client in self._clients.items() if name == service]
+        connections = [conn for pool in pools for conn in (getattr(pool, "connections", None) or [])]
+        if pools:
+            result["connections"] = len(connections)
+            result["idle"] = sum(1 for conn in connections if conn.is_idle())
+        return result
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
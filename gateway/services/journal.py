@@ -0,0 +1,127 @@
+"""Append-only journal of task state for crash recovery.
+
+Task state otherwise lives only in the in-process dicts of gateway.store.memory,
+so a restart loses every in-flight task. The journal appends one JSON line per
+task state transition (and per accepted Idempotency-Key) to a local file. On
+startup the gateway replays it, keeping the latest record of each task, and
+rewrites it compacted. Records are buffered and appended by a single
+background flush (in a thread, off the event loop), so a burst of updates costs
+one write. Stage artifacts of video tasks are checkpointed
+separately in their manifests (gateway.services.manifest), which is what lets
+recovered tasks continue from their last completed stage.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _finished_before(record: Dict[str, Any], cutoff: datetime) -> bool:
+    finished = record.get("finishedAt")
+    if not finished:
+        return False
+    try:
+        return datetime.fromisoformat(finished) < cutoff
+    except ValueError:
+        return False
+
+
+class TaskJournal:
+    """JSONL journal of task states and idempotency keys."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        # Tasks with at least one record; the first update of any task is always written
+        self.seen: Set[str] = set()
+        self._pending: List[str] = []
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._pending.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_pending())
+
+    def _write(self, lines: List[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    async def _flush_pending(self) -> None:
+        # One writer at a time keeps records in order; everything queued meanwhile goes in the next write
+        while self._pending:
+            lines, self._pending = self._pending, []
+            await asyncio.to_thread(self._write, lines)
+
+    def flush(self) -> None:
+        """Write buffered records now (blocking)."""
+        lines, self._pending = self._pending, []
+        if lines:
+            self._write(lines)
+
+    async def aclose(self) -> None:
+        if self._flusher is not None:
+            await self._flusher
+        self.flush()
+
+    def task(self, state: Dict[str, Any]) -> None:
+        self.seen.add(state["id"])
+        self._append({"t": time.time(), "task": state})
+
+    def idempotency(self, key: str, task_id: str, accepted_at: float) -> None:
+        self._append({"t": time.time(), "idempotency": key, "task_id": task_id, "at": accepted_at})
+
+    def replay(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Tuple[str, float]]]:
+        """Latest state per task id and the idempotency keys, in journal order."""
+        states: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, Tuple[str, float]] = {}
+        try:
+            f = self.path.open("r", encoding="utf-8")
+        except OSError:
+            return states, keys
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if "task" in record and record["task"].get("id"):
+                    states[record["task"]["id"]] = record["task"]
+                elif record.get("idempotency"):
+                    keys[record["idempotency"]] = (record["task_id"], float(record.get("at") or record["t"]))
+        self.seen.update(states)
+        return states, keys
+
+    def compact(
+        self,
+        states: Iterable[Dict[str, Any]],
+        keys: Dict[str, Tuple[str, float]],
+        retention: float,
+        key_ttl: Optional[float] = None,
+    ) -> int:
+        """Rewrite the journal with one record per task, dropping tasks finished more than ``retention`` seconds ago."""
+        now = time.time()
+        # Task timestamps are naive UTC (datetime.utcnow().isoformat())
+        cutoff = datetime.utcnow() - timedelta(seconds=retention)
+        kept = [state for state in states if not _finished_before(state, cutoff)]
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as f:
+            for state in kept:
+                f.write(json.dumps({"t": now, "task": state}, ensure_ascii=False, default=str) + "\n")
+            for key, (task_id, accepted_at) in keys.items():
+                if key_ttl is None or now - accepted_at <= key_ttl:
+                    f.write(json.dumps({"t": now, "idempotency": key, "task_id": task_id, "at": accepted_at}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        # Buffered records are older than the states just written
+        self._pending.clear()
+        self.seen = {state["id"] for state in kept}
+        return len(kept)
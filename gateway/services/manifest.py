@@ -0,0 +1,100 @@
+"""Per-task artifact manifest for resumable video pipelines.
+
+As each stage of a video task completes (storyboard, per-scene image, audio,
+clip, mux) the pipeline records the stage's input fingerprint and output in a
+small JSON file next to the final outputs. A resumed task reloads the manifest
+and skips every stage whose fingerprint still matches and whose output file
+still exists, so a failure at the concat step only costs the concat on retry.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Stage order used by resume_from: dropping a stage also drops every stage after it
+STAGES = ("storyboard", "image", "audio", "clip", "mux")
+
+
+def _exists(path: Optional[str]) -> bool:
+    if not path:
+        return False
+    return str(path).startswith(("http://", "https://")) or Path(str(path)).exists()
+
+
+class TaskManifest:
+    """Stage checkpoints of one task, persisted as ``<directory>/<task_id>.json``."""
+
+    def __init__(self, task_id: str, directory: Path, data: Optional[Dict[str, Any]] = None) -> None:
+        self.task_id = task_id
+        self.path = Path(directory) / f"{task_id}.json"
+        self.data: Dict[str, Any] = data or {"task_id": task_id, "request": None, "storyboard": None, "scenes": {}}
+
+    @classmethod
+    def load(cls, task_id: str, directory: Path) -> "TaskManifest":
+        path = Path(directory) / f"{task_id}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        return cls(task_id, directory, data)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def delete(self) -> None:
+        """Drop the checkpoints once the task can no longer be resumed (finished, or aged out)."""
+        self.path.unlink(missing_ok=True)
+        self.path.with_suffix(".json.tmp").unlink(missing_ok=True)
+
+    def set_request(self, request: Dict[str, Any]) -> None:
+        self.data["request"] = request
+        self.save()
+
+    @property
+    def request(self) -> Optional[Dict[str, Any]]:
+        return self.data.get("request")
+
+    def set_storyboard(self, storyboard: List[Dict]) -> None:
+        self.data["storyboard"] = storyboard
+        self.save()
+
+    @property
+    def storyboard(self) -> Optional[List[Dict]]:
+        return self.data.get("storyboard")
+
+    def record(self, scene_id: str, stage: str, key: str, value: Any, path: Optional[str] = None) -> None:
+        """Checkpoint one completed stage of a scene; ``path`` is the file that must survive for reuse."""
+        self.data["scenes"].setdefault(scene_id, {})[stage] = {"key": key, "value": value, "path": path}
+        self.save()
+
+    def get(self, scene_id: str, stage: str, key: str) -> Optional[Any]:
+        """Output of a checkpointed stage when its inputs are unchanged and its file is still there."""
+        entry = (self.data["scenes"].get(scene_id) or {}).get(stage)
+        if not entry or entry.get("key") != key:
+            return None
+        if entry.get("path") is not None and not _exists(entry["path"]):
+            return None
+        return entry.get("value")
+
+    def drop_from(self, stage: str) -> None:
+        """Forget ``stage`` and every later stage so a resume redoes them."""
+        dropped: Iterable[str] = STAGES[STAGES.index(stage):]
+        if "storyboard" in dropped:
+            self.data["storyboard"] = None
+        for stages in self.data["scenes"].values():
+            for name in dropped:
+                stages.pop(name, None)
+        self.save()
+
+    def completed(self) -> Dict[str, int]:
+        counts = {stage: 0 for stage in STAGES[1:]}
+        for stages in self.data["scenes"].values():
+            for name in stages:
+                if name in counts:
+                    counts[name] += 1
+        counts["storyboard"] = int(bool(self.data.get("storyboard")))
+        return counts
@@ -0,0 +1,213 @@
+"""Gateway-wide concurrency limits for downstream model services.
+
+Every call to the LLM / txt2img / img2vid / TTS services takes a slot from the
+limiter of that service. When all slots are busy callers wait in a queue that
+is shared fairly between tenants (projects or API clients) using start-time
+fair queuing: each tenant's requests get virtual start tags spaced by
+``cost / weight``, and the waiter with the smallest tag gets the next slot.
+With a single tenant this degrades to plain FIFO.
+
+On top of that waiters sit in strict priority lanes (interactive, normal,
+batch): a freed slot always goes to the highest non-empty lane, and fair
+queuing only decides between tenants of the same lane.
+"""
+
+import asyncio
+import bisect
+import itertools
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+PositionCallback = Callable[[int], None]
+
+DEFAULT_TENANT = "default"
+PRIORITIES = ("interactive", "normal", "batch")
+DEFAULT_PRIORITY = "normal"
+WAIT_SAMPLES = 200
+MAX_TRACKED_TENANTS = 500
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    priority = (priority or "").strip().lower()
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+def parse_weights(raw: str) -> Dict[str, float]:
+    """Parse ``"tenantA=3,tenantB=0.5"`` into a weight map, ignoring malformed entries."""
+    weights: Dict[str, float] = {}
+    for item in (raw or "").split(","):
+        name, sep, value = item.strip().partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            weights[name.strip()] = max(float(value), 0.01)
+        except ValueError:
+            continue
+    return weights
+
+
+class _Waiter:
+    __slots__ = ("future", "on_position", "position", "tenant", "priority", "start_tag", "seq", "enqueued_at")
+
+    def __init__(
+        self,
+        future: asyncio.Future,
+        on_position: Optional[PositionCallback],
+        tenant: str,
+        priority: str,
+        start_tag: float,
+        seq: int,
+    ) -> None:
+        self.future = future
+        self.on_position = on_position
+        self.position = 0
+        self.tenant = tenant
+        self.priority = priority
+        self.start_tag = start_tag
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+
+    def sort_key(self) -> Tuple[int, float, int]:
+        return PRIORITIES.index(self.priority), self.start_tag, self.seq
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.sort_key() < other.sort_key()
+
+
+class ServiceLimiter:
+    """Fixed number of slots for one downstream service with a weighted fair wait queue."""
+
+    def __init__(self, name: str, slots: int, weights: Optional[Dict[str, float]] = None) -> None:
+        self.name = name
+        self.slots = max(int(slots), 1)
+        self.weights = dict(weights or {})
+        self.active = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        # Virtual clock and per-tenant finish tags are kept per priority lane
+        self._vtime: Dict[str, float] = defaultdict(float)
+        self._last_finish: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._waits: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=WAIT_SAMPLES))
+        self._served_by_priority: Dict[str, int] = defaultdict(int)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        cost: float = 1.0,
+        on_position: Optional[PositionCallback] = None,
+        priority: str = DEFAULT_PRIORITY,
+    ):
+        await self.acquire(tenant, cost, on_position, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _tag(self, tenant: str, priority: str, cost: float) -> float:
+        start = max(self._vtime[priority], self._last_finish[(priority, tenant)])
+        self._last_finish[(priority, tenant)] = start + max(cost, 0.0) / self.weights.get(tenant, 1.0)
+        return start
+
+    def _granted(self, tenant: str, priority: str, start_tag: float, waited: float) -> None:
+        self.active += 1
+        self._served_by_priority[priority] += 1
+        self._vtime[priority] = max(self._vtime[priority], start_tag)
+        self._served[tenant] += 1
+        self._waits[tenant].append(waited)
+        if len(self._served) > MAX_TRACKED_TENANTS:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Forget idle tenants that carry no scheduling debt (their next tag would start at vtime anyway)."""
+        busy = {waiter.tenant for waiter in self._waiters}
+        for tenant in list(self._served):
+            if len(self._served) <= MAX_TRACKED_TENANTS // 2:
+                break
+            if tenant in busy or any(self._last_finish.get((lane, tenant), 0.0) > self._vtime[lane] for lane in PRIORITIES):
+                continue
+            self._served.pop(tenant, None)
+            self._waits.pop(tenant, None)
+            for lane in PRIORITIES:
+                self._last_finish.pop((lane, tenant), None)
+
+    async def acquire(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        cost: float = 1.0,
+        on_position: Optional[PositionCallback] = None,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> None:
+        tenant = tenant or DEFAULT_TENANT
+        priority = normalize_priority(priority)
+        start_tag = self._tag(tenant, priority, cost)
+        if self.active < self.slots and not self._waiters:
+            self._granted(tenant, priority, start_tag, 0.0)
+            return
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), on_position, tenant, priority, start_tag, next(self._seq))
+        bisect.insort(self._waiters, waiter)
+        self._notify_positions()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot was granted just before the cancellation landed: hand it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                self._notify_positions()
+            raise
+
+    def release(self) -> None:
+        self.active = max(self.active - 1, 0)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.active < self.slots and self._waiters:
+            waiter = self._waiters.pop(0)
+            if waiter.future.done():
+                continue
+            self._granted(waiter.tenant, waiter.priority, waiter.start_tag, time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+        self._notify_positions()
+
+    def _notify_positions(self) -> None:
+        for position, waiter in enumerate(self._waiters, 1):
+            if waiter.position != position:
+                waiter.position = position
+                if waiter.on_position:
+                    waiter.on_position(position)
+
+    def tenant_stats(self) -> Dict[str, Dict]:
+        queued: Dict[str, int] = defaultdict(int)
+        for waiter in self._waiters:
+            queued[waiter.tenant] += 1
+        stats: Dict[str, Dict] = {}
+        for tenant in set(self._served) | set(queued):
+            waits = sorted(self._waits[tenant])
+            stats[tenant] = {
+                "weight": self.weights.get(tenant, 1.0),
+                "queued": queued.get(tenant, 0),
+                "served": self._served.get(tenant, 0),
+                "avg_wait": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95_wait": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)], 3) if waits else 0.0,
+            }
+        return stats
+
+    def priority_stats(self) -> Dict[str, Dict[str, int]]:
+        queued: Dict[str, int] = defaultdict(int)
+        for waiter in self._waiters:
+            queued[waiter.priority] += 1
+        return {lane: {"queued": queued.get(lane, 0), "served": self._served_by_priority.get(lane, 0)} for lane in PRIORITIES}
+
+    def stats(self) -> Dict:
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "priorities": self.priority_stats(),
+            "tenants": self.tenant_stats(),
+        }
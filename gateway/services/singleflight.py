@@ -0,0 +1,81 @@
+"""Coalescing of identical in-flight downstream calls across tasks.
+
+When several tasks send the same request to the same service at the same
+time (same story/style submitted twice, the Go server re-dispatching), only
+the first caller talks to the service; the others wait for its response.
+Nothing is cached: the key is dropped as soon as the call finishes, so a
+later identical request goes upstream again.
+
+Callers share the call through ``asyncio.shield``: a caller that is
+cancelled only drops its reference, and the upstream call is cancelled when
+the last interested caller is gone. Callers may name themselves (``member``)
+so the shared call can report progress to every one of them.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class _Call:
+    __slots__ = ("task", "refs", "members")
+
+    def __init__(self, task: asyncio.Future) -> None:
+        self.task = task
+        self.refs = 0
+        self.members: List[str] = []
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def key(target: str, payload: Any) -> str:
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return target + "#" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]], label: str = "", member: Optional[str] = None) -> Any:
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, k=key, c=call: self._calls.pop(k, None) if self._calls.get(k) is c else None)
+        else:
+            self.coalesced[label or key] += 1
+        call.refs += 1
+        if member:
+            call.members.append(member)
+        try:
+            result = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done():
+                call.refs -= 1
+                if call.refs <= 0:
+                    # Forget it right away so a newcomer starts a fresh call instead of joining a dying one
+                    if self._calls.get(key) is call:
+                        self._calls.pop(key, None)
+                    call.task.cancel()
+            raise
+        finally:
+            if member:
+                call.members.remove(member)
+        # Each caller gets its own copy so one task mutating the response cannot affect another
+        return copy.deepcopy(result)
+
+    def members(self, key: str) -> List[str]:
+        """Distinct named callers currently waiting on the call for ``key``."""
+        call = self._calls.get(key)
+        return list(dict.fromkeys(call.members)) if call else []
+
+    def inflight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.coalesced)
@@ -0,0 +1,277 @@
+"""Pipeline worker processes.
+
+With ``PIPELINE_EXECUTOR=process`` task pipelines do not run on the event loop
+that serves the API: each one is sent to a worker process with its own event
+loop, so deep merges, pydantic dumps, JSON encoding and subprocess handling of
+a render no longer stall polls and SSE streams.
+
+Gateway-wide state stays in the API process. Workers stream every task state
+change back over a pipe (the API process only stores, journals and pushes it to
+subscribers), acquire downstream slots from the API process's limiters so the
+fair scheduler still sees every call, and report stage timings to its ETA
+estimator. Cancelling the proxy coroutine returned by ``WorkerPool.run``
+cancels the pipeline in its worker.
+
+Messages are tuples whose first item is the kind:
+
+- API -> worker: ``run``, ``cancel``, ``granted``, ``position``
+- worker -> API: ``task``, ``eta``, ``acquire``, ``release``, ``done``
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class WorkerLost(RuntimeError):
+    """The worker process running a pipeline exited before the pipeline finished."""
+
+
+class _Worker:
+    __slots__ = ("index", "process", "conn", "jobs", "slots")
+
+    def __init__(self, index: int, process: Any, conn: Any) -> None:
+        self.index = index
+        self.process = process
+        self.conn = conn
+        # task_id -> future resolved by the worker's "done" message
+        self.jobs: Dict[str, asyncio.Future] = {}
+        # acquisition id -> task holding a limiter slot on behalf of the worker
+        self.slots: Dict[int, asyncio.Task] = {}
+
+    def send(self, message: Tuple) -> None:
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError):
+            pass  # worker gone; its reader notices EOF and fails its jobs
+
+
+class WorkerPool:
+    """Fixed pool of spawned processes running pipelines, least-busy first.
+
+    ``target`` is the worker entry point (called with the child end of the
+    pipe); ``slot`` opens a limiter slot in the API process, ``on_task`` adopts
+    a task state published by a worker and ``on_eta`` records a stage timing.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        target: Callable[[Any], None],
+        slot: Callable[..., Any],
+        on_task: Callable[[Dict], None],
+        on_eta: Callable[..., None],
+    ) -> None:
+        self.size = max(int(size), 1)
+        self.target = target
+        self.slot = slot
+        self.on_task = on_task
+        self.on_eta = on_eta
+        self._workers: Dict[int, _Worker] = {}
+        self._closing = False
+
+    def start(self) -> None:
+        """Spawn missing workers; safe to call repeatedly from the event loop."""
+        for index in range(self.size):
+            if index not in self._workers:
+                self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        # spawn, not fork: the API process has a running loop and threads
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=self.target, args=(child_conn,), name=f"pipeline-worker-{index}", daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(index, process, parent_conn)
+        self._workers[index] = worker
+        asyncio.get_running_loop().add_reader(parent_conn.fileno(), self._on_readable, worker)
+
+    async def run(self, task_id: str, *args: Any) -> None:
+        """Run a pipeline in the least busy worker and wait until it has finished there."""
+        self.start()
+        worker = min(self._workers.values(), key=lambda w: (len(w.jobs), w.index))
+        done = asyncio.get_running_loop().create_future()
+        worker.jobs[task_id] = done
+        worker.send(("run", task_id) + args)
+        try:
+            await asyncio.shield(done)
+        except asyncio.CancelledError:
+            if not done.done():
+                worker.send(("cancel", task_id))
+                # Wait for the worker to unwind (kill ffmpeg, release slots) so a resume cannot overlap it
+                try:
+                    await asyncio.shield(done)
+                except Exception:  # noqa: BLE001
+                    pass
+            raise
+        finally:
+            if worker.jobs.get(task_id) is done:
+                worker.jobs.pop(task_id, None)
+
+    def _on_readable(self, worker: _Worker) -> None:
+        try:
+            while worker.conn.poll():
+                self._handle(worker, worker.conn.recv())
+        except (EOFError, OSError):
+            self._lost(worker)
+
+    def _handle(self, worker: _Worker, message: Tuple) -> None:
+        kind = message[0]
+        if kind == "task":
+            self.on_task(message[1])
+        elif kind == "eta":
+            _, args, params = message
+            self.on_eta(*args, **params)
+        elif kind == "acquire":
+            _, rid, service, tenant, priority, cost = message
+            worker.slots[rid] = asyncio.ensure_future(self._hold(worker, rid, service, tenant, priority, cost))
+        elif kind == "release":
+            holder = worker.slots.pop(message[1], None)
+            if holder:
+                holder.cancel()
+        elif kind == "done":
+            _, task_id, error = message
+            done = worker.jobs.get(task_id)
+            if done and not done.done():
+                if error:
+                    done.set_exception(RuntimeError(error))
+                else:
+                    done.set_result(None)
+
+    async def _hold(self, worker: _Worker, rid: int, service: str, tenant: str, priority: str, cost: float) -> None:
+        """Hold a limiter slot for a worker's downstream call until it sends ``release``."""
+        try:
+            async with self.slot(service, tenant=tenant, cost=cost, priority=priority, on_position=lambda p: worker.send(("position", rid, p))):
+                worker.send(("granted", rid))
+                await asyncio.Event().wait()
+        finally:
+            if worker.slots.get(rid) is asyncio.current_task():
+                worker.slots.pop(rid, None)
+
+    def _lost(self, worker: _Worker) -> None:
+        asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+        worker.conn.close()
+        if self._workers.get(worker.index) is worker:
+            del self._workers[worker.index]
+        for holder in list(worker.slots.values()):
+            holder.cancel()
+        for task_id, done in list(worker.jobs.items()):
+            if not done.done():
+                done.set_exception(WorkerLost(f"pipeline worker {worker.index} exited (code {worker.process.exitcode})"))
+        if not self._closing:
+            print(f"[gateway] pipeline worker {worker.index} exited, restarting")
+            self._spawn(worker.index)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "executor": "process",
+            "workers": [
+                {"pid": w.process.pid, "tasks": len(w.jobs), "slots": len(w.slots)}
+                for w in sorted(self._workers.values(), key=lambda w: w.index)
+            ],
+        }
+
+    def close(self) -> None:
+        self._closing = True
+        for worker in list(self._workers.values()):
+            try:
+                asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+            except (OSError, ValueError, RuntimeError):
+                pass
+            worker.conn.close()
+            worker.process.terminate()
+        for worker in list(self._workers.values()):
+            worker.process.join(timeout=5)
+        self._workers.clear()
+
+
+class WorkerChannel:
+    """Worker-process end of the pipe: runs pipelines and proxies gateway-wide state to the API process."""
+
+    def __init__(self, conn: Any) -> None:
+        self.conn = conn
+        self._ids = itertools.count(1)
+        # acquisition id -> (grant future, on_position callback)
+        self._acquiring: Dict[int, Tuple[asyncio.Future, Optional[Callable[[int], None]]]] = {}
+        self._run: Optional[Callable[..., asyncio.Future]] = None
+        self._cancel: Optional[Callable[..., None]] = None
+        self._closed: Optional[asyncio.Future] = None
+
+    def send(self, message: Tuple) -> None:
+        self.conn.send(message)
+
+    def publish(self, state: Dict) -> None:
+        self.send(("task", state))
+
+    def eta(self, *args: Any, **params: Any) -> None:
+        self.send(("eta", args, params))
+
+    def limiter(self, service: str) -> "RemoteLimiter":
+        return RemoteLimiter(self, service)
+
+    async def serve(self, run: Callable[..., asyncio.Future], cancel: Callable[..., None]) -> None:
+        """Handle API messages until the API process goes away."""
+        loop = asyncio.get_running_loop()
+        self._run, self._cancel = run, cancel
+        self._closed = loop.create_future()
+        loop.add_reader(self.conn.fileno(), self._on_readable)
+        await self._closed
+
+    def _on_readable(self) -> None:
+        try:
+            while self.conn.poll():
+                self._handle(self.conn.recv())
+        except (EOFError, OSError):
+            asyncio.get_running_loop().remove_reader(self.conn.fileno())
+            if self._closed and not self._closed.done():
+                self._closed.set_result(None)
+
+    def _handle(self, message: Tuple) -> None:
+        kind = message[0]
+        if kind == "run":
+            task_id = message[1]
+            job = self._run(*message[1:])
+            job.add_done_callback(lambda done, task_id=task_id: self._finished(task_id, done))
+        elif kind == "cancel":
+            self._cancel(*message[1:])
+        elif kind == "granted":
+            entry = self._acquiring.get(message[1])
+            if entry and not entry[0].done():
+                entry[0].set_result(None)
+        elif kind == "position":
+            entry = self._acquiring.get(message[1])
+            if entry and entry[1]:
+                entry[1](message[2])
+
+    def _finished(self, task_id: str, job: asyncio.Future) -> None:
+        error = None
+        if not job.cancelled() and job.exception() is not None:
+            error = str(job.exception()) or type(job.exception()).__name__
+        try:
+            self.send(("done", task_id, error))
+        except (OSError, ValueError):
+            pass
+
+
+class RemoteLimiter:
+    """Stand-in for a ServiceLimiter inside a worker: slots are granted by the API process's limiter."""
+
+    def __init__(self, channel: WorkerChannel, service: str) -> None:
+        self.channel = channel
+        self.name = service
+
+    @asynccontextmanager
+    async def slot(self, tenant: str = "", cost: float = 1.0, on_position: Optional[Callable[[int], None]] = None, priority: str = ""):
+        rid = next(self.channel._ids)
+        granted = asyncio.get_running_loop().create_future()
+        self.channel._acquiring[rid] = (granted, on_position)
+        self.channel.send(("acquire", rid, self.name, tenant, priority, cost))
+        try:
+            await granted
+            yield
+        finally:
+            self.channel._acquiring.pop(rid, None)
+            self.channel.send(("release", rid))
@@ -5,7 +5,7 @@ and ensure consistent state access across all gateway modules.
 """
 
 from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Any, Dict, List, Tuple
 import asyncio
 
 # Task storage: task_id -> TaskState
@@ -22,3 +22,20 @@ project_shots: Dict[str, Dict[str, Dict]] = defaultdict(dict)
 # Progress subscriptions: task_id -> list of asyncio.Queue for SSE/WebSocket
 progress_subs: Dict[str, List[asyncio.Queue]] = defaultdict(list)
 
+# Pipeline context per task (render request, prompts, TTS settings): task_id -> ctx dict
+task_contexts: Dict[str, Dict[str, Any]] = {}
+
+# Running pipelines (orchestration, shot edits, alternates): task_id -> asyncio.Task, so they can be cancelled
+running_jobs: Dict[str, "asyncio.Task"] = {}
+
+# Follow-up work of finished tasks (background alternates): task_id -> asyncio.Task, kept apart from running_jobs
+background_jobs: Dict[str, "asyncio.Task"] = {}
+
+# Idempotency keys of accepted submissions: scoped key -> (task_id, accepted_at unix seconds)
+idempotency_keys: Dict[str, Tuple[str, float]] = {}
+
+# Latest edit task per shot: (project_id, shot_id) -> task_id; older edits of the same shot are superseded
+shot_edits: Dict[Tuple[str, str], str] = {}
+
+# Project video render cache: project_id -> {"shots": {shot_id: {stage: fingerprint, ...}}, "final": fingerprint}
+project_renders: Dict[str, Dict[str, Any]] = {}
@@ -0,0 +1,17 @@
+"""Point the gateway's data directories at a scratch directory before ``gateway.main`` is imported."""
+
+import os
+import tempfile
+from pathlib import Path
+
+_SCRATCH = Path(tempfile.mkdtemp(prefix="gateway-tests-"))
+for _name, _sub in {
+    "STATIC_ROOT": "",
+    "FINAL_DIR": "final",
+    "CLIPS_DIR": "clips",
+    "STORYBOARD_DIR": "storyboard",
+    "MANIFEST_DIR": "manifests",
+}.items():
+    os.environ.setdefault(_name, str(_SCRATCH / _sub))
+# The journal is exercised directly by its own tests; the app under test must not replay one
+os.environ.setdefault("JOURNAL_PATH", "")
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from gateway.schemas.task import TASK_STATUS_FINISHED, TASK_STATUS_PENDING, TASK_STATUS_PROCESSING, TASK_TYPE_SHOT, TASK_TYPE_VIDEO, TaskState
+from gateway.services.admission import AdmissionController
+
+
+def _task(task_id, status, started_ago=None, took=None, estimate=0, task_type=TASK_TYPE_VIDEO):
+    now = datetime.utcnow()
+    started = now - timedelta(seconds=started_ago) if started_ago is not None else None
+    return TaskState(
+        id=task_id,
+        type=task_type,
+        status=status,
+        progress=0,
+        estimatedDuration=estimate,
+        startedAt=started.isoformat() if started else None,
+        finishedAt=(started + timedelta(seconds=took)).isoformat() if started and took is not None else None,
+    )
+
+
+def test_admits_below_the_cap_and_without_a_limit():
+    admission = AdmissionController({TASK_TYPE_VIDEO: 2, TASK_TYPE_SHOT: 0})
+    states = [_task("v1", TASK_STATUS_PROCESSING, started_ago=5)] + [_task(f"s{n}", TASK_STATUS_PENDING, task_type=TASK_TYPE_SHOT) for n in range(50)]
+    assert admission.check(states, TASK_TYPE_VIDEO) == 0
+    assert admission.check(states, TASK_TYPE_SHOT) == 0
+    assert admission.rejected == {}
+
+
+def test_retry_after_is_the_earliest_expected_finish():
+    admission = AdmissionController({TASK_TYPE_VIDEO: 2})
+    states = [
+        _task("v1", TASK_STATUS_PROCESSING, started_ago=10, estimate=100),
+        _task("v2", TASK_STATUS_PROCESSING, started_ago=10, estimate=40),
+    ]
+    wait = admission.check(states, TASK_TYPE_VIDEO)
+    assert 29 <= wait <= 31
+    assert admission.rejected == {TASK_TYPE_VIDEO: 1}
+
+
+def test_retry_after_falls_back_to_recent_durations_then_the_default():
+    admission = AdmissionController({TASK_TYPE_VIDEO: 1}, default_retry_after=45)
+    running = _task("v1", TASK_STATUS_PENDING)
+    assert admission.retry_after([running], TASK_TYPE_VIDEO) == 45
+    history = [_task(f"done{n}", TASK_STATUS_FINISHED, started_ago=500, took=60) for n in range(3)]
+    assert admission.typical_duration(history, TASK_TYPE_VIDEO) == 60
+    assert 59 <= admission.retry_after(history + [running], TASK_TYPE_VIDEO) <= 61
+
+
+def test_retry_after_is_capped():
+    admission = AdmissionController({TASK_TYPE_VIDEO: 1}, max_retry_after=120)
+    states = [_task("v1", TASK_STATUS_PROCESSING, started_ago=1, estimate=3600)]
+    assert admission.retry_after(states, TASK_TYPE_VIDEO) == 120
+
+
+def test_capacity_reports_usage_per_type():
+    admission = AdmissionController({TASK_TYPE_VIDEO: 3})
+    states = [_task("v1", TASK_STATUS_PROCESSING, started_ago=1), _task("v2", TASK_STATUS_PENDING)]
+    report = admission.capacity(states, [TASK_TYPE_VIDEO])[TASK_TYPE_VIDEO]
+    assert (report["limit"], report["pending"], report["processing"], report["available"]) == (3, 1, 1, 1)
+    assert report["retry_after"] == 0
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from gateway.services.dedup import StageDedup, fingerprint
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint("image", {"prompt": "a", "steps": 4}) == fingerprint("image", {"steps": 4, "prompt": "a"})
+    assert fingerprint("image", {"prompt": "a"}) != fingerprint("clip", {"prompt": "a"})
+
+
+def test_duplicate_scenes_share_one_call_and_reuse_its_result():
+    runs = []
+
+    async def render():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"path": "s1.png"}
+
+    async def scenario():
+        dedup = StageDedup()
+        key = fingerprint("image", {"prompt": "a"})
+        together = await asyncio.gather(dedup.run("image", key, render), dedup.run("image", key, render))
+        later = await dedup.run("image", key, render)
+        return dedup, together, later
+
+    dedup, together, later = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert together[0] == together[1] == later == {"path": "s1.png"}
+    assert dedup.stats() == {"image": 2}
+
+
+def test_cancelling_one_scene_keeps_the_shared_call_for_the_other():
+    events = []
+
+    async def render():
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        events.append("done")
+        return "clip.mp4"
+
+    async def scenario():
+        dedup = StageDedup()
+        first = asyncio.ensure_future(dedup.run("clip", "k", render))
+        second = asyncio.ensure_future(dedup.run("clip", "k", render))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first
+
+    result, first = asyncio.run(scenario())
+    assert result == "clip.mp4"
+    assert first.cancelled()
+    assert events == ["done"]
+
+
+def test_call_is_cancelled_when_every_scene_leaves_and_retried_afterwards():
+    events = []
+
+    async def render():
+        events.append("start")
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return "clip.mp4"
+
+    async def scenario():
+        dedup = StageDedup()
+        waiters = [asyncio.ensure_future(dedup.run("clip", "k", render)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiters[0]
+        await asyncio.sleep(0)
+        return await dedup.run("clip", "k", render)
+
+    assert asyncio.run(scenario()) == "clip.mp4"
+    assert events == ["start", "cancelled", "start"]
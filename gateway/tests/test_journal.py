@@ -0,0 +1,78 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from gateway.services.journal import TaskJournal
+
+
+def _state(task_id, status, **fields):
+    return {"id": task_id, "status": status, "progress": 0, **fields}
+
+
+def test_replay_keeps_the_latest_record_of_each_task_and_the_keys(tmp_path):
+    journal = TaskJournal(tmp_path / "tasks.jsonl")
+    journal.task(_state("t1", "pending"))
+    journal.task(_state("t1", "processing"))
+    journal.task(_state("t2", "finished"))
+    journal.idempotency("key:abc:render:1", "t1", 1000.0)
+
+    states, keys = TaskJournal(tmp_path / "tasks.jsonl").replay()
+    assert {task_id: state["status"] for task_id, state in states.items()} == {"t1": "processing", "t2": "finished"}
+    assert keys == {"key:abc:render:1": ("t1", 1000.0)}
+
+
+def test_replay_skips_a_torn_last_line(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    TaskJournal(path).task(_state("t1", "processing"))
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"t": 1, "task": {"id": "t1", "sta')
+    journal = TaskJournal(path)
+    states, _ = journal.replay()
+    assert states["t1"]["status"] == "processing"
+    assert journal.seen == {"t1"}
+
+
+def test_replay_of_a_missing_journal_is_empty(tmp_path):
+    assert TaskJournal(tmp_path / "absent.jsonl").replay() == ({}, {})
+
+
+def test_records_made_on_the_loop_are_written_in_order_by_the_background_flush(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+
+    async def scenario():
+        journal = TaskJournal(path)
+        for progress in range(5):
+            journal.task(_state("t1", "processing", progress=progress))
+        # Nothing is written on the loop itself
+        on_disk = path.exists()
+        await journal.aclose()
+        return on_disk
+
+    assert asyncio.run(scenario()) is False
+    progress = [json.loads(line)["task"]["progress"] for line in path.read_text(encoding="utf-8").splitlines()]
+    assert progress == [0, 1, 2, 3, 4]
+
+
+def test_compact_rewrites_one_record_per_task_and_drops_expired_entries(tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    journal = TaskJournal(path)
+    old = (datetime.utcnow() - timedelta(days=10)).isoformat()
+    recent = datetime.utcnow().isoformat()
+    states = [
+        _state("old", "finished", finishedAt=old),
+        _state("recent", "finished", finishedAt=recent),
+        _state("running", "processing"),
+    ]
+    for state in states:
+        journal.task(state)
+        journal.task(state)
+    keys = {"fresh": ("recent", 9e12), "stale": ("old", 0.0)}
+
+    kept = journal.compact(states, keys, retention=86400, key_ttl=3600)
+
+    assert kept == 2
+    assert journal.seen == {"recent", "running"}
+    replayed, replayed_keys = TaskJournal(path).replay()
+    assert sorted(replayed) == ["recent", "running"]
+    assert list(replayed_keys) == ["fresh"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from gateway import main
+
+
+def test_identical_calls_from_different_tenants_share_one_downstream_request(monkeypatch):
+    calls = []
+
+    async def fake_call_json_api(service, payload, timeout=None, node=None):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return {"storyboard": [{"scene_id": "s1"}]}, main.NODES[service].endpoints[0]
+
+    monkeypatch.setattr(main, "_call_json_api", fake_call_json_api)
+    payload = {"story": "a fox", "style": "ink"}
+
+    async def scenario():
+        # Unknown tasks are their own tenants, like /render calls without a tenant header
+        return await asyncio.gather(
+            main._call_service("llm", payload, task_id="task-a"),
+            main._call_service("llm", payload, task_id="task-b"),
+        )
+
+    first, second = asyncio.run(scenario())
+    assert main._task_tenant("task-a") != main._task_tenant("task-b")
+    assert len(calls) == 1
+    assert first == second
+    assert first is not second
+
+
+def test_calls_in_different_priority_lanes_are_not_shared(monkeypatch):
+    calls = []
+
+    async def fake_call_json_api(service, payload, timeout=None, node=None):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return {}, main.NODES[service].endpoints[0]
+
+    monkeypatch.setattr(main, "_call_json_api", fake_call_json_api)
+    payload = {"story": "a fox", "style": "ink"}
+
+    async def scenario():
+        await asyncio.gather(
+            main._call_service("llm", payload, task_id="task-a", priority=main.TASK_PRIORITY_INTERACTIVE),
+            main._call_service("llm", payload, task_id="task-b", priority=main.TASK_PRIORITY_BATCH),
+        )
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_task_over_the_admission_cap_gets_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(main.ADMISSION.limits, main.TASK_TYPE_VIDEO, 1)
+    monkeypatch.setitem(
+        main.tasks,
+        "busy-video",
+        main.TaskState(id="busy-video", type=main.TASK_TYPE_VIDEO, status=main.TASK_STATUS_PROCESSING, progress=5, startedAt=main._now_iso(), estimatedDuration=90),
+    )
+    with pytest.raises(HTTPException) as rejected:
+        main._admit(main.TASK_TYPE_VIDEO)
+    assert rejected.value.status_code == 429
+    assert 1 <= int(rejected.value.headers["Retry-After"]) <= 90
+
+
+def test_startup_sweep_keeps_only_manifests_of_resumable_tasks(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "MANIFEST_DIR", tmp_path)
+    for task_id, status in (("failed-task", main.TASK_STATUS_FAILED), ("finished-task", main.TASK_STATUS_FINISHED)):
+        monkeypatch.setitem(main.tasks, task_id, main.TaskState(id=task_id, type=main.TASK_TYPE_VIDEO, status=status, progress=0))
+    for task_id in ("failed-task", "finished-task", "forgotten-task"):
+        main.TaskManifest(task_id, tmp_path).set_request({"story": task_id})
+
+    asyncio.run(main._sweep_manifests())
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["failed-task.json"]
+
+
+def _journal_records(path, task_id):
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] if path.exists() else []
+    return [record["task"] for record in records if record.get("task", {}).get("id") == task_id]
+
+
+def test_results_are_journaled_with_status_changes_and_after_the_task_ended(monkeypatch, tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    monkeypatch.setattr(main, "JOURNAL", main.TaskJournal(path))
+    now = main._now_iso()
+    monkeypatch.setitem(
+        main.tasks,
+        "video-1",
+        main.TaskState(id="video-1", type=main.TASK_TYPE_VIDEO, status=main.TASK_STATUS_PENDING, progress=0, result=main._default_result(), createdAt=now),
+    )
+
+    main._update_task("video-1", status=main.TASK_STATUS_PROCESSING, progress=1)
+    main._update_task("video-1", progress=50, result={"draft": {"resource_url": "/files/draft.mp4"}})
+    main._update_task("video-1", status=main.TASK_STATUS_FINISHED, progress=100, result={"resource_url": "/files/final.mp4"})
+    main._update_task("video-1", result={"alternates": {"s1": [{"path": "alt.png"}]}})
+
+    records = _journal_records(path, "video-1")
+    assert [record["status"] for record in records] == [main.TASK_STATUS_PROCESSING, main.TASK_STATUS_FINISHED, main.TASK_STATUS_FINISHED]
+    assert records[-1]["result"]["alternates"] == {"s1": [{"path": "alt.png"}]}
+
+
+def test_restart_resumes_checkpointed_videos_and_fails_other_interrupted_tasks(monkeypatch, tmp_path):
+    journal = main.TaskJournal(tmp_path / "tasks.jsonl")
+    journal.task(main.TaskState(id="video-1", type=main.TASK_TYPE_VIDEO, status=main.TASK_STATUS_PROCESSING, progress=40).dict())
+    journal.task(main.TaskState(id="shot-1", type=main.TASK_TYPE_SHOT, status=main.TASK_STATUS_PROCESSING, progress=10).dict())
+    journal.task(main.TaskState(id="done-1", type=main.TASK_TYPE_VIDEO, status=main.TASK_STATUS_FINISHED, progress=100).dict())
+    journal.idempotency("key:abc:render:1", "video-1", time.time())
+    main.TaskManifest("video-1", tmp_path).set_request({"render_req": {"story": "a fox"}})
+
+    restarted = {}
+    monkeypatch.setattr(main, "JOURNAL", main.TaskJournal(tmp_path / "tasks.jsonl"))
+    monkeypatch.setattr(main, "MANIFEST_DIR", tmp_path)
+    monkeypatch.setattr(main, "_restart_video_task", lambda task_id, ctx, message: restarted.setdefault(task_id, ctx))
+    monkeypatch.setattr(main, "tasks", {})
+    monkeypatch.setattr(main, "idempotency_keys", {})
+
+    asyncio.run(main._recover_tasks())
+
+    assert list(restarted) == ["video-1"]
+    assert restarted["video-1"]["render_req"].story == "a fox"
+    assert main.tasks["shot-1"].status == main.TASK_STATUS_FAILED
+    assert main.tasks["shot-1"].error == "interrupted by gateway restart"
+    assert main.tasks["done-1"].status == main.TASK_STATUS_FINISHED
+    assert main.idempotency_keys["key:abc:render:1"][0] == "video-1"
@@ -0,0 +1,54 @@
+from gateway.services.manifest import TaskManifest
+
+
+def _manifest_with_scene(tmp_path):
+    frame = tmp_path / "s1.png"
+    frame.write_bytes(b"png")
+    manifest = TaskManifest("task-1", tmp_path / "manifests")
+    manifest.set_request({"story": "a fox"})
+    manifest.set_storyboard([{"scene_id": "s1"}])
+    manifest.record("s1", "image", "img-key", {"path": str(frame)}, path=str(frame))
+    manifest.record("s1", "audio", "tts-key", {"audio": "s1.wav"})
+    return manifest, frame
+
+
+def test_checkpoints_survive_a_reload(tmp_path):
+    _manifest_with_scene(tmp_path)
+    reloaded = TaskManifest.load("task-1", tmp_path / "manifests")
+    assert reloaded.request == {"story": "a fox"}
+    assert reloaded.storyboard == [{"scene_id": "s1"}]
+    assert reloaded.get("s1", "image", "img-key")["path"].endswith("s1.png")
+    assert reloaded.completed() == {"storyboard": 1, "image": 1, "audio": 1, "clip": 0, "mux": 0}
+
+
+def test_stage_is_redone_when_inputs_change_or_its_file_is_gone(tmp_path):
+    manifest, frame = _manifest_with_scene(tmp_path)
+    assert manifest.get("s1", "image", "other-key") is None
+    frame.unlink()
+    assert manifest.get("s1", "image", "img-key") is None
+    # Stages recorded without a file only depend on their key
+    assert manifest.get("s1", "audio", "tts-key") == {"audio": "s1.wav"}
+
+
+def test_drop_from_forgets_the_stage_and_everything_after_it(tmp_path):
+    manifest, _ = _manifest_with_scene(tmp_path)
+    manifest.drop_from("audio")
+    reloaded = TaskManifest.load("task-1", tmp_path / "manifests")
+    assert reloaded.get("s1", "audio", "tts-key") is None
+    assert reloaded.get("s1", "image", "img-key") is not None
+    reloaded.drop_from("storyboard")
+    assert reloaded.completed() == {"storyboard": 0, "image": 0, "audio": 0, "clip": 0, "mux": 0}
+
+
+def test_missing_or_corrupt_manifest_loads_empty(tmp_path):
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    assert TaskManifest.load("broken", tmp_path).request is None
+    assert TaskManifest.load("absent", tmp_path).completed()["image"] == 0
+
+
+def test_delete_removes_the_file_and_a_leftover_temp_file(tmp_path):
+    manifest, _ = _manifest_with_scene(tmp_path)
+    manifest.path.with_suffix(".json.tmp").write_text("{}", encoding="utf-8")
+    manifest.delete()
+    manifest.delete()
+    assert list((tmp_path / "manifests").iterdir()) == []
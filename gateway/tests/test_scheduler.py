@@ -0,0 +1,111 @@
+import asyncio
+
+from gateway.services.scheduler import ServiceLimiter
+
+
+async def _grant_order(limiter, requests):
+    """Queue ``requests`` (label, tenant, priority) behind a held slot and return the order they are served in."""
+    served = []
+
+    async def _request(label, tenant, priority):
+        async with limiter.slot(tenant=tenant, priority=priority):
+            served.append(label)
+
+    await limiter.acquire(tenant="holder")
+    waiters = [asyncio.ensure_future(_request(*request)) for request in requests]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*waiters)
+    return served
+
+
+def test_callers_beyond_the_slots_wait_and_see_their_queue_position():
+    positions = []
+
+    async def scenario():
+        limiter = ServiceLimiter("txt2img", slots=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire(on_position=positions.append))
+        await asyncio.sleep(0)
+        queued = (limiter.active, limiter.stats()["queued"], waiter.done())
+        limiter.release()
+        await waiter
+        return queued, limiter.active
+
+    queued, active = asyncio.run(scenario())
+    assert queued == (2, 1, False)
+    assert positions == [1]
+    assert active == 2
+
+
+def test_cancelled_waiter_leaves_the_queue_and_moves_the_others_up():
+    positions = []
+
+    async def scenario():
+        limiter = ServiceLimiter("img2vid", slots=1)
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire(on_position=positions.append))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        limiter.release()
+        await second
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert positions == [2, 1]
+    assert limiter.active == 1
+    assert limiter.stats()["queued"] == 0
+
+
+def test_single_tenant_is_served_first_in_first_out():
+    limiter = ServiceLimiter("llm", slots=1)
+    order = asyncio.run(_grant_order(limiter, [(n, "a", "normal") for n in range(5)]))
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_equal_tenants_take_turns():
+    limiter = ServiceLimiter("txt2img", slots=1)
+    requests = [("a1", "a", "normal"), ("a2", "a", "normal"), ("a3", "a", "normal"), ("b1", "b", "normal"), ("b2", "b", "normal")]
+    order = asyncio.run(_grant_order(limiter, requests))
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_weighted_tenant_gets_its_share_of_slots():
+    limiter = ServiceLimiter("txt2img", slots=1, weights={"studio": 3})
+    requests = [(f"studio{n}", "studio", "normal") for n in range(6)] + [(f"free{n}", "free", "normal") for n in range(6)]
+    order = asyncio.run(_grant_order(limiter, requests))
+    first_eight = [label.rstrip("0123456789") for label in order[:8]]
+    assert first_eight.count("studio") == 6
+    assert first_eight.count("free") == 2
+
+
+def test_tenant_stats_count_served_and_queued_calls():
+    limiter = ServiceLimiter("tts", slots=1)
+    asyncio.run(_grant_order(limiter, [("a1", "a", "normal"), ("b1", "b", "normal"), ("b2", "b", "normal")]))
+    stats = limiter.tenant_stats()
+    assert stats["a"]["served"] == 1
+    assert stats["b"]["served"] == 2
+    assert all(tenant["queued"] == 0 for tenant in stats.values())
+
+
+def test_freed_slot_goes_to_the_highest_priority_lane():
+    limiter = ServiceLimiter("txt2img", slots=1)
+    requests = [("batch", "a", "batch"), ("normal", "b", "normal"), ("interactive", "c", "interactive")]
+    assert asyncio.run(_grant_order(limiter, requests)) == ["interactive", "normal", "batch"]
+
+
+def test_fair_queuing_applies_within_a_lane_only():
+    limiter = ServiceLimiter("txt2img", slots=1)
+    requests = [("a-batch", "a", "batch"), ("a1", "a", "interactive"), ("a2", "a", "interactive"), ("b1", "b", "interactive")]
+    assert asyncio.run(_grant_order(limiter, requests)) == ["a1", "b1", "a2", "a-batch"]
+
+
+def test_unknown_priority_falls_back_to_normal():
+    limiter = ServiceLimiter("llm", slots=1)
+    requests = [("batch", "a", "batch"), ("unknown", "b", "urgent"), ("normal", "c", "normal")]
+    assert asyncio.run(_grant_order(limiter, requests)) == ["unknown", "normal", "batch"]
+    # The slot holder queued in the default (normal) lane too
+    assert limiter.priority_stats()["normal"]["served"] == 3
@@ -0,0 +1,107 @@
+import asyncio
+
+from gateway.services.singleflight import SingleFlight
+
+
+class _Upstream:
+    """Counts calls and lets the test decide when the response arrives."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return {"images": [{"path": f"img{self.calls}.png"}]}
+
+
+def test_key_ignores_payload_key_order_but_not_target():
+    assert SingleFlight.key("txt2img", {"a": 1, "b": 2}) == SingleFlight.key("txt2img", {"b": 2, "a": 1})
+    assert SingleFlight.key("txt2img", {"a": 1}) != SingleFlight.key("img2vid", {"a": 1})
+
+
+def test_concurrent_callers_share_one_call_and_get_their_own_copy():
+    async def scenario():
+        flight, upstream = SingleFlight(), _Upstream()
+        callers = [asyncio.ensure_future(flight.do("k", upstream, label="txt2img")) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*callers)
+        return flight, upstream, results
+
+    flight, upstream, results = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert results[0] == results[1] == results[2]
+    results[0]["images"].clear()
+    assert results[1]["images"]
+    assert flight.stats() == {"txt2img": 2}
+    assert flight.inflight() == 0
+
+
+def test_nothing_is_cached_once_the_call_finished():
+    async def scenario():
+        flight, upstream = SingleFlight(), _Upstream()
+        upstream.release.set()
+        await flight.do("k", upstream)
+        await flight.do("k", upstream)
+        return upstream
+
+    assert asyncio.run(scenario()).calls == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_call_for_the_others():
+    async def scenario():
+        flight, upstream = SingleFlight(), _Upstream()
+        leaving = asyncio.ensure_future(flight.do("k", upstream))
+        staying = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return upstream, await staying
+
+    upstream, result = asyncio.run(scenario())
+    assert result == {"images": [{"path": "img1.png"}]}
+    assert (upstream.calls, upstream.cancelled) == (1, 0)
+
+
+def test_last_caller_leaving_cancels_the_call_and_newcomers_start_afresh():
+    async def scenario():
+        flight, upstream = SingleFlight(), _Upstream()
+        callers = [asyncio.ensure_future(flight.do("k", upstream)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        inflight_after_cancel = flight.inflight()
+        upstream.release.set()
+        result = await flight.do("k", upstream)
+        return upstream, inflight_after_cancel, result
+
+    upstream, inflight_after_cancel, result = asyncio.run(scenario())
+    assert upstream.cancelled == 1
+    assert inflight_after_cancel == 0
+    assert upstream.calls == 2
+    assert result == {"images": [{"path": "img2.png"}]}
+
+
+def test_members_lists_the_named_callers_while_they_wait():
+    async def scenario():
+        flight, upstream = SingleFlight(), _Upstream()
+        callers = [asyncio.ensure_future(flight.do("k", upstream, member=task)) for task in ("t1", "t2", "t1")]
+        await asyncio.sleep(0)
+        waiting = flight.members("k")
+        upstream.release.set()
+        await asyncio.gather(*callers)
+        return flight, waiting
+
+    flight, waiting = asyncio.run(scenario())
+    assert waiting == ["t1", "t2"]
+    assert flight.members("k") == []
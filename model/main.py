@@ -1,7 +1,9 @@
 """Model node FastAPI入口，聚合 LLM / 文生图 / 图生视频 / TTS 四个子服务。"""
 
+import os
 from datetime import datetime
-from typing import Dict
+from pathlib import Path
+from typing import Dict, Optional
 
 from fastapi import FastAPI
 
@@ -14,6 +16,9 @@ SERVICE_PREFIXES: Dict[str, str] = {
     "tts": "/tts",
 }
 
+# Optional Unix domain socket (e.g. /data/run/model.sock on a volume shared with a colocated gateway)
+MODEL_UDS = os.getenv("MODEL_UDS", "")
+
 app = FastAPI(title="StoryToVideo Model Node", version="0.2.0")
 
 
@@ -35,3 +40,49 @@ llm.register_app(app, prefix=SERVICE_PREFIXES["llm"])
 txt2img.register_app(app, prefix=SERVICE_PREFIXES["txt2img"])
 img2vid.register_app(app, prefix=SERVICE_PREFIXES["img2vid"])
 tts.register_app(app, prefix=SERVICE_PREFIXES["tts"])
+
+
+def serve(host: str, port: int, uds: Optional[str] = None, tcp: bool = True) -> None:
+    """Serve the app on TCP and/or a Unix socket from one process, so models are loaded once."""
+    import asyncio
+
+    import uvicorn
+
+    configs = []
+    if tcp:
+        configs.append(uvicorn.Config(app, host=host, port=port))
+    if uds:
+        Path(uds).parent.mkdir(parents=True, exist_ok=True)
+        # Only the first listener runs the lifespan (startup model loading); the app is shared
+        configs.append(uvicorn.Config(app, uds=uds, lifespan="off" if configs else "on"))
+    if not configs:
+        raise SystemExit("nothing to listen on: pass --uds or drop --no-tcp")
+    servers = [uvicorn.Server(config) for config in configs]
+
+    async def _run() -> None:
+        runs = [asyncio.ensure_future(server.serve()) for server in servers]
+        # Each server installs its own signal handlers and only one of them sees Ctrl-C
+        await asyncio.wait(runs, return_when=asyncio.FIRST_COMPLETED)
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*runs)
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        # uvicorn re-raises the captured signal after a clean shutdown; uvicorn.run swallows it the same way
+        pass
+
+
+# CLI entry: python -m model.main --host 0.0.0.0 --port 8000 [--uds /data/run/model.sock]
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="StoryToVideo Model Node")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind host, default 0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000, help="Bind port, default 8000")
+    parser.add_argument("--uds", default=MODEL_UDS, help="Also listen on this Unix socket (env MODEL_UDS)")
+    parser.add_argument("--no-tcp", action="store_true", help="Listen on the Unix socket only")
+    cli_args = parser.parse_args()
+
+    serve(cli_args.host, cli_args.port, uds=cli_args.uds or None, tcp=not cli_args.no_tcp)
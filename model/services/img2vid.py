@@ -17,10 +17,10 @@ from typing import Optional
 import torch
 from diffusers import StableVideoDiffusionPipeline
 from diffusers.utils import export_to_video
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, Header, HTTPException
 from PIL import Image
 from pydantic import BaseModel, Field
-from model.services.utils import resolve_project_root
+from model.services.utils import DEADLINE_HEADER, ensure_deadline, resolve_project_root, unique_output_path
 
 router = APIRouter()
 
@@ -129,8 +129,7 @@ def save_video(frames, fps: int, scene_id: Optional[str], seed: Optional[int]) -
     ensure_output_dir()
     base = scene_id or _slug(str(uuid.uuid4())[:8])
     ts = int(time.time())
-    filename = f"{base}_{seed or 'seed'}_{ts}.mp4"
-    out_path = OUTPUT_DIR / filename
+    out_path = unique_output_path(OUTPUT_DIR, f"{base}_{seed or 'seed'}_{ts}", ".mp4")
     export_to_video(frames, out_path, fps=fps)
     return str(out_path)
 
@@ -153,7 +152,8 @@ async def health():
 
 @router.post("/generate", response_model=GenerateResponse, name="img2vid_generate")
 @router.post("/img2vid", response_model=GenerateResponse, include_in_schema=False)
-async def generate(req: GenerateRequest):
+async def generate(req: GenerateRequest, deadline: Optional[float] = Header(None, alias=DEADLINE_HEADER)):
+    ensure_deadline(deadline, "img2vid")
     if not SVD_ENABLED:
         raise HTTPException(status_code=503, detail="SVD video generation is disabled on this server")
     if pipe is None:
@@ -168,6 +168,7 @@ async def generate(req: GenerateRequest):
             gen = torch.Generator(device=DEVICE).manual_seed(int(req.seed))
         except Exception:
             gen = torch.Generator().manual_seed(int(req.seed))
+    ensure_deadline(deadline, "img2vid")
     try:
         start_ts = time.perf_counter()
         with torch.inference_mode():
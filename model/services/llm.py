@@ -13,8 +13,9 @@ import re
 from typing import List, Optional
 
 import httpx
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, Header, HTTPException
 from pydantic import BaseModel, Field
+from model.services.utils import DEADLINE_HEADER, ensure_deadline
 
 try:
     from model.services.cloud_providers import get_llm_provider, LLMProvider
@@ -597,7 +598,8 @@ def _parse_llm_response(content: str, req: StoryboardRequest) -> List[Storyboard
 
 
 @router.post("/storyboard", response_model=StoryboardResponse)
-async def generate_storyboard(req: StoryboardRequest):
+async def generate_storyboard(req: StoryboardRequest, deadline: Optional[float] = Header(None, alias=DEADLINE_HEADER)):
+    ensure_deadline(deadline, "llm")
     # Use cloud provider if configured, fallback to Ollama
     if LLM_PROVIDER != "ollama" and CLOUD_PROVIDERS_AVAILABLE:
         items = await call_cloud_llm(req)
@@ -15,9 +15,9 @@ from typing import List, Optional, Tuple
 
 import numpy as np
 import soundfile as sf
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, Header, HTTPException
 from pydantic import BaseModel, Field
-from model.services.utils import resolve_project_root
+from model.services.utils import DEADLINE_HEADER, ensure_deadline, resolve_project_root, unique_output_path
 
 # Cloud providers
 try:
@@ -78,6 +78,7 @@ class AudioItem(BaseModel):
     scene_id: str
     audio: str
     sample_rate: int
+    duration: Optional[float] = Field(None, description="音频时长（秒），网关据此决定分镜片段长度")
 
 
 class NarrationResponse(BaseModel):
@@ -173,19 +174,26 @@ def save_audio(audio: np.ndarray, sample_rate: int, scene_id: str) -> str:
     ensure_output_dir()
     base = _slug(scene_id) if scene_id else _slug(str(uuid.uuid4())[:8])
     ts = int(time.time())
-    filename = f"{base}_{ts}.wav"
-    path = OUTPUT_DIR / filename
+    path = unique_output_path(OUTPUT_DIR, f"{base}_{ts}", ".wav")
     sf.write(path, audio, sample_rate)
     return str(path)
 
 
+def audio_file_duration(path: str) -> Optional[float]:
+    """Best-effort duration of an encoded audio file (cloud providers return MP3)."""
+    try:
+        return float(sf.info(path).duration)
+    except Exception:  # noqa: BLE001
+        return None
+
+
 def save_audio_bytes(audio_bytes: bytes, scene_id: str, sample_rate: int) -> str:
     """Save audio from bytes (for cloud providers)."""
     ensure_output_dir()
     base = _slug(scene_id) if scene_id else _slug(str(uuid.uuid4())[:8])
     ts = int(time.time())
-    filename = f"{base}_{ts}.mp3"  # Cloud providers often return MP3
-    path = OUTPUT_DIR / filename
+    # Cloud providers often return MP3
+    path = unique_output_path(OUTPUT_DIR, f"{base}_{ts}", ".mp3")
     with open(path, "wb") as f:
         f.write(audio_bytes)
     return str(path)
@@ -212,17 +220,18 @@ async def health():
 
 
 @router.post("/narration", response_model=NarrationResponse)
-async def narration(req: NarrationRequest):
+async def narration(req: NarrationRequest, deadline: Optional[float] = Header(None, alias=DEADLINE_HEADER)):
+    ensure_deadline(deadline, "tts")
     if not req.lines:
         raise HTTPException(status_code=400, detail="lines is empty")
     
     # Use cloud provider if configured
     if TTS_PROVIDER != "local" and CLOUD_PROVIDERS_AVAILABLE:
-        return await narration_cloud(req)
-    return await narration_local(req)
+        return await narration_cloud(req, deadline)
+    return await narration_local(req, deadline)
 
 
-async def narration_cloud(req: NarrationRequest) -> dict:
+async def narration_cloud(req: NarrationRequest, deadline: Optional[float] = None) -> dict:
     """Generate narration using cloud TTS (Edge TTS/ElevenLabs)."""
     provider = get_tts_provider()
     if provider is None:
@@ -230,12 +239,14 @@ async def narration_cloud(req: NarrationRequest) -> dict:
     
     outputs: List[AudioItem] = []
     for line in req.lines:
+        ensure_deadline(deadline, "tts")
         try:
             text = line.text or ""
             if not text.strip():
                 # Generate silence for empty text
                 audio, sr = generate_silence(0.2)
                 path = save_audio(audio, sr, line.scene_id)
+                duration = len(audio) / float(sr)
             else:
                 audio_bytes, sr = await provider.synthesize(
                     text=text,
@@ -243,13 +254,14 @@ async def narration_cloud(req: NarrationRequest) -> dict:
                     speed=req.speed,
                 )
                 path = save_audio_bytes(audio_bytes, line.scene_id, sr)
-            outputs.append(AudioItem(scene_id=line.scene_id, audio=path, sample_rate=sr))
+                duration = audio_file_duration(path)
+            outputs.append(AudioItem(scene_id=line.scene_id, audio=path, sample_rate=sr, duration=duration))
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"TTS failed for {line.scene_id}: {exc}") from exc
     return {"audios": outputs}
 
 
-async def narration_local(req: NarrationRequest) -> dict:
+async def narration_local(req: NarrationRequest, deadline: Optional[float] = None) -> dict:
     """Generate narration using local CosyVoice2."""
     if not COSYVOICE_AVAILABLE:
         raise HTTPException(status_code=500, detail="CosyVoice not available")
@@ -257,6 +269,7 @@ async def narration_local(req: NarrationRequest) -> dict:
         load_voice_model()
     outputs: List[AudioItem] = []
     for line in req.lines:
+        ensure_deadline(deadline, "tts")
         try:
             text = line.text or ""
             if not text.strip():
@@ -264,7 +277,7 @@ async def narration_local(req: NarrationRequest) -> dict:
             else:
                 audio, sr = synthesize(text, req.speaker, req.speed)
             path = save_audio(audio, sr, line.scene_id)
-            outputs.append(AudioItem(scene_id=line.scene_id, audio=path, sample_rate=sr))
+            outputs.append(AudioItem(scene_id=line.scene_id, audio=path, sample_rate=sr, duration=len(audio) / float(sr)))
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"TTS failed for {line.scene_id}: {exc}") from exc
     return {"audios": outputs}
@@ -13,9 +13,9 @@ from io import BytesIO
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, Header, HTTPException
 from pydantic import BaseModel, Field
-from model.services.utils import resolve_project_root
+from model.services.utils import DEADLINE_HEADER, ensure_deadline, resolve_project_root, unique_output_path
 
 # Conditional imports for local GPU mode
 try:
@@ -109,8 +109,7 @@ def save_image(image, scene_id: Optional[str], seed: int) -> str:
     ensure_output_dir()
     base = scene_id or _slug(str(uuid.uuid4())[:8])
     ts = int(time.time())
-    filename = f"{base}_{seed}_{ts}.png"
-    path = OUTPUT_DIR / filename
+    path = unique_output_path(OUTPUT_DIR, f"{base}_{seed}_{ts}", ".png")
     image.save(path)
     return str(path)
 
@@ -120,8 +119,7 @@ def save_image_bytes(image_bytes: bytes, scene_id: Optional[str], seed: int) ->
     ensure_output_dir()
     base = scene_id or _slug(str(uuid.uuid4())[:8])
     ts = int(time.time())
-    filename = f"{base}_{seed}_{ts}.png"
-    path = OUTPUT_DIR / filename
+    path = unique_output_path(OUTPUT_DIR, f"{base}_{seed}_{ts}", ".png")
     with open(path, "wb") as f:
         f.write(image_bytes)
     return str(path)
@@ -146,19 +144,22 @@ async def health():
 
 
 @router.post("/generate", response_model=GenerateResponse)
-async def generate(req: GenerateRequest):
+async def generate(req: GenerateRequest, deadline: Optional[float] = Header(None, alias=DEADLINE_HEADER)):
+    ensure_deadline(deadline, "txt2img")
     # Use cloud provider if configured
     if IMAGE_PROVIDER != "local" and CLOUD_PROVIDERS_AVAILABLE:
-        return await generate_cloud(req)
-    return await generate_local(req)
+        return await generate_cloud(req, deadline)
+    return await generate_local(req, deadline)
 
 
-async def generate_cloud(req: GenerateRequest) -> dict:
+async def generate_cloud(req: GenerateRequest, deadline: Optional[float] = None) -> dict:
     """Generate image using cloud provider (AI Horde/Cloudflare)."""
     provider = get_image_provider()
     if provider is None:
         raise HTTPException(status_code=500, detail="Cloud image provider not configured")
     
+    # Provider calls are paid: never send one for a request the gateway already gave up on
+    ensure_deadline(deadline, "txt2img")
     try:
         image_bytes = await provider.generate(
             prompt=req.prompt,
@@ -177,7 +178,7 @@ async def generate_cloud(req: GenerateRequest) -> dict:
     return {"images": [GeneratedItem(path=path, seed=seed)]}
 
 
-async def generate_local(req: GenerateRequest) -> dict:
+async def generate_local(req: GenerateRequest, deadline: Optional[float] = None) -> dict:
     """Generate image using local SD Turbo."""
     if not TORCH_AVAILABLE:
         raise HTTPException(status_code=500, detail="torch/diffusers not available")
@@ -189,6 +190,7 @@ async def generate_local(req: GenerateRequest) -> dict:
             gen = torch.Generator(device=DEVICE).manual_seed(int(req.seed))
         except Exception:
             gen = torch.Generator().manual_seed(int(req.seed))
+    ensure_deadline(deadline, "txt2img")
     try:
         result = pipe(
             req.prompt,
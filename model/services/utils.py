@@ -1,7 +1,17 @@
 """Shared helpers for model services."""
 
 import os
+import time
+import uuid
 from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+
+# Absolute deadline (unix epoch seconds) the gateway attaches to every request
+DEADLINE_HEADER = "X-Request-Deadline"
+# Tolerance for clock skew between gateway and model node
+DEADLINE_GRACE_SECONDS = float(os.getenv("DEADLINE_GRACE_SECONDS", "1.0"))
 
 
 def resolve_project_root() -> Path:
@@ -23,3 +33,26 @@ def resolve_project_root() -> Path:
             if (parent / marker).exists():
                 return parent
     return here.parent
+
+
+def unique_output_path(directory: Path, stem: str, suffix: str) -> Path:
+    """``<stem>_<random><suffix>`` under directory.
+
+    Scene ids repeat across tasks ("s1") and seeds / second timestamps can match, so
+    concurrent requests would otherwise write to (and hand back) the same file.
+    """
+    return Path(directory) / f"{stem}_{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def ensure_deadline(deadline: Optional[float], stage: str) -> None:
+    """Refuse work whose caller has already given up, so no GPU time goes to abandoned requests.
+
+    Called when a request reaches the front of the service (handler start) and again right
+    before inference; raises 504 once the deadline from DEADLINE_HEADER has passed.
+    """
+    if deadline is None:
+        return
+    late = time.time() - deadline - DEADLINE_GRACE_SECONDS
+    if late > 0:
+        print(f"[{stage}] dropping request {late:.1f}s past its deadline")
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded {late:.1f}s before {stage}")
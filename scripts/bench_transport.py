@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Gateway -> model node transport benchmark: TCP loopback vs Unix domain socket.
+中文：对比网关到模型节点走 TCP 回环与 Unix 域套接字的请求延迟和吞吐。
+
+Requests go through the gateway's own pooled clients (gateway.services.http_pool),
+so keep-alive reuse and limits are the same as in production.
+
+- 默认在本机依次拉起一个 echo 服务（TCP 与 UDS 各一次），只测传输本身：
+    python scripts/bench_transport.py --requests 5000 --concurrency 16 --payload-bytes 2048
+- 也可以直接压测运行中的模型节点（例如 /health）：
+    python scripts/bench_transport.py --method GET \
+        --tcp http://127.0.0.1:8000/health --uds unix:/data/run/model.sock:/health
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from gateway.services.http_pool import ServiceClients, split_endpoint  # noqa: E402
+
+
+def _serve_echo(port: Optional[int], uds: Optional[str], response_bytes: int) -> None:
+    """Minimal FastAPI app, so the numbers reflect the transport rather than a handler."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    filler = "x" * response_bytes
+
+    @app.post("/echo")
+    async def echo(body: Dict) -> Dict:
+        return {"status": "ok", "data": filler, "n": len(body)}
+
+    @app.get("/health")
+    async def health() -> Dict:
+        return {"status": "ok"}
+
+    if uds:
+        uvicorn.run(app, uds=uds, log_level="warning", access_log=False)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+async def _wait_ready(clients: ServiceClients, name: str, url: str, socket_path: Optional[str], deadline: float) -> None:
+    health = url.rsplit("/", 1)[0] + "/health"
+    while True:
+        try:
+            await clients.client(name, socket_path).get(health)
+            return
+        except Exception:  # noqa: BLE001
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def _bench(name: str, endpoint: str, args: argparse.Namespace, wait: bool) -> Dict[str, float]:
+    url, socket_path = split_endpoint(endpoint)
+    clients = ServiceClients({name: 30.0}, max_keepalive=max(args.concurrency, 1))
+    payload = {"prompt": "p" * args.payload_bytes}
+    request_kw = {"json": payload} if args.method == "POST" else {}
+    try:
+        if wait:
+            await _wait_ready(clients, name, url, socket_path, time.monotonic() + 15)
+        client = clients.client(name, socket_path)
+        for _ in range(args.warmup):
+            (await client.request(args.method, url, **request_kw)).raise_for_status()
+
+        latencies: List[float] = []
+        remaining = iter(range(args.requests))
+
+        async def _worker() -> None:
+            for _ in remaining:
+                start = time.perf_counter()
+                resp = await client.request(args.method, url, **request_kw)
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await clients.aclose()
+
+    latencies.sort()
+    return {
+        "req_s": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+    }
+
+
+def _run_local(kind: str, args: argparse.Namespace, workdir: str) -> Dict[str, float]:
+    """Start the echo server on one transport, benchmark it, stop it."""
+    if kind == "uds":
+        sock = os.path.join(workdir, "echo.sock")
+        server_kw = {"port": None, "uds": sock}
+        endpoint = f"unix:{sock}:/echo"
+    else:
+        server_kw = {"port": args.port, "uds": None}
+        endpoint = f"http://127.0.0.1:{args.port}/echo"
+    ctx = multiprocessing.get_context("spawn")
+    server = ctx.Process(target=_serve_echo, kwargs=dict(server_kw, response_bytes=args.response_bytes), daemon=True)
+    server.start()
+    try:
+        return asyncio.run(_bench(kind, endpoint, args, wait=True))
+    finally:
+        server.terminate()
+        server.join(timeout=5)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark gateway -> model node over TCP vs Unix domain socket")
+    p.add_argument("--requests", type=int, default=3000, help="每种传输的请求数")
+    p.add_argument("--concurrency", type=int, default=8, help="并发请求数")
+    p.add_argument("--warmup", type=int, default=50, help="预热请求数（不计入统计）")
+    p.add_argument("--payload-bytes", type=int, default=1024, help="请求 JSON 中 prompt 的字节数")
+    p.add_argument("--response-bytes", type=int, default=256, help="本地 echo 服务的响应体字节数")
+    p.add_argument("--method", default="POST", choices=["GET", "POST"], help="HTTP 方法（压测 /health 时用 GET）")
+    p.add_argument("--port", type=int, default=18765, help="本地 echo 服务的 TCP 端口")
+    p.add_argument("--tcp", default="", help="运行中服务的 TCP 地址，如 http://127.0.0.1:8000/health")
+    p.add_argument("--uds", default="", help="运行中服务的 UDS 地址，如 unix:/data/run/model.sock:/health")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    results: Dict[str, Dict[str, float]] = {}
+    if args.tcp or args.uds:
+        for kind, endpoint in (("tcp", args.tcp), ("uds", args.uds)):
+            if endpoint:
+                results[kind] = asyncio.run(_bench(kind, endpoint, args, wait=False))
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench_uds_") as workdir:
+            for kind in ("tcp", "uds"):
+                results[kind] = _run_local(kind, args, workdir)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} payload={args.payload_bytes}B method={args.method}")
+    print(f"{'transport':<10}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, r in results.items():
+        print(f"{kind:<10}{r['req_s']:>10.0f}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+    if len(results) == 2:
+        tcp, uds = results["tcp"], results["uds"]
+        print(f"uds vs tcp: throughput {uds['req_s'] / tcp['req_s'] - 1:+.1%}, p50 {uds['p50_ms'] / tcp['p50_ms'] - 1:+.1%}, p99 {uds['p99_ms'] / tcp['p99_ms'] - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
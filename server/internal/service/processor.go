@@ -4,6 +4,7 @@ import (
 	"bytes"
 	"context"
 	"encoding/json"
+	"errors"
 	"fmt"
 	"io"
 	"log"
@@ -11,6 +12,7 @@ import (
 	"net/url"
 	"os"
 	"os/signal"
+	"strconv"
 	"strings"
 	"sync"
 	"syscall"
@@ -25,6 +27,24 @@ import (
 	"gorm.io/gorm"
 )
 
+// GatewayBusyError means the gateway shed the request with 429; retry after RetryAfter
+type GatewayBusyError struct {
+	RetryAfter time.Duration
+}
+
+func (e *GatewayBusyError) Error() string {
+	return fmt.Sprintf("gateway busy, retry after %s", e.RetryAfter)
+}
+
+// parseRetryAfter reads a Retry-After header in seconds, defaulting to 30s
+func parseRetryAfter(value string) time.Duration {
+	seconds, err := strconv.Atoi(strings.TrimSpace(value))
+	if err != nil || seconds <= 0 {
+		return 30 * time.Second
+	}
+	return time.Duration(seconds) * time.Second
+}
+
 func CancelWorkerJob(jobID string) error {
 	if jobID == "" {
 		return fmt.Errorf("empty job id")
@@ -229,6 +249,16 @@ func (p *Processor) HandleGenerateTask(ctx context.Context, t *asynq.Task) error
 		return nil
 	}
 	jobID, err := p.dispatchWorkerRequest(task)
+	var busy *GatewayBusyError
+	if errors.As(err, &busy) {
+		// 网关满载（429）：退回 pending 并按 Retry-After 延迟重新入队，不消耗重试次数
+		log.Printf("Gateway 繁忙，任务 %s 将在 %s 后重新入队", task.ID, busy.RetryAfter)
+		task.UpdateStatus(p.DB, models.TaskStatusPending, nil, "")
+		if qerr := EnqueueTaskIn(task.ID, busy.RetryAfter); qerr != nil {
+			return qerr
+		}
+		return nil
+	}
 	if err != nil {
 		log.Printf("Worker 请求失败: %v", err)
 		task.UpdateStatus(p.DB, models.TaskStatusFailed, nil, fmt.Sprintf("Worker Request Failed: %v", err))
@@ -504,12 +534,22 @@ func (p *Processor) dispatchWorkerRequest(task *models.Task) (string, error) {
 	}
 	log.Printf("POST %s", fullURL)
 
-	resp, err := http.Post(fullURL, "application/json", bytes.NewBuffer(jsonBody))
+	httpReq, err := http.NewRequest(http.MethodPost, fullURL, bytes.NewBuffer(jsonBody))
+	if err != nil {
+		return "", fmt.Errorf("build request failed: %v", err)
+	}
+	httpReq.Header.Set("Content-Type", "application/json")
+	// 同一任务的重试（asynq retry / 429 后重新入队）复用网关已有的 job，而不是再起一条渲染
+	httpReq.Header.Set("Idempotency-Key", task.ID)
+	resp, err := http.DefaultClient.Do(httpReq)
 	if err != nil {
 		return "", err
 	}
 	defer resp.Body.Close()
 
+	if resp.StatusCode == http.StatusTooManyRequests {
+		return "", &GatewayBusyError{RetryAfter: parseRetryAfter(resp.Header.Get("Retry-After"))}
+	}
 	if resp.StatusCode != http.StatusOK && resp.StatusCode != http.StatusCreated && resp.StatusCode != http.StatusAccepted {
 		return "", fmt.Errorf("worker status code: %d", resp.StatusCode)
 	}
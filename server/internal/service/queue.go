@@ -31,22 +31,31 @@ func InitQueue() {
 
 // EnqueueTask enqueues a task for background processing
 func EnqueueTask(taskID string) error {
+	return EnqueueTaskIn(taskID, 0)
+}
+
+// EnqueueTaskIn enqueues a task to be processed after delay (0 = immediately)
+func EnqueueTaskIn(taskID string, delay time.Duration) error {
 	payload, err := json.Marshal(TaskPayload{TaskID: taskID})
 	if err != nil {
 		return fmt.Errorf("marshal payload failed: %w", err)
 	}
 
-	task := asynq.NewTask(TypeGenerateTask, payload,
+	opts := []asynq.Option{
 		asynq.MaxRetry(3),
-		asynq.Timeout(20*time.Minute),
-		asynq.Retention(24*time.Hour),
-	)
+		asynq.Timeout(20 * time.Minute),
+		asynq.Retention(24 * time.Hour),
+	}
+	if delay > 0 {
+		opts = append(opts, asynq.ProcessIn(delay))
+	}
+	task := asynq.NewTask(TypeGenerateTask, payload, opts...)
 
 	info, err := QueueClient.Enqueue(task)
 	if err != nil {
 		return fmt.Errorf("enqueue failed: %w", err)
 	}
 
-	log.Printf("[Queue] Task Enqueued: ID=%s, TaskID=%s", taskID, info.ID)
+	log.Printf("[Queue] Task Enqueued: ID=%s, TaskID=%s, Delay=%s", taskID, info.ID, delay)
 	return nil
 }